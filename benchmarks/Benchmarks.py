@@ -0,0 +1,271 @@
+"""
+Benchmarks of GraphGen over synthetic grammars (see SyntheticGrammar).
+
+    python benchmarks/Benchmarks.py [--quick] [--output FILE] [--compare FILE]
+
+Runs each benchmark and writes the results as JSON (to standard output, or
+FILE), so that the results of two commits can be compared with --compare.
+"""
+import argparse
+import copy
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+# The GraphGen sources use bare imports of each other.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from Generator import Generator
+from HostGraph import HostGraph
+from Lexer import Lexer
+from MatchIndex import MatchIndex
+from Parser import Parser
+from SyntheticGrammar import SyntheticGrammar
+
+# Version of the results format.
+FORMAT_VERSION = 1
+
+# Sizes of each benchmark: full, and with --quick.
+SIZES = {
+    'full' : { 'repeats' : 5, 'parseProductions' : 5000,
+        'hostSizes' : [1000, 4000, 16000], 'steps' : 200,
+        'generateSizes' : [1000, 10000, 50000] },
+    'quick' : { 'repeats' : 2, 'parseProductions' : 500,
+        'hostSizes' : [250, 1000], 'steps' : 50,
+        'generateSizes' : [250, 2000] },
+}
+
+#------------------------------------------------------------------------------
+def benchLex(grammar:SyntheticGrammar, repeats:int) -> dict:
+    """
+    Times scanning the tokens of a grammar.
+    Inputs:
+        * grammar - SyntheticGrammar to scan
+        * repeats - number of times to time it
+    Outputs: result dictionary
+    """
+    text = grammar.text()
+    tokens = [0]
+    def scan():
+        tokens[0] = sum(1 for token in Lexer(text))
+    best = _best(scan, repeats)
+    return { 'bytes' : len(text), 'tokens' : tokens[0], 'seconds' : best,
+        'tokens_per_second' : tokens[0] / best,
+        'bytes_per_second' : len(text) / best }
+
+#------------------------------------------------------------------------------
+def benchParse(grammar:SyntheticGrammar, repeats:int) -> dict:
+    """
+    Times parsing a grammar (scanning included).
+    Inputs:
+        * grammar - SyntheticGrammar to parse
+        * repeats - number of times to time it
+    Outputs: result dictionary
+    """
+    text = grammar.text()
+    best = _best(lambda: Parser(Lexer(text)).parse(), repeats)
+    return { 'bytes' : len(text), 'seconds' : best,
+        'productions_per_second' : grammar.numProductions / best,
+        'bytes_per_second' : len(text) / best }
+
+#------------------------------------------------------------------------------
+def benchMatch(grammar:SyntheticGrammar, hostSize:int, steps:int,
+        repeats:int) -> dict:
+    """
+    Times finding matches in a host graph grown to hostSize vertices: a
+    full search of every production (Generator._findMatchingProductions()),
+    building a MatchIndex, and keeping it up to date over a number of
+    steps.
+    Inputs:
+        * grammar - SyntheticGrammar whose productions to match
+        * hostSize - number of vertices of the host graph
+        * steps - number of productions to apply after building the index
+        * repeats - number of times to time each
+    Outputs: result dictionary
+    """
+    (config, graph, productions) = _grammar(grammar, hostSize)
+    gen = Generator(grammar.seed)
+    gen.generate(graph, productions, config)
+    numEdges = HostGraph(graph).numEdges()
+
+    found = [0]
+    def search():
+        found[0] = len(gen._findMatchingProductions(graph, productions))
+    fullSearch = _best(search, repeats)
+
+    builds = []
+    updates = []
+    for r in range(repeats):
+        hostGraph = HostGraph(graph)
+        matchIndex = MatchIndex(productions, hostGraph)
+        start = time.perf_counter()
+        matchIndex.build()
+        builds.append(time.perf_counter() - start)
+
+        # Apply the same productions, at the same places, every time.
+        gen = Generator(grammar.seed)
+        elapsed = 0.0
+        for step in range(steps):
+            (prod, mapping) = matchIndex.match(gen.rng.randrange(len(matchIndex)))
+            delta = prod.rewriteScript().apply(hostGraph, mapping)
+            start = time.perf_counter()
+            matchIndex.update(delta)
+            elapsed += time.perf_counter() - start
+        updates.append(elapsed / steps)
+
+    return { 'host_vertices' : graph.numVertices(),
+        'host_edges' : numEdges, 'matches' : found[0],
+        'full_search_seconds' : fullSearch, 'index_build_seconds' : min(builds),
+        'update_seconds_per_step' : min(updates), 'seconds' : fullSearch }
+
+#------------------------------------------------------------------------------
+def benchGenerate(grammar:SyntheticGrammar, numVertices:int,
+        repeats:int) -> dict:
+    """
+    Times generating a graph of numVertices vertices, from the start graph.
+    Inputs:
+        * grammar - SyntheticGrammar to generate from
+        * numVertices - min_vertices of the run
+        * repeats - number of times to time it
+    Outputs: result dictionary
+    """
+    (config, startGraph, productions) = _grammar(grammar, numVertices)
+    steps = [0]
+    def generate():
+        graph = copy.deepcopy(startGraph)
+        stats = Generator(grammar.seed).generate(graph, productions, config,
+            collectStats=True)
+        steps[0] = stats.steps
+    best = _best(generate, repeats)
+    return { 'steps' : steps[0], 'seconds' : best,
+        'steps_per_second' : steps[0] / best }
+
+#------------------------------------------------------------------------------
+def compare(old:dict, new:dict) -> str:
+    """
+    Compares two sets of results.
+    Inputs: old, new - results, as written by run()
+    Outputs: table of the time of each benchmark in both, and new/old
+    """
+    oldTimes = { _key(result) : result['seconds'] for result in old['results'] }
+    width = max([ len('benchmark') ] + [ len(_key(result)) for result in new['results'] ])
+    lines = [ '%-*s %12s %12s %8s' % (width, 'benchmark', 'old (s)', 'new (s)', 'new/old') ]
+    for result in new['results']:
+        key = _key(result)
+        if key in oldTimes:
+            lines.append('%-*s %12.6f %12.6f %8.3f' % (width, key, oldTimes[key],
+                result['seconds'], result['seconds'] / oldTimes[key]))
+        else:
+            lines.append('%-*s %12s %12.6f %8s' % (width, key, '-', result['seconds'], '-'))
+    return '\n'.join(lines)
+
+#------------------------------------------------------------------------------
+def run(size:str='full', log=None) -> dict:
+    """
+    Runs every benchmark.
+    Inputs:
+        * size - "full" or "quick"
+        * log - optional file to which to write progress
+    Outputs: results dictionary
+    """
+    sizes = SIZES[size]
+    repeats = sizes['repeats']
+    grammar = SyntheticGrammar()
+    benchmarks = [
+        ('lex', SyntheticGrammar(sizes['parseProductions']), {},
+            lambda g: benchLex(g, repeats)),
+        ('parse', SyntheticGrammar(sizes['parseProductions']), {},
+            lambda g: benchParse(g, repeats)),
+    ]
+    for hostSize in sizes['hostSizes']:
+        benchmarks.append( ('match', grammar, { 'host_size' : hostSize },
+            lambda g, n=hostSize: benchMatch(g, n, sizes['steps'], repeats)) )
+    for skew in [0.0, 2.0]:
+        skewed = SyntheticGrammar(skew=skew)
+        benchmarks.append( ('match', skewed, { 'host_size' : sizes['hostSizes'][-1] },
+            lambda g: benchMatch(g, sizes['hostSizes'][-1], sizes['steps'], repeats)) )
+    for numVertices in sizes['generateSizes']:
+        benchmarks.append( ('generate', grammar, { 'vertices' : numVertices },
+            lambda g, n=numVertices: benchGenerate(g, n, repeats)) )
+
+    results = []
+    for (name, g, params, bench) in benchmarks:
+        params = dict(g.params(), **params)
+        if log is not None:
+            print('%s %s' % (name, json.dumps(params, sort_keys=True)), file=log)
+        result = { 'name' : name, 'params' : params }
+        result.update(bench(g))
+        results.append(result)
+    return { 'version' : FORMAT_VERSION, 'commit' : _commit(),
+        'python' : platform.python_version(), 'platform' : platform.platform(),
+        'time' : time.strftime('%Y-%m-%dT%H:%M:%S'), 'size' : size,
+        'results' : results }
+
+#------------------------------------------------------------------------------
+# PRIVATE FUNCTIONS - These aren't the functions you're looking for.
+#------------------------------------------------------------------------------
+def _best(function, repeats:int) -> float:
+    """Returns the shortest time, in seconds, of repeats calls of function."""
+    times = []
+    for r in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+#------------------------------------------------------------------------------
+def _commit() -> str:
+    """Returns the git commit of the sources, or None."""
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+#------------------------------------------------------------------------------
+def _grammar(grammar:SyntheticGrammar, minVertices:int) -> tuple:
+    """Returns (config, startGraph, productions) of a parsed grammar."""
+    parser = Parser(Lexer(grammar.text({ 'min_vertices' : minVertices })))
+    parser.parse()
+    return (parser.config, parser.startGraph, parser.productions)
+
+#------------------------------------------------------------------------------
+def _key(result:dict) -> str:
+    """Returns the name and parameters of a result, as one string."""
+    return '%s %s' % (result['name'], ','.join('%s=%s' % item
+        for item in sorted(result['params'].items())))
+
+#------------------------------------------------------------------------------
+def main(argv:list) -> int:
+    """
+    Runs the benchmarks from the command line.
+    Inputs: argv - command line arguments (without the program name)
+    Outputs: exit status
+    """
+    parser = argparse.ArgumentParser(description='Benchmark GraphGen.')
+    parser.add_argument('--quick', action='store_true',
+        help='run smaller benchmarks, fewer times')
+    parser.add_argument('--output', metavar='FILE',
+        help='write the results to FILE instead of standard output')
+    parser.add_argument('--compare', metavar='FILE',
+        help='compare the results with earlier ones, from FILE')
+    args = parser.parse_args(argv)
+
+    results = run('quick' if args.quick else 'full', sys.stderr)
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    else:
+        json.dump(results, sys.stdout, indent=2, sort_keys=True)
+        print()
+    if args.compare is not None:
+        with open(args.compare) as f:
+            print(compare(json.load(f), results), file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,126 @@
+import random
+
+#------------------------------------------------------------------------------
+class SyntheticGrammar(object):
+    """
+    Writes grammar files of a given shape, for benchmarking.
+
+    Each production's LHS is a path of lhsSize vertices. Its RHS keeps the
+    LHS, and adds growth new vertices, each joined by an edge from a vertex
+    chosen at random among the LHS vertices and the new vertices before it,
+    so that the graph grows as a forest of paths. Labels are drawn from an
+    alphabet of numLabels labels with Zipf-like skew: label k is chosen with
+    weight 1/(k+1)**skew, so a skew of 0 makes every label equally likely.
+    The start graph is one path through the LHS of every production, so
+    that every production matches from the start; as nothing is deleted,
+    every match lasts.
+
+    The same parameters and seed always write the same grammar.
+    """
+
+    #--------------------------------------------------------------------------
+    def __init__(self, numProductions:int=20, lhsSize:int=3, numLabels:int=8,
+            skew:float=1.0, growth:int=2, seed:int=0):
+        """
+        Constructor.
+        Inputs:
+            * numProductions - number of productions
+            * lhsSize - number of vertices in each LHS
+            * numLabels - size of the label alphabet
+            * skew - skew of the label distribution (0 is uniform)
+            * growth - number of vertices each production adds
+            * seed - seed of the random choices
+        Outputs: N/A
+        """
+        if numProductions < 1 or lhsSize < 1 or numLabels < 1 or growth < 1:
+            raise ValueError('numProductions, lhsSize, numLabels and growth '
+                'must be at least 1.')
+        self.numProductions = numProductions
+        self.lhsSize = lhsSize
+        self.numLabels = numLabels
+        self.skew = skew
+        self.growth = growth
+        self.seed = seed
+
+    #--------------------------------------------------------------------------
+    def labels(self) -> list:
+        """
+        Returns the label alphabet: A, B, ..., Z, AA, AB, ... (labels may
+        only hold letters).
+        """
+        labels = []
+        for k in range(self.numLabels):
+            label = ''
+            k += 1
+            while k > 0:
+                (k, letter) = divmod(k - 1, 26)
+                label = chr(ord('A') + letter) + label
+            labels.append(label)
+        return labels
+
+    #--------------------------------------------------------------------------
+    def params(self) -> dict:
+        """Returns the parameters, as a dictionary (e.g., for results)."""
+        return { 'productions' : self.numProductions, 'lhs_size' : self.lhsSize,
+            'labels' : self.numLabels, 'skew' : self.skew,
+            'growth' : self.growth, 'seed' : self.seed }
+
+    #--------------------------------------------------------------------------
+    def text(self, config:dict=None) -> str:
+        """
+        Returns the grammar.
+        Inputs: config - configuration options (default: min_vertices of
+            100)
+        Outputs: grammar file contents
+        """
+        rng = random.Random(self.seed)
+        labels = self.labels()
+        weights = [ 1.0 / (k + 1) ** self.skew for k in range(self.numLabels) ]
+        def choose(n):
+            return rng.choices(labels, weights, k=n)
+
+        lhss = [ choose(self.lhsSize) for i in range(self.numProductions) ]
+        lines = [ 'configuration {' ]
+        for (key, value) in sorted((config or { 'min_vertices' : 100 }).items()):
+            lines.append('    %s = %s;' % (key, value))
+        lines.append('}')
+        lines.append('productions {')
+
+        # The start graph: every LHS path, one after another.
+        path = [ '%s%d' % (label, n) for n, label in
+            enumerate((label for lhs in lhss for label in lhs), 1) ]
+        lines.append('    %s;' % self._path(path))
+
+        for lhs in lhss:
+            names = [ '%s%d' % (label, n) for n, label in enumerate(lhs, 1) ]
+            edges = [ self._path(names) ] if len(names) > 1 else []
+            for (n, label) in enumerate(choose(self.growth), len(names) + 1):
+                edges.append('%s->%s%d' % (rng.choice(names), label, n))
+                names.append('%s%d' % (label, n))
+            lhsText = self._path(names[:self.lhsSize])
+            lines.append('    %s ==> %s;' % (lhsText, ', '.join(edges)))
+        lines.append('}')
+        return '\n'.join(lines) + '\n'
+
+    #--------------------------------------------------------------------------
+    def write(self, filename:str, config:dict=None):
+        """
+        Writes the grammar (see text()) to a file.
+        Inputs:
+            * filename - name of the file to write
+            * config - configuration options
+        Outputs: None
+        """
+        with open(filename, 'w') as f:
+            f.write(self.text(config))
+
+    #--------------------------------------------------------------------------
+    # PRIVATE METHODS - These aren't the methods you're looking for.
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _path(names:list) -> str:
+        """Returns the edges of a path through the named vertices."""
+        if len(names) == 1:
+            return names[0]
+        return ', '.join('%s->%s' % (names[i], names[i + 1])
+            for i in range(len(names) - 1))
@@ -0,0 +1,211 @@
+import copy
+import multiprocessing
+import os
+
+from Generator import Generator
+from GrammarCache import GrammarCache
+from GraphWriter import GraphWriter
+
+#------------------------------------------------------------------------------
+class BatchGenerator(object):
+    """
+    Generates many graphs from one grammar with a pool of worker processes.
+    The grammar is parsed once, and the compiled grammar (see GrammarCache)
+    is sent to each worker once, when the pool starts. Each task then
+    generates a chunk of graphs from a copy of the start graph, and either
+    returns them (see generate()) or writes them to the worker's own output
+    file (see generateToFiles()), so nothing but a range of graph numbers
+    goes to a worker per chunk.
+
+    Graph number i is generated by child i of a Generator with the batch's
+    seed (see Generator.spawn()), so it is the same whichever worker, and
+    however many workers, generate it, and can be generated again on its
+    own with generateOne(i).
+
+    Use as a context manager, or call close() when done.
+    """
+
+    #--------------------------------------------------------------------------
+    def __init__(self, grammar:tuple, numWorkers:int=1, seed:int=None):
+        """
+        Constructor. Starts the worker processes, if numWorkers > 1.
+        Inputs:
+            * grammar - (config, startGraph, productions) tuple, as returned
+              by GrammarCache
+            * numWorkers - number of worker processes; with 1, graphs are
+              generated in this process
+            * seed - optional int seed of the batch; if None, one is chosen
+              at random (and kept in self.seed)
+        Outputs: N/A
+        """
+        if numWorkers < 1:
+            raise ValueError('The number of workers must be at least 1.')
+        self.seed = Generator(seed).seed
+        self._grammar = grammar
+        self._numWorkers = numWorkers
+        self._pool = None
+        if numWorkers > 1:
+            self._pool = multiprocessing.Pool(numWorkers, _initWorker,
+                (grammar, self.seed, True))
+
+    #--------------------------------------------------------------------------
+    def __enter__(self):
+        return self
+
+    #--------------------------------------------------------------------------
+    def __exit__(self, *args):
+        self.close()
+
+    #--------------------------------------------------------------------------
+    def close(self):
+        """Stops the worker processes."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    #--------------------------------------------------------------------------
+    @classmethod
+    def fromFile(cls, filename:str, numWorkers:int=1, cache=None, seed:int=None):
+        """
+        Returns a BatchGenerator for a grammar file.
+        Inputs:
+            * filename - name of a graph grammar file
+            * numWorkers - number of worker processes
+            * cache - GrammarCache option, as for
+              Generator.generateFromFile()
+            * seed - optional int seed of the batch
+        Outputs: BatchGenerator
+        """
+        if cache is None or cache is False:
+            grammar = GrammarCache.compile(filename)
+        else:
+            grammar = GrammarCache(None if cache is True else cache).load(filename)
+        return cls(grammar, numWorkers, seed)
+
+    #--------------------------------------------------------------------------
+    def generate(self, count:int):
+        """
+        Generates graphs 0..count-1, in order. The workers work ahead of
+        the graph being yielded, a chunk at a time.
+        Inputs: count - number of graphs to generate
+        Outputs: generator of Graphs
+        """
+        if self._pool is None:
+            _initWorker(self._grammar, self.seed)
+            for i in range(count):
+                yield _generateOne(i)
+            return
+        chunks = self._chunks(count)
+        for graphs in self._pool.imap(_generateTask, chunks):
+            yield from graphs
+
+    #--------------------------------------------------------------------------
+    def generateOne(self, index:int, checkpoint:str=None, resume:bool=False,
+            derivation:str=None):
+        """
+        Generates graph number index of the batch (in this process).
+        Inputs:
+            * index - graph number
+            * checkpoint - optional name of a Checkpoint file to write (see
+              Generator.generate())
+            * resume - if True, continue the run checkpointed in checkpoint
+              instead (see Generator.resume())
+            * derivation - optional name of a DerivationLog file to write
+              (see Generator.generate()); not with resume
+        Outputs: Graph
+        """
+        _initWorker(self._grammar, self.seed)
+        return _generateOne(index, checkpoint, resume, derivation)
+
+    #--------------------------------------------------------------------------
+    def generateToFiles(self, count:int, directory:str, format:str='dot') -> list:
+        """
+        Generates graphs 0..count-1, written by the workers to one file per
+        worker ("graphs-N.EXT" in directory, holding the N'th range of graph
+        numbers) with a GraphWriter.
+        Inputs:
+            * count - number of graphs to generate
+            * directory - directory in which to write the files
+            * format - GraphWriter format of the files
+        Outputs: list of the names of the files written
+        """
+        extension = GraphWriter.find(format).extension
+        os.makedirs(directory, exist_ok=True)
+        shards = []
+        start = 0
+        for i in range(self._numWorkers):
+            n = count // self._numWorkers + (1 if i < count % self._numWorkers else 0)
+            shards.append( (os.path.join(directory, 'graphs-%d.%s' % (i, extension)),
+                format, start, n) )
+            start += n
+        if self._pool is None:
+            _initWorker(self._grammar, self.seed)
+            _writeTask(shards[0])
+        else:
+            self._pool.map(_writeTask, shards, chunksize=1)
+        return [ shard[0] for shard in shards ]
+
+    #--------------------------------------------------------------------------
+    # PRIVATE METHODS - These aren't the methods you're looking for.
+    #--------------------------------------------------------------------------
+    def _chunks(self, count:int) -> list:
+        """
+        Splits graph numbers 0..count-1 into (start, count) chunks: big
+        enough that each task carries a fair amount of work, small enough
+        (about four per worker) that the workers finish at about the same
+        time and graphs arrive steadily.
+        """
+        size = max(1, min(64, count // (4 * self._numWorkers)))
+        return [ (i, min(size, count - i)) for i in range(0, count, size) ]
+
+#------------------------------------------------------------------------------
+# Worker process state and entry points.
+#------------------------------------------------------------------------------
+_workerGrammar = None   # (config, startGraph, productions)
+_workerGenerator = None # Generator whose children generate the graphs
+
+def _initWorker(grammar:tuple, seed:int, inPool:bool=False):
+    """
+    Pool initializer (and, with inPool False, set-up for generating in this
+    process): keeps the grammar and batch seed for every later task. Pool
+    workers can't start pools of their own, so there match_workers is
+    forced to 1; in this process the grammar's match_workers is kept.
+    """
+    global _workerGrammar, _workerGenerator
+    (config, startGraph, productions) = grammar
+    if inPool:
+        config = dict(config, match_workers=1)
+    _workerGrammar = (config, startGraph, productions)
+    _workerGenerator = Generator(seed)
+
+def _generateOne(index:int, checkpoint:str=None, resume:bool=False,
+        derivation:str=None):
+    """Generates graph number index from a copy of the start graph."""
+    (config, startGraph, productions) = _workerGrammar
+    graph = copy.deepcopy(startGraph)
+    generator = _workerGenerator.spawn(index)
+    if resume:
+        generator.resume(graph, productions, config, checkpoint)
+    else:
+        generator.generate(graph, productions, config, checkpoint=checkpoint,
+            derivation=derivation)
+    return graph
+
+def _generateTask(chunk:tuple) -> list:
+    """Generates the graphs of a (start, count) chunk, and returns them."""
+    (start, count) = chunk
+    return [ _generateOne(i) for i in range(start, start + count) ]
+
+def _writeTask(shard:tuple):
+    """
+    Generates graphs into a file.
+    Inputs: (filename, GraphWriter format, first graph number, number of
+        graphs)
+    """
+    (filename, format, start, count) = shard
+    writerClass = GraphWriter.find(format)
+    with open(filename, 'wb' if writerClass.binary else 'w') as f:
+        with writerClass(f) as writer:
+            for i in range(start, start + count):
+                writer.write(_generateOne(i))
@@ -0,0 +1,266 @@
+try:
+    import numpy
+except ImportError:     # NumPy is optional; see suits().
+    numpy = None
+
+from HostIndex import HostIndex
+from Matcher import Matcher
+from MatchPlan import MatchPlan
+
+#------------------------------------------------------------------------------
+class BitsetMatcher(object):
+    """
+    Subgraph search for small LHS patterns, over NumPy arrays. Finds the
+    same matches as Matcher (in another order).
+
+    The host is copied once, from its HostIndex, into arrays: a label number and the out-
+    and in-degree of every vertex (numbered 0..n-1), the successors and
+    predecessors of every vertex as sorted CSR rows, and the sorted edge
+    keys start*n+end. For each step of a MatchPlan, the vertices that may
+    be its image as far as label and degree go are found for the whole host
+    at once, as a boolean mask (label == L & outDegree >= minOut &
+    inDegree >= minIn).
+
+    Instead of backtracking one partial match at a time, every partial
+    match is extended at once: the partial matches are the rows of an
+    array, with one column per mapped step. Each step replaces every row by
+    one row per neighbor of its mapped vertex (or per masked vertex, if the
+    step isn't joined to a mapped one), and then drops, with vectorized
+    tests, the rows whose new vertex is not in the mask, misses one of the
+    step's other edges, is out of the step's orderings, or is already
+    used. So a search takes a few array operations per LHS vertex, however
+    big the host is. If a step would hold more than MAX_ROWS partial
+    matches (say, an LHS vertex joined to no other, which pairs every row
+    with every vertex that fits), the search is left to a Matcher instead,
+    which holds one partial match at a time.
+
+    Setting up the arrays costs about as much as building a HostIndex, so
+    one BitsetMatcher should be used for every full search of the same
+    host; choose() picks between the two for each search.
+    """
+
+    # Largest LHS, and smallest host (in vertices), that are searched with a
+    # BitsetMatcher; see suits(). On smaller hosts the fixed cost of each
+    # array operation outweighs what it saves.
+    MAX_VERTICES = 5
+    MIN_HOST_VERTICES = 500
+
+    # Most partial matches a search holds at once.
+    MAX_ROWS = 1 << 20
+
+    #--------------------------------------------------------------------------
+    def __init__(self, hostIndex:HostIndex):
+        """
+        Constructor.
+        Inputs: hostIndex - HostIndex (or HostGraph) of the graph to search
+        Outputs: N/A
+        """
+        if numpy is None:
+            raise RuntimeError('BitsetMatcher needs NumPy.')
+        self.hostIndex = hostIndex
+
+        # Vertices are numbered in vid order, so that orderings between
+        # their numbers are the orderings between their vids. Labels are
+        # numbered in the order labels() gives them.
+        labels = hostIndex.labels()
+        self._labelNumbers = { label : i for i, label in enumerate(labels) }
+        self._vids = sorted(vid for label in labels
+            for vid in hostIndex.vertices(label))
+        position = { vid : i for i, vid in enumerate(self._vids) }
+        n = len(self._vids)
+
+        # Label number of each vertex.
+        self._labels = numpy.zeros(n, dtype=numpy.int64)
+        for label, i in self._labelNumbers.items():
+            self._labels[[ position[vid] for vid in hostIndex.vertices(label) ]] = i
+
+        # Edges as (start, end) positions (without duplicates), then as CSR
+        # rows in both directions, and as sorted keys.
+        edges = numpy.array([ i for vid in self._vids
+            for end in hostIndex.successors(vid)
+            for i in (position[vid], position[end]) ], dtype=numpy.int64)
+        keys = numpy.unique(edges[0::2] * n + edges[1::2])
+        (starts, ends) = (keys // max(n, 1), keys % max(n, 1))
+        self._outDegrees = numpy.bincount(starts, minlength=n)
+        self._inDegrees = numpy.bincount(ends, minlength=n)
+        byEnd = numpy.lexsort((starts, ends))
+        self._out = (self._offsets(self._outDegrees), ends)
+        self._in = (self._offsets(self._inDegrees), starts[byEnd])
+        self._edgeKeys = keys
+        self._loops = numpy.zeros(n, dtype=bool)
+        self._loops[starts[starts == ends]] = True
+
+    #--------------------------------------------------------------------------
+    @classmethod
+    def choose(cls, plan:MatchPlan, hostIndex:HostIndex, matchers:dict):
+        """
+        Returns the matcher for a full search of the host for plan: a
+        BitsetMatcher if it pays(), otherwise a Matcher.
+        Inputs:
+            * plan - MatchPlan of the LHS to search for
+            * hostIndex - HostIndex (or HostGraph) of the host graph
+            * matchers - {class -> matcher} of the matchers made so far
+              for the host; each is made when first needed, and added
+        Outputs: Matcher or BitsetMatcher
+        """
+        kind = cls if cls.pays(plan, hostIndex) else Matcher
+        matcher = matchers.get(kind)
+        if matcher is None:
+            matcher = matchers[kind] = kind(hostIndex)
+        return matcher
+
+    #--------------------------------------------------------------------------
+    def iterate(self, plan:MatchPlan):
+        """
+        Generates every place where the LHS compiled into plan can be found
+        in the host graph.
+        Inputs: plan - MatchPlan of the LHS to search for
+        Outputs: generator of {vid->vid} (lhs->host) dictionaries
+        """
+        if len(plan) == 0:
+            return
+        steps = plan.steps(self.hostIndex)
+        partials = self._partials(steps)
+        if partials is None:
+            # Too many partial matches to hold at once: backtrack instead.
+            yield from Matcher(self.hostIndex).iterate(plan)
+            return
+        lhsVIDs = [ plan.vids[step[0]] for step in steps ]
+        for row in partials.tolist():
+            yield { lhsVID : self._vids[i] for lhsVID, i in zip(lhsVIDs, row) }
+
+    #--------------------------------------------------------------------------
+    @classmethod
+    def pays(cls, plan:MatchPlan, hostIndex:HostIndex) -> bool:
+        """
+        Returns True if plan suits() a BitsetMatcher of the host, and a
+        Matcher is expected to visit (see MatchPlan.cost()) at least as
+        many partial matches as there are host vertices and edges to copy
+        into arrays. Otherwise setting up the arrays costs more than the
+        search it speeds up.
+        """
+        return cls.suits(plan, hostIndex.numVertices()) and \
+            plan.cost(hostIndex) >= hostIndex.numVertices() + hostIndex.numEdges()
+
+    #--------------------------------------------------------------------------
+    def search(self, plan:MatchPlan) -> list:
+        """
+        Finds every place where the LHS compiled into plan can be found in
+        the host graph.
+        Inputs: plan - MatchPlan of the LHS to search for
+        Outputs: list of {vid->vid} (lhs->host) dictionaries
+        """
+        return list(self.iterate(plan))
+
+    #--------------------------------------------------------------------------
+    @classmethod
+    def suits(cls, plan:MatchPlan, numHostVertices:int) -> bool:
+        """
+        Returns True if NumPy is available, plan's LHS is small enough (at
+        most MAX_VERTICES vertices) and the host big enough (at least
+        MIN_HOST_VERTICES vertices) to search with a BitsetMatcher.
+        """
+        return numpy is not None and 0 < len(plan) <= cls.MAX_VERTICES and \
+            numHostVertices >= cls.MIN_HOST_VERTICES
+
+    #--------------------------------------------------------------------------
+    # PRIVATE METHODS - These aren't the methods you're looking for.
+    #--------------------------------------------------------------------------
+    def _expand(self, partials, position:int, outgoing:bool) -> tuple:
+        """
+        Returns (partials, candidates): each row of partials repeated once
+        per successor (if outgoing) or predecessor of its vertex at
+        position, and that neighbor. Returns (None, None) instead if that
+        would be more than MAX_ROWS rows.
+        """
+        (offsets, values) = self._out if outgoing else self._in
+        sources = partials[:, position]
+        counts = offsets[sources + 1] - offsets[sources]
+        if counts.sum() > self.MAX_ROWS:
+            return (None, None)
+        rows = numpy.repeat(numpy.arange(len(partials)), counts)
+        # The k'th neighbor of a row is at its row offset plus k.
+        firsts = numpy.cumsum(counts) - counts
+        within = numpy.arange(len(rows)) - numpy.repeat(firsts, counts)
+        return (partials[rows], values[numpy.repeat(offsets[sources], counts) + within])
+
+    #--------------------------------------------------------------------------
+    def _hasEdges(self, starts, ends):
+        """Returns a boolean array: whether each start->end is an edge."""
+        if len(self._edgeKeys) == 0:
+            return numpy.zeros(len(starts), dtype=bool)
+        keys = starts * len(self._vids) + ends
+        found = numpy.searchsorted(self._edgeKeys, keys)
+        found = numpy.minimum(found, len(self._edgeKeys) - 1)
+        return self._edgeKeys[found] == keys
+
+    #--------------------------------------------------------------------------
+    def _mask(self, step:tuple):
+        """
+        Returns a boolean array of the vertices whose label and degrees fit
+        step's vertex.
+        """
+        (slot, label, minOut, minIn, edges, orderings) = step
+        if label not in self._labelNumbers:
+            return numpy.zeros(len(self._vids), dtype=bool)
+        mask = self._labels == self._labelNumbers[label]
+        if minOut > 0:
+            mask &= self._outDegrees >= minOut
+        if minIn > 0:
+            mask &= self._inDegrees >= minIn
+        return mask
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _offsets(degrees):
+        """Returns the CSR row offsets for rows of the given lengths."""
+        offsets = numpy.zeros(len(degrees) + 1, dtype=numpy.int64)
+        numpy.cumsum(degrees, out=offsets[1:])
+        return offsets
+
+    #--------------------------------------------------------------------------
+    def _partials(self, steps:list):
+        """
+        Returns an array with one row per match, holding the position of
+        the image of each step, or None if some step would have more than
+        MAX_ROWS partial matches.
+        """
+        partials = numpy.zeros((1, 0), dtype=numpy.int64)
+        for (k, step) in enumerate(steps):
+            (slot, label, minOut, minIn, edges, orderings) = step
+            mask = self._mask(step)
+            backEdges = [ (position, outgoing) for (position, outgoing)
+                in edges if position < k ]
+            if len(backEdges) > 0:
+                (partials, candidates) = self._expand(partials, *backEdges[0])
+                if partials is None:
+                    return None
+                backEdges = backEdges[1:]
+            else:
+                # Not joined to a mapped vertex: every vertex that fits,
+                # for every row.
+                everywhere = numpy.flatnonzero(mask)
+                if len(partials) * len(everywhere) > self.MAX_ROWS:
+                    return None
+                candidates = numpy.tile(everywhere, len(partials))
+                partials = numpy.repeat(partials, len(everywhere), axis=0)
+
+            keep = mask[candidates]
+            for (position, outgoing) in backEdges:
+                if outgoing:
+                    keep &= self._hasEdges(partials[:, position], candidates)
+                else:
+                    keep &= self._hasEdges(candidates, partials[:, position])
+            if any(position == k for (position, outgoing) in edges):
+                keep &= self._loops[candidates]
+            for (position, after) in orderings:
+                if after:
+                    keep &= partials[:, position] < candidates
+                else:
+                    keep &= partials[:, position] > candidates
+            for position in range(k):
+                keep &= partials[:, position] != candidates
+            partials = numpy.column_stack((partials[keep], candidates[keep]))
+            if len(partials) == 0:
+                break
+        return partials
@@ -0,0 +1,223 @@
+import hashlib
+import pickle
+import struct
+import zlib
+
+from Delta import Delta
+from YapyGraph.src.Vertex import Vertex
+
+#------------------------------------------------------------------------------
+class Checkpoint(object):
+    """
+    Append-only checkpoint file of a generation run (see Generator.generate()
+    and Generator.resume()).
+
+    The file starts with a header: magic, format version, a fingerprint of
+    the start graph, productions and config, and the initial state of the
+    random number generator. Every interval steps a record is appended with
+    the step count, the state of the random number generator, the changes
+    made since the last record (the Deltas applied to the host graph, and
+    the MatchIndex log), and the match orders cached by the MatchPlans.
+    So a record costs about as much as the changes it holds, however big
+    the graph has grown.
+
+    Resuming rebuilds the host graph and match index from the start graph
+    by replaying the changes, without searching, and restores the random
+    number generator and match orders of the last record. The run then
+    carries on exactly as it would have from that step. Each header and
+    record is written with a length and a CRC-32, so a record cut short by
+    a crash is recognized (and dropped) on resume. Checkpoint files are
+    pickles: only resume from ones you wrote.
+    """
+
+    MAGIC = b'GGK'
+    FORMAT_VERSION = 2
+
+    _FRAME = struct.Struct('<II')     # payload length, CRC-32
+
+    #--------------------------------------------------------------------------
+    def __init__(self, filename:str, interval:int=1000):
+        """
+        Constructor.
+        Inputs:
+            * filename - name of the checkpoint file
+            * interval - number of steps between records
+        Outputs: N/A
+        """
+        if interval < 1:
+            raise ValueError('checkpoint_interval must be at least 1.')
+        self.filename = filename
+        self.interval = interval
+        self.changes = []       # MatchIndex log since the last record
+        self._deltas = []       # compact Deltas since the last record
+        self._file = None
+        self._lastStep = 0
+
+    #--------------------------------------------------------------------------
+    def close(self):
+        """Closes the file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    #--------------------------------------------------------------------------
+    def due(self, step:int) -> bool:
+        """Returns True if a record should be written before step."""
+        return step - self._lastStep >= self.interval
+
+    #--------------------------------------------------------------------------
+    def record(self, delta:Delta):
+        """
+        Keeps a Delta applied to the host graph, for the next record.
+        """
+        self._deltas.append( (delta.deletedVertices, delta.deletedEdges,
+            [ (v.id, v.label, v.number) for v in delta.addedVertices ],
+            delta.addedEdges) )
+
+    #--------------------------------------------------------------------------
+    def restore(self, hostGraph, matchIndex, productions:list, config:dict,
+            rng) -> int:
+        """
+        Brings a run that has just started (with the same start graph,
+        productions and config as the checkpointed one) up to the last
+        record in the file, which is then appended to.
+        Inputs:
+            * hostGraph - HostGraph of the start graph
+            * matchIndex - MatchIndex of hostGraph, just built, or None
+            * productions - list of Production objects
+            * config - dictionary of options
+            * rng - random.Random of the run
+        Outputs: step count of the last record (0 if none)
+        """
+        with open(self.filename, 'rb') as f:
+            data = f.read()
+        (header, end) = self._frame(data, 0)
+        if header is None or header[0] != self.MAGIC or \
+                header[1] != self.FORMAT_VERSION:
+            raise ValueError('%s is not a checkpoint file.' % self.filename)
+        if header[2] != self._fingerprint(hostGraph, productions, config):
+            raise ValueError('%s is a checkpoint of a different grammar.' %
+                self.filename)
+
+        step = 0
+        rngState = header[3]
+        orders = None
+        while True:
+            (payload, next) = self._frame(data, end)
+            if payload is None:
+                break
+            (step, rngState, deltas, changes, orders) = payload
+            for delta in deltas:
+                self._replay(hostGraph, delta)
+            if matchIndex is not None:
+                matchIndex.replay(changes)
+            end = next
+
+        rng.setstate(rngState)
+        if orders is not None:
+            for (prod, prodOrders) in zip(productions, orders):
+                prod.matchPlan().setOrders(prodOrders)
+        self._lastStep = step
+
+        # Drop anything after the last whole record, and carry on from it.
+        self._file = open(self.filename, 'r+b')
+        self._file.truncate(end)
+        self._file.seek(end)
+        return step
+
+    #--------------------------------------------------------------------------
+    def start(self, hostGraph, productions:list, config:dict, rng):
+        """
+        Creates the file, and writes the header.
+        Inputs:
+            * hostGraph - HostGraph of the start graph
+            * productions - list of Production objects
+            * config - dictionary of options
+            * rng - random.Random of the run, before any choice is made
+        Outputs: None
+        """
+        self._file = open(self.filename, 'wb')
+        self._append( (self.MAGIC, self.FORMAT_VERSION,
+            self._fingerprint(hostGraph, productions, config), rng.getstate()) )
+
+    #--------------------------------------------------------------------------
+    def write(self, step:int, productions:list, rng):
+        """
+        Appends a record of the changes since the last one.
+        Inputs:
+            * step - number of productions applied so far
+            * productions - list of Production objects
+            * rng - random.Random of the run
+        Outputs: None
+        """
+        self._append( (step, rng.getstate(), self._deltas, self.changes,
+            [ prod.matchPlan().orders() for prod in productions ]) )
+        self._deltas = []
+        # The MatchIndex appends to this list, so empty it in place.
+        del self.changes[:]
+        self._lastStep = step
+
+    #--------------------------------------------------------------------------
+    # PRIVATE METHODS - These aren't the methods you're looking for.
+    #--------------------------------------------------------------------------
+    def _append(self, payload):
+        """
+        Appends a framed, pickled payload to the file, and flushes it.
+        """
+        data = pickle.dumps(payload, pickle.HIGHEST_PROTOCOL)
+        self._file.write(self._FRAME.pack(len(data), zlib.crc32(data)))
+        self._file.write(data)
+        self._file.flush()
+
+    #--------------------------------------------------------------------------
+    def _fingerprint(self, hostGraph, productions:list, config:dict) -> bytes:
+        """
+        Returns a hash of the start graph (vertex labels and adjacency, in
+        id order), the productions' rewrite scripts and weights, and the
+        config options (other than checkpoint_interval).
+        """
+        digest = hashlib.sha256()
+        for vid in range(hostGraph.numVertices()):
+            digest.update(repr( (hostGraph.label(vid),
+                list(hostGraph.successors(vid))) ).encode('utf-8'))
+        for prod in productions:
+            script = prod.rewriteScript()
+            digest.update(repr( (script.vids, script.deleteVertices,
+                script.deleteEdges, script.addVertices, script.addEdges,
+                prod.weight) ).encode('utf-8'))
+        digest.update(repr(sorted( (str(key), str(value)) for key, value
+            in config.items() if key != 'checkpoint_interval' )).encode('utf-8'))
+        return digest.digest()
+
+    #--------------------------------------------------------------------------
+    def _frame(self, data:bytes, offset:int) -> tuple:
+        """
+        Returns (payload, end offset) of the frame at offset, or (None,
+        offset) if there isn't a whole, intact one.
+        """
+        start = offset + self._FRAME.size
+        if start > len(data):
+            return (None, offset)
+        (length, crc) = self._FRAME.unpack_from(data, offset)
+        payload = data[start:start + length]
+        if len(payload) != length or zlib.crc32(payload) != crc:
+            return (None, offset)
+        return (pickle.loads(payload), start + length)
+
+    #--------------------------------------------------------------------------
+    def _replay(self, hostGraph, delta:tuple):
+        """
+        Makes the changes of a recorded Delta to hostGraph again, with the
+        same calls as RewriteScript.apply() made.
+        """
+        (deletedVertices, deletedEdges, addedVertices, addedEdges) = delta
+        for vid in deletedVertices:
+            hostGraph.deleteVertex(vid)
+        for (startID, endID) in deletedEdges:
+            hostGraph.deleteEdge(startID, endID)
+        for (vid, label, number) in addedVertices:
+            vertex = hostGraph.addVertex(Vertex(vid, label, number))
+            if vertex.id != vid:
+                raise RuntimeError('Checkpoint replay went astray.')
+        for (startID, endID) in addedEdges:
+            hostGraph.addEdge(startID, endID)
@@ -0,0 +1,28 @@
+#------------------------------------------------------------------------------
+class Delta(object):
+    """
+    Records the changes made to a host graph by a single application of a
+    Production: which vertices and edges were deleted, and which were
+    added. Deleted vertices are recorded by id, added vertices as the Vertex
+    objects added to the graph, and edges as (startID, endID) tuples.
+    Edges that disappear implicitly because one of their vertices was
+    deleted are not listed in deletedEdges.
+    """
+
+    #--------------------------------------------------------------------------
+    def __init__(self):
+        """
+        Constructor. Creates an empty delta.
+        Inputs: none
+        Outputs: N/A
+        """
+        self.deletedVertices = []   # [vid]
+        self.deletedEdges = []      # [(startID, endID)]
+        self.addedVertices = []     # [Vertex]
+        self.addedEdges = []        # [(startID, endID)]
+
+    #--------------------------------------------------------------------------
+    def __str__(self) -> str:
+        return '-V%s -E%s +V%s +E%s' % (self.deletedVertices,
+            self.deletedEdges, [v.id for v in self.addedVertices],
+            self.addedEdges)
@@ -0,0 +1,200 @@
+import hashlib
+
+from HostGraph import HostGraph
+from YapyGraph.src.Graph import Graph
+
+#------------------------------------------------------------------------------
+class DerivationLog(object):
+    """
+    Compact binary log of the derivation of a generated graph: which
+    production was applied where, on every step (see Generator.generate()).
+    Replaying it with the same start graph and productions rebuilds the
+    graph by applying each production's RewriteScript directly, without
+    searching or random choices, so a derivation can be kept instead of
+    the (much bigger) graph, and the graph made again when needed.
+
+    The file is MAGIC, the format version (a little-endian uint32) and a
+    SHA-256 fingerprint of the start graph and the productions' rewrite
+    scripts, followed by one record per step: the production index, then
+    the host id of each LHS vertex (in the order of the RewriteScript's
+    vids), each as an unsigned LEB128 varint. Host ids are those of the
+    HostGraph of the run, which replaying hands out in the same order. A
+    record cut short (by a crash) at the end of the file is ignored.
+    """
+
+    MAGIC = b'GGD'
+    FORMAT_VERSION = 1
+
+    # Size of the write buffer, in bytes.
+    BUFFER = 1 << 16
+
+    #--------------------------------------------------------------------------
+    def __init__(self, filename:str):
+        """
+        Constructor.
+        Inputs: filename - name of the log file
+        Outputs: N/A
+        """
+        self.filename = filename
+        self._file = None
+
+    #--------------------------------------------------------------------------
+    def close(self):
+        """Closes the file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    #--------------------------------------------------------------------------
+    def record(self, production:int, images:list):
+        """
+        Appends the record of one step.
+        Inputs:
+            * production - index of the production applied
+            * images - host id of each LHS vertex, in the order of the
+              production's RewriteScript vids
+        Outputs: None
+        """
+        record = bytearray()
+        for n in [production] + images:
+            while n >= 0x80:
+                record.append((n & 0x7f) | 0x80)
+                n >>= 7
+            record.append(n)
+        self._file.write(record)
+
+    #--------------------------------------------------------------------------
+    @classmethod
+    def records(cls, filename:str, productions:list):
+        """
+        Reads a log without replaying it.
+        Inputs:
+            * filename - name of the log file
+            * productions - list of Production objects of the run
+        Outputs: generator of (production index, images) tuples, as given
+            to record()
+        """
+        with open(filename, 'rb') as f:
+            data = f.read()
+        offset = cls._checkHeader(data, filename, None, productions)
+        return cls._records(data, offset, filename, productions)
+
+    #--------------------------------------------------------------------------
+    @classmethod
+    def replay(cls, filename:str, startGraph:Graph, productions:list) -> int:
+        """
+        Rebuilds a generated graph from its derivation.
+        Inputs:
+            * filename - name of the log file
+            * startGraph - the start graph of the run; it is replaced by the
+              result, as generate() would have left it
+            * productions - list of Production objects of the run
+        Outputs: number of steps replayed
+        """
+        with open(filename, 'rb') as f:
+            data = f.read()
+        hostGraph = HostGraph(startGraph)
+        offset = cls._checkHeader(data, filename, hostGraph, productions)
+        scripts = [ prod.rewriteScript() for prod in productions ]
+        steps = 0
+        for (i, images) in cls._records(data, offset, filename, productions):
+            scripts[i].applyImages(hostGraph, images)
+            steps += 1
+        hostGraph.toGraph(startGraph)
+        return steps
+
+    #--------------------------------------------------------------------------
+    def start(self, hostGraph:HostGraph, productions:list):
+        """
+        Creates the file, and writes the header.
+        Inputs:
+            * hostGraph - HostGraph of the start graph
+            * productions - list of Production objects
+        Outputs: None
+        """
+        self._file = open(self.filename, 'wb', buffering=self.BUFFER)
+        self._file.write(self.MAGIC + self.FORMAT_VERSION.to_bytes(4, 'little') +
+            self._fingerprint(hostGraph, productions))
+
+    #--------------------------------------------------------------------------
+    # PRIVATE METHODS - These aren't the methods you're looking for.
+    #--------------------------------------------------------------------------
+    @classmethod
+    def _checkHeader(cls, data:bytes, filename:str, hostGraph,
+            productions:list) -> int:
+        """
+        Checks the header at the start of data, and the fingerprint too if
+        hostGraph is given. Raises ValueError if they don't match.
+        Outputs: offset of the first record
+        """
+        size = cls._headerSize()
+        if len(data) < size or not data.startswith(cls.MAGIC) or \
+                int.from_bytes(data[3:7], 'little') != cls.FORMAT_VERSION:
+            raise ValueError('%s is not a derivation log.' % filename)
+        if hostGraph is not None and \
+                data[7:size] != cls._fingerprint(hostGraph, productions):
+            raise ValueError('%s is a derivation of a different grammar.' %
+                filename)
+        return size
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _fingerprint(hostGraph:HostGraph, productions:list) -> bytes:
+        """
+        Returns a hash of the start graph (vertex labels and adjacency, in
+        id order) and the productions' rewrite scripts.
+        """
+        digest = hashlib.sha256()
+        for vid in range(hostGraph.numVertices()):
+            digest.update(repr( (hostGraph.label(vid),
+                sorted(hostGraph.successors(vid))) ).encode('utf-8'))
+        for prod in productions:
+            script = prod.rewriteScript()
+            digest.update(repr( (script.vids, script.deleteVertices,
+                script.deleteEdges, script.addVertices, script.addEdges)
+                ).encode('utf-8'))
+        return digest.digest()
+
+    #--------------------------------------------------------------------------
+    @classmethod
+    def _headerSize(cls) -> int:
+        """Returns the size of the header, in bytes."""
+        return len(cls.MAGIC) + 4 + hashlib.sha256().digest_size
+
+    #--------------------------------------------------------------------------
+    @classmethod
+    def _records(cls, data:bytes, offset:int, filename:str, productions:list):
+        """
+        Generates the (production index, images) records in data from
+        offset on, up to the last whole one.
+        """
+        sizes = [ len(prod.rewriteScript().vids) for prod in productions ]
+        while offset < len(data):
+            images = []
+            try:
+                (i, offset) = cls._varint(data, offset)
+                if i >= len(productions):
+                    raise ValueError('%s refers to production %d.' % (filename, i))
+                for k in range(sizes[i]):
+                    (n, offset) = cls._varint(data, offset)
+                    images.append(n)
+            except IndexError:
+                return
+            yield (i, images)
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _varint(data:bytes, offset:int) -> tuple:
+        """
+        Decodes the varint at offset. Raises IndexError if data ends first.
+        Outputs: (value, offset after it)
+        """
+        value = 0
+        shift = 0
+        while True:
+            byte = data[offset]
+            offset += 1
+            value |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                return (value, offset)
+            shift += 7
@@ -0,0 +1,35 @@
+from ProductionStats import ProductionStats
+
+#------------------------------------------------------------------------------
+class GenerationStats(object):
+    """
+    Performance statistics for a generation run, returned by
+    Generator.generate() when asked for: totals for the run, and a
+    ProductionStats for each production, in the order they were given.
+    """
+
+    #--------------------------------------------------------------------------
+    def __init__(self, productions:list):
+        """
+        Constructor.
+        Inputs: productions - list of Production objects
+        Outputs: N/A
+        """
+        self.productions = [ ProductionStats(prod) for prod in productions ]
+        self.steps = 0      # productions applied
+        self.time = 0.0     # total time, in seconds
+        self.stopReason = None  # StopReason the run stopped for
+
+    #--------------------------------------------------------------------------
+    def __str__(self) -> str:
+        """
+        Returns a table of the statistics, one line per production, the
+        most expensive (by search plus apply time) first.
+        """
+        lines = [ '%d steps in %.6fs, stopped on %s' % (self.steps, self.time,
+            self.stopReason) ]
+        ranked = sorted(range(len(self.productions)), key=lambda i:
+            -(self.productions[i].searchTime + self.productions[i].applyTime()))
+        for i in ranked:
+            lines.append('%4d: %s' % (i, self.productions[i]))
+        return '\n'.join(lines)
@@ -1,15 +1,40 @@
 #!/usr/bin/python
 
+import argparse
+import asyncio
+import hashlib
 import logging
 import random
 import sys
+import time
 
 from Parser import Parser
+from BitsetMatcher import BitsetMatcher
+from Checkpoint import Checkpoint
+from DerivationLog import DerivationLog
+from GenerationStats import GenerationStats
+from GrammarCache import GrammarCache
+from GraphWriter import GraphWriter
+from HostGraph import HostGraph
+from HostIndex import HostIndex
 from Lexer import Lexer
+from MatchIndex import MatchIndex
+from Matcher import Matcher
+from ParallelMatcher import ParallelMatcher
 from Production import Production
+from RewriteScript import RewriteScript
+from StepEvent import StepEvent
+from StopConditions import StopConditions
+from StopConditions import StopReason
+from WeightedSampler import WeightedSampler
 from YapyGraph.src.Vertex import Vertex
 from YapyGraph.src.Graph import Graph
 
+# Generation is traced to this logger at DEBUG level: one event per
+# production applied (see generate()). Nothing is configured here; enable
+# it with logging.basicConfig() or by adding a handler.
+_log = logging.getLogger('graphgen')
+
 class Generator(object):
     """
 
@@ -24,56 +49,189 @@ class Generator(object):
     command-line arguments, or call generate() which
     takes a starting graph, list of productions, and a dictionary of
     configuration options.
+
+    Every random choice is made with the Generator's own random.Random,
+    seeded with seed, so a Generator with a given seed always makes the
+    same graph from the same grammar. For batches, spawn() gives child
+    Generators with independent streams that depend only on the seed and
+    the child's index.
     """
 
     #--------------------------------------------------------------------------
-    def generate(self, startGraph:Graph, productions:list, config:dict):
+    def __init__(self, seed:int=None):
+        """
+        Constructor.
+        Inputs: seed - optional int seed; if None, one is chosen at random
+            (and kept in self.seed, so that the run can be repeated)
+        Outputs: N/A
+        """
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.stopReason = None  # StopReason of the last run
+
+    #--------------------------------------------------------------------------
+    async def asyncIterGenerate(self, startGraph:Graph, productions:list,
+            config:dict, interval:int=100, checkpoint:str=None,
+            maxSteps:int=None, maxEdges:int=None, deadline:float=None,
+            memoryLimit:float=None):
+        """
+        Like iterGenerate(), for asyncio: an asynchronous generator of the
+        same StepEvents, which lets other tasks run (by awaiting
+        asyncio.sleep(0)) every interval steps. The steps themselves run in
+        the event loop's thread, so interval bounds how long other tasks
+        wait.
+        Inputs:
+            * interval - number of steps between yields to the event loop
+            * startGraph, productions, config, checkpoint, maxSteps,
+              maxEdges, deadline, memoryLimit - see generate()
+        Outputs: asynchronous generator of StepEvent objects
+        """
+        if interval < 1:
+            raise ValueError('interval must be at least 1.')
+        events = self.iterGenerate(startGraph, productions, config,
+            checkpoint, maxSteps, maxEdges, deadline, memoryLimit)
+        try:
+            for event in events:
+                yield event
+                if (event.step + 1) % interval == 0:
+                    await asyncio.sleep(0)
+        finally:
+            events.close()
+
+    #--------------------------------------------------------------------------
+    def generate(self, startGraph:Graph, productions:list, config:dict,
+            collectStats:bool=False, checkpoint:str=None, maxSteps:int=None,
+            maxEdges:int=None, deadline:float=None, memoryLimit:float=None,
+            derivation:str=None):
         """
         Randomly applies a Production from the given list of Productions to the
         specified starting graph until the graph contains at least the number
         of vertices specified by the config option "min_vertices". This assumes
         that the productions generally increase the number of vertices.
+
+        The run also stops, with the graph reached so far, on any of the
+        limits set by the config options "max_steps", "max_edges",
+        "time_limit" (seconds) and "memory_limit" (megabytes), or by the
+        arguments of the same name, or once no production matches the graph
+        reached (but it is an error if none matches startGraph). Why it
+        stopped is kept in self.stopReason (a StopReason).
         Inputs: 
-            * startGraph - Graph to begin applying transformations
+            * startGraph - Graph to begin applying transformations; it is
+              replaced by the result, with vertex ids "vN"
             * productions - list of Production objects
             * config - dictionary of options
-        Outputs: None
+            * collectStats - if True, time the searches and production
+              applications, and return the statistics
+            * checkpoint - optional name of a Checkpoint file to write, every
+              "checkpoint_interval" (default 1000) steps; see resume()
+            * maxSteps - optional maximum number of steps (productions
+              applied), instead of "max_steps"
+            * maxEdges - optional maximum number of edges, instead of
+              "max_edges"
+            * deadline - optional time.monotonic() time by which to stop,
+              instead of "time_limit"
+            * memoryLimit - optional limit on the peak memory use of the
+              process, in megabytes, instead of "memory_limit"
+            * derivation - optional name of a DerivationLog file in which to
+              record each production applied and where, so that the result
+              can be rebuilt later by DerivationLog.replay()
+        Outputs: GenerationStats if collectStats, otherwise None
         """ 
-        logging.debug('In applyProductions')
-        while startGraph.numVertices < int(config['min_vertices']):
-            # matchingProductions is a list of (Production, mapping) 
-            # pairs where mapping is {vid->vid} dictionary of where 
-            # the production's lhs vertices can be found in startGraph.
-            matchingProductions = self._findMatchingProductions(startGraph, productions)
-            
-            if len(matchingProductions) == 0:
-                raise RuntimeError('No productions match the given graph.')
-
-            # Choose one of the matching productions at random.
-            (prod, mapping) = random.choice(matchingProductions)
-
-            # Apply the chosen production.
-            self._applyProduction(startGraph, prod, mapping)
+        return self._generate(startGraph, productions, config, collectStats,
+            checkpoint, False, StopConditions(config, maxSteps, maxEdges,
+            deadline, memoryLimit), derivation)
 
     #--------------------------------------------------------------------------
-    def generateFromFile(self, filename:str) -> Graph:
+    def generateFromFile(self, filename:str, collectStats:bool=False,
+        cache=None):
         """
         Opens the given grammar file, parses it, then applies its productions
         to its start graph.
-        Inputs: filename is the name of a graph grammar file
-        Outputs: resulting graph
+        Inputs:
+            * filename is the name of a graph grammar file
+            * collectStats - if True, also return statistics (see generate())
+            * cache - whether to use a compiled copy of the grammar from a
+              GrammarCache (and write one if there isn't one): None or False
+              to always parse the file, True to keep cache files next to the
+              grammar file, or the name of a cache directory
+        Outputs: resulting graph, or (graph, GenerationStats) if collectStats
+        """
+        if cache is None or cache is False:
+            grammar = GrammarCache.compile(filename)
+        else:
+            grammar = GrammarCache(None if cache is True else cache).load(filename)
+        (config, startGraph, productions) = grammar
+
+        stats = self.generate(startGraph, productions, config, collectStats)
+        if collectStats:
+            return (startGraph, stats)
+        return startGraph
+
+    #--------------------------------------------------------------------------
+    def iterGenerate(self, startGraph:Graph, productions:list, config:dict,
+            checkpoint:str=None, maxSteps:int=None, maxEdges:int=None,
+            deadline:float=None, memoryLimit:float=None):
+        """
+        Runs generate() one step at a time: generates a StepEvent, giving
+        the production applied, its match and the Delta of the changes, as
+        each production is applied. Host vertex ids in the events are the
+        ids N of the graph being generated, which become "vN" in the result
+        (and may be reused once deleted). So a consumer can rebuild the
+        graph, or stream it elsewhere, by replaying the deltas in order.
+
+        The generator must be run to the end, or closed, before startGraph
+        holds the result; closing it early leaves the graph reached so far
+        in startGraph (and self.stopReason None).
+        Inputs: see generate()
+        Outputs: generator of StepEvent objects
+        """
+        return self._events(startGraph, productions, config, None, checkpoint,
+            False, StopConditions(config, maxSteps, maxEdges, deadline,
+            memoryLimit))
+
+    #--------------------------------------------------------------------------
+    def resume(self, startGraph:Graph, productions:list, config:dict,
+            checkpoint:str, collectStats:bool=False, maxSteps:int=None,
+            maxEdges:int=None, deadline:float=None, memoryLimit:float=None):
+        """
+        Continues a run of generate() from the last record in its checkpoint
+        file, which is then appended to. The result is the graph the run
+        would have made had it not been interrupted.
+        Inputs:
+            * startGraph, productions, config - the same start graph,
+              productions and config as given to generate() (e.g., from
+              parsing the same grammar file again)
+            * checkpoint - name of the Checkpoint file
+            * collectStats - if True, return statistics of the resumed part
+              of the run
+            * maxSteps, maxEdges, deadline, memoryLimit - optional limits
+              (see generate()); maxSteps counts the steps of the whole run
+        Outputs: GenerationStats if collectStats, otherwise None
         """
-        grammarFile = open(filename, 'r')
-        parser = self._parseGrammarFile(grammarFile.read())
-        grammarFile.close()
+        return self._generate(startGraph, productions, config, collectStats,
+            checkpoint, True, StopConditions(config, maxSteps, maxEdges,
+            deadline, memoryLimit))
 
-        self.generate(parser.startGraph, parser.productions, parser.config)
-        return parser.startGraph
+    #--------------------------------------------------------------------------
+    def spawn(self, index:int):
+        """
+        Returns child Generator number index. Its seed is derived from this
+        Generator's seed and index alone (by hashing them), so child i is
+        the same however many children are made, in whatever order or
+        process, and different children (and their own children) have
+        unrelated streams.
+        Inputs: index - child number (an int >= 0)
+        Outputs: Generator
+        """
+        digest = hashlib.sha256(('%d/%d' % (self.seed, index)).encode('ascii')).digest()
+        return Generator(int.from_bytes(digest[:16], 'little'))
 
     #--------------------------------------------------------------------------
     # PRIVATE METHODS - These aren't the methods you're looking for.
     #--------------------------------------------------------------------------
-    def _addNewEdges(self, graph, production, rhsMapping):
+    def _addNewEdges(self, graph, production, rhsMapping, delta=None):
         """
         Adds edges to graph that appear in production.rhs but not in 
         production.lhs. Assumes that all the new vertices in the production.rhs
@@ -83,42 +241,51 @@ class Generator(object):
             * production - Production to apply
             * rhsMapping - {vid->vid} mapping between production.rhs
               and graph
+            * delta - optional Delta in which to record the added edges
         Outputs: None
         """	
-        logging.debug('>>> _addNewEdges <<<')
-        for rhsEdge in production.rhs.edges: # [startVertex,endVertex]
+        _log.debug('>>> _addNewEdges <<<')
+        for rhsEdge in production.rhs().edges(): # [startVertex,endVertex]
             graphStartVID = rhsMapping[rhsEdge[0].id]
             graphEndVID = rhsMapping[rhsEdge[1].id]
             if not graph.hasEdgeBetweenVertices(graphStartVID, graphEndVID):
                 graph.addEdge(graphStartVID, graphEndVID)
-        logging.debug('graph is now %s' % graph)
+                if delta is not None:
+                    delta.addedEdges.append( (graphStartVID, graphEndVID) )
+        _log.debug('graph is now %s', graph)
 
     #--------------------------------------------------------------------------
-    def _addNewVertices(self, graph, production, rhsMapping):
+    def _addNewVertices(self, graph, production, rhsMapping, delta=None):
         """
         Adds vertices to graph that appear in production.rhs but not in 
         production.lhs. New vertices are given a vid of the form 'vN' where
-        N is the number of vertices currently in the graph. New graph vertices
-        are also added to rhsMapping.
+        N is the number of vertices currently in the graph, or the next
+        one up that is free (see RewriteScript.newVertexIDs(); a HostGraph
+        chooses its own ids instead). New graph vertices are also added to
+        rhsMapping.
         Inputs:
             * graph - Graph to which to apply the production
             * production - Production to apply
             * rhshMapping - {vid->vid} mapping from production.rhs to graph.
               This is typically created by _mapRHSToGraph().
+            * delta - optional Delta in which to record the added vertices
         Outputs: nothing
         """
-        logging.debug('>>> _addNewVertices <<<')
-        for rhsVertex in production.rhs.vertices:
-            if rhsVertex.name not in production.lhs.names:
-                logging.debug('name %s in rhs but not lhs' % rhsVertex.label)
-                newVertexID = 'v%s' % graph.numVertices
+        _log.debug('>>> _addNewVertices <<<')
+        ids = RewriteScript.newVertexIDs(graph)
+        for rhsVertex in production.rhs().vertices():
+            if production.lhs().hasVertex(rhsVertex.name) is None:
+                _log.debug('name %s in rhs but not lhs', rhsVertex.label)
+                newVertexID = next(ids)
                 newVertex = graph.addVertex(Vertex(newVertexID, rhsVertex.label, rhsVertex.number))
-                logging.debug('added vertex %s' % newVertex)
-                rhsMapping[rhsVertex.id] = newVertexID
-        logging.debug('graph is now %s' % graph)
+                _log.debug('added vertex %s', newVertex)
+                rhsMapping[rhsVertex.id] = newVertex.id
+                if delta is not None:
+                    delta.addedVertices.append(newVertex)
+        _log.debug('graph is now %s', graph)
 
     #--------------------------------------------------------------------------
-    def _applyProduction(self, graph, production, lhsMapping):
+    def _applyProduction(self, graph, production, lhsMapping, stats=None):
         """
         Applies the given production to the given graph. The general idea is to
         transform the portion of the graph identified by mapping (which 
@@ -129,16 +296,120 @@ class Generator(object):
             production - Production to apply
             lhsMapping - {vid->vid} mapping from production.lhs
                 to graph
-        Outputs: None
+            stats - optional ProductionStats of production, in which to
+                record the time spent in each phase
+        Outputs: Delta describing the changes made to graph
+        """
+        # The production's RewriteScript makes the same changes as
+        # _deleteMissingVertices(), _deleteMissingEdges(), _addNewVertices()
+        # and _addNewEdges() would, but works them out only once.
+        return production.rewriteScript().apply(graph, lhsMapping, stats)
+
+    #--------------------------------------------------------------------------
+    def _chooseMatch(self, hostGraph, matchIndex, productions, sampling,
+            stats=None, selection:str='match'):
+        """
+        Chooses a random (Production, mapping) pair, where mapping is a
+        {vid->vid} dictionary of where the production's lhs can be found in
+        the host graph. The productions are weighted by their weights, as
+        selection says (see WeightedSampler.selection()); "first" sampling
+        only tries the productions in a weighted random order.
+        Inputs:
+            * hostGraph - HostGraph (or HostIndex) of the host graph
+            * matchIndex - MatchIndex of the host graph, or None
+            * productions - list of Production objects
+            * sampling - "none" to choose from matchIndex, "first" to
+              take the first match of a randomized search, or "reservoir"
+              to reservoir-sample every match as it is found
+            * stats - optional GenerationStats in which to record searches
+            * selection - "match", "distinct" or "production"
+        Outputs: (Production, mapping) tuple, or None if nothing matches
+        """
+        if matchIndex is not None:
+            return matchIndex.sample(self.rng)
+
+        if sampling == 'first':
+            matcher = Matcher(hostGraph)
+            for i in self._shuffle(list(range(len(productions))),
+                    [prod.weight for prod in productions]):
+                if not productions[i].matchPlan().applicable(hostGraph):
+                    continue
+                start = time.perf_counter()
+                mapping = matcher.first(productions[i].matchPlan(), self.rng)
+                if stats is not None:
+                    stats.productions[i].recordSearch(time.perf_counter() - start,
+                        0 if mapping is None else 1)
+                if mapping is not None:
+                    return (productions[i], mapping)
+            return None
+
+        # Reservoir sampling: the n'th match of a production found replaces
+        # its choice with probability 1/n, which leaves every match of the
+        # production equally likely. Then one production is chosen.
+        indices = { prod : i for i, prod in enumerate(productions) }
+        choices = [ None ] * len(productions)
+        counts = [ 0 ] * len(productions)
+        for (prod, mapping) in self._iterateMatches(hostGraph, productions, stats):
+            i = indices[prod]
+            counts[i] += 1
+            if self.rng.randrange(counts[i]) == 0:
+                choices[i] = (prod, mapping)
+        choice = WeightedSampler.choose([ WeightedSampler.selection(prod.weight,
+            count, selection, prod.matchPlan().multiplicity)
+            for prod, count in zip(productions, counts) ], self.rng)
+        return None if choice is None else choices[choice[0]]
+
+    #--------------------------------------------------------------------------
+    def _chooseDisjointMatches(self, hostGraph, matchIndex, productions,
+            stats=None):
+        """
+        Chooses a random maximal set of (Production, mapping) pairs whose
+        footprints are disjoint, where the footprint of a match is its host
+        vertices and the edges adjacent to them. So no two chosen matches
+        share a vertex, or are joined by an edge. Matches of productions
+        with higher weights tend to be taken first; matches of productions
+        with weight 0 are never taken.
+        Inputs:
+            * hostGraph - HostGraph (or HostIndex) of the host graph
+            * matchIndex - MatchIndex of the host graph, or None to search
+            * productions - list of Production objects
+            * stats - optional GenerationStats in which to record searches
+        Outputs: list of (Production, mapping) tuples
+        """
+        if matchIndex is not None:
+            matches = matchIndex.matches()
+        else:
+            matches = list(self._iterateMatches(hostGraph, productions, stats))
+        matches = self._shuffle(matches, [prod.weight for (prod, mapping) in matches])
+
+        # Greedily take each match (in random order) that doesn't touch the
+        # footprint of one already taken. blocked holds the vertices of the
+        # matches taken so far, and their neighbors.
+        chosen = []
+        blocked = set()
+        for (prod, mapping) in matches:
+            if any(vid in blocked for vid in mapping.values()):
+                continue
+            chosen.append((prod, mapping))
+            for vid in mapping.values():
+                blocked.add(vid)
+                blocked.update(hostGraph.successors(vid))
+                blocked.update(hostGraph.predecessors(vid))
+        return chosen
+
+    #--------------------------------------------------------------------------
+    def _deleteEdge(self, graph, startVID, endVID, delta):
+        """
+        Deletes the edge from startVID to endVID from graph, recording it in
+        delta (if given).
         """
-        rhsMapping = self._mapRHSToGraph(graph, production, lhsMapping)
-        self._deleteMissingVertices(graph, production, lhsMapping)
-        self._deleteMissingEdges(graph, production, lhsMapping, rhsMapping)
-        self._addNewVertices(graph, production, rhsMapping)
-        self._addNewEdges(graph, production, rhsMapping)
+        graph.deleteEdge(startVID, endVID)
+        if delta is not None:
+            delta.deletedEdges.append( (startVID, endVID) )
 
     #--------------------------------------------------------------------------
-    def _deleteMissingEdges(self, graph, production, lhsMapping, rhsMapping):
+    def _deleteMissingEdges(self, graph, production, lhsMapping, rhsMapping,
+        delta=None):
         """
         Deletes edges from graph that appear in production.lhs but not in 
         production.rhs. Assumes new vertices on rhs have been added to
@@ -150,10 +421,16 @@ class Generator(object):
               to graph
             * rhsMapping - {vid->vid} mapping from production.rhs
               to graph
+            * delta - optional Delta in which to record the deleted edges
         Outputs: None
         """
-        logging.debug('>>> _deleteMissingEdges <<<')
-        for lhsEdge in production.lhs.edges:    # [startVertex,endVertex]
+        _log.debug('>>> _deleteMissingEdges <<<')
+        for lhsEdge in production.lhs().edges():    # [startVertex,endVertex]
+
+            # Edges of deleted vertices have already gone with them.
+            if delta is not None and (lhsMapping[lhsEdge[0].id] in delta.deletedVertices
+                    or lhsMapping[lhsEdge[1].id] in delta.deletedVertices):
+                continue
 
             # Find the starting and ending vertices of the corresponding edge in graph.
             graphStartVID = lhsMapping[lhsEdge[0].id]
@@ -164,8 +441,8 @@ class Generator(object):
             # doesn't exist either, so delete it from graph.
             rhsStart = [rhsID for rhsID,graphID in rhsMapping.items() if graphID == graphStartVID]
             if len(rhsStart) == 0:
-                logging.debug('edge start from %s to %s does not appear in rhs' % (lhsEdge[0], lhsEdge[1]))
-                graph.deleteEdge(graphStartVID, graphEndVID)
+                _log.debug('edge start from %s to %s does not appear in rhs', lhsEdge[0], lhsEdge[1])
+                self._deleteEdge(graph, graphStartVID, graphEndVID, delta)
                 continue
 
             # Try to find the corresponding ending vertex in the rhs (if it
@@ -173,21 +450,21 @@ class Generator(object):
             # doesn't exist either, so delete it from graph.
             rhsEnd = [rhsID for rhsID,graphID in rhsMapping.items() if graphID == graphEndVID]
             if len(rhsEnd) == 0:
-                logging.debug('edge end from %s to %s does not appear in rhs' % (lhsEdge[0], lhsEdge[1]))
-                graph.deleteEdge(graphStartVID, graphEndVID)
+                _log.debug('edge end from %s to %s does not appear in rhs', lhsEdge[0], lhsEdge[1])
+                self._deleteEdge(graph, graphStartVID, graphEndVID, delta)
                 continue
 
             # We found both rhs vertices, but are they connected with an
             # edge? If not, the delete the edge from graph.
-            if not production.rhs.hasEdgeBetweenVertices(rhsStart[0], rhsEnd[0]):
-                logging.debug('edge from %s to %s does not appear in rhs' % (lhsEdge[0], lhsEdge[1]))
-                logging.debug('deleting edge from %s to %s' % (graphStartVID, graphEndVID))
-                graph.deleteEdge(graphStartVID, graphEndVID)
+            if not production.rhs().hasEdgeBetweenVertices(rhsStart[0], rhsEnd[0]):
+                _log.debug('edge from %s to %s does not appear in rhs', lhsEdge[0], lhsEdge[1])
+                _log.debug('deleting edge from %s to %s', graphStartVID, graphEndVID)
+                self._deleteEdge(graph, graphStartVID, graphEndVID, delta)
 
-        logging.debug('graph is now %s' % graph)
+        _log.debug('graph is now %s', graph)
 
     #--------------------------------------------------------------------------
-    def _deleteMissingVertices(self, graph, production, lhsMapping):
+    def _deleteMissingVertices(self, graph, production, lhsMapping, delta=None):
         """
         Deletes vertices from graph that appear in production.lhs but not in 
         production.rhs. It also deletes all edges to lead to or from the
@@ -197,21 +474,30 @@ class Generator(object):
             * production - Production to apply
             * lhsMapping - {vid->vid} mapping between production.lhs
                     and graph
+            * delta - optional Delta in which to record the deleted vertices
         Outputs: None
         """
-        logging.debug('>>> _deleteMissingVertices <<<')
-        for lhsVertex in production.lhs.vertices:
-            if not production.rhs.findVertex(lhsVertex.name):
+        _log.debug('>>> _deleteMissingVertices <<<')
+        for lhsVertex in production.lhs().vertices():
+            if production.rhs().hasVertex(lhsVertex.name) is None:
                 graphVertexID = lhsMapping[lhsVertex.id]
-                logging.debug('deleting vertex %s' % graphVertexID)
+                _log.debug('deleting vertex %s', graphVertexID)
                 graph.deleteVertex(graphVertexID)
+                if delta is not None:
+                    delta.deletedVertices.append(graphVertexID)
 
     #--------------------------------------------------------------------------
     def _findMatchingProductions(self, graph:Graph, productions:list) -> list:
         """
         Finds all the productions whose LHS graph can be found in graph. A
         production LHS matches if the text-only labels (e.g., "A") and the
-        edges match (i.e., searching doesn't use the vertex number).
+        edges match (i.e., searching doesn't use the vertex number). Each
+        search follows the production's compiled MatchPlan, which starts
+        from the LHS vertices that are cheapest to find in graph, with the
+        matcher that BitsetMatcher.choose() picks (as in MatchIndex.build()).
+        Productions whose LHS needs more vertices with some label, or a
+        larger degree, than graph has (see MatchPlan.applicable()) aren't
+        searched at all.
         Inputs: 
             * graph - Graph to search
             * productions - list of Production objects to search
@@ -219,22 +505,241 @@ class Generator(object):
             is a Production whose LHS can be found in graph, and mapping is
             a {vid->vid} dictionary (LHS->graph) of where the LHS can be found.
         """
-        logging.debug('In _findMatchingProductions')
+        _log.debug('In _findMatchingProductions')
+        hostIndex = HostIndex(graph)
+        matchers = {}
         solutions = []
         for prod in productions:
-            logging.debug('Checking production LHS %s ' % prod.lhs())
+            _log.debug('Checking production LHS %s ', prod.lhs())
 
             # Find all places where prod.lhs can be found in the graph.
-            listOfMatches = graph.search(prod.lhs())
+            plan = prod.matchPlan()
+            if not plan.applicable(hostIndex):
+                listOfMatches = []
+            else:
+                listOfMatches = BitsetMatcher.choose(plan, hostIndex,
+                    matchers).search(plan)
             if len(listOfMatches) > 0:
                 for match in listOfMatches:
                     solutions.append( (prod, match) )
-                    logging.debug('Production %s matches' % prod.lhs())
+                    _log.debug('Production %s matches', prod.lhs())
             else:
-                    logging.debug('Production %s does not match' % prod.lhs())
-        logging.debug('Out _findMatchingProductions')
+                    _log.debug('Production %s does not match', prod.lhs())
+        _log.debug('Out _findMatchingProductions')
         return solutions
 
+    #--------------------------------------------------------------------------
+    def _events(self, startGraph:Graph, productions:list, config:dict,
+            stats:GenerationStats, checkpoint:str, resuming:bool,
+            conditions:StopConditions, derivation:str=None):
+        """
+        Does the work of generate(), resume() and iterGenerate(): generates
+        a StepEvent for each production applied. If the caller stops early,
+        closing the generator still copies the graph reached back into
+        startGraph.
+        """
+        _log.debug('In applyProductions')
+        self.stopReason = None
+        if startGraph.numVertices() >= conditions.minVertices:
+            self.stopReason = StopReason.MIN_VERTICES
+            if stats is not None:
+                stats.stopReason = self.stopReason
+            if derivation is not None:
+                # An empty derivation, which replays to startGraph.
+                derivationLog = DerivationLog(derivation)
+                derivationLog.start(HostGraph(startGraph), productions)
+                derivationLog.close()
+            return
+        started = time.perf_counter()
+
+        # How to choose a match on each step: "none" enumerates every match
+        # (using a match index), "first" takes the first match of a
+        # randomized search, and "reservoir" reservoir-samples the matches
+        # as they are found. Only "none" and "reservoir" choose uniformly
+        # among all matches.
+        sampling = config.get('match_sampling', 'none')
+        if sampling not in ('none', 'first', 'reservoir'):
+            raise ValueError('Unknown match_sampling "%s".' % sampling)
+
+        # How many productions to apply on each step: "sequential" applies
+        # one, "parallel" applies a random maximal set of matches that don't
+        # overlap (see _chooseDisjointMatches()), so that the graph grows
+        # everywhere at once, like an L-system.
+        rewriting = config.get('rewriting', 'sequential')
+        if rewriting not in ('sequential', 'parallel'):
+            raise ValueError('Unknown rewriting "%s".' % rewriting)
+
+        # How the production weights count (see WeightedSampler.selection()):
+        # "match" makes each match as likely as its production's weight,
+        # "distinct" does too but counts symmetric matches once (see
+        # MatchPlan), "production" chooses among the matching productions
+        # by weight.
+        selection = config.get('selection', 'match')
+        if selection not in WeightedSampler.SELECTIONS:
+            raise ValueError('Unknown selection "%s".' % selection)
+
+        # matchIndex holds every (Production, mapping) pair where mapping
+        # is a {vid->vid} dictionary of where the production's lhs vertices
+        # can be found in startGraph. It is searched in full only once, and
+        # then updated with the changes made by each production.
+        #
+        # With "match_workers" > 1, the full search that builds the match
+        # index is spread over a pool of processes. Searches made on every
+        # step ("first" and "reservoir" sampling) stay in this process:
+        # handing the pool the host graph would cost O(V+E) a step.
+        numWorkers = int(config.get('match_workers', 1))
+        if numWorkers < 1:
+            raise ValueError('match_workers must be at least 1.')
+        parallelMatcher = None
+        if numWorkers > 1 and sampling == 'none':
+            parallelMatcher = ParallelMatcher(productions, numWorkers)
+
+        # Match orders cached by earlier runs would change the order in
+        # which matches are found, and so what a seed generates.
+        for prod in productions:
+            prod.matchPlan().reset()
+
+        # Productions are applied to a compact copy of startGraph, which is
+        # copied back at the end. It is also the index that searches use.
+        # Its labels are numbered as in the grammar's SymbolTable, if the
+        # productions were parsed with one, so that searches compare label
+        # ids.
+        symbols = next((prod.symbols for prod in productions
+            if prod.symbols is not None), None)
+        hostGraph = HostGraph(startGraph, symbols)
+        checkpointer = None
+        derivationLog = None
+        try:
+            if derivation is not None:
+                derivationLog = DerivationLog(derivation)
+                derivationLog.start(hostGraph, productions)
+
+            matchIndex = None
+            if sampling == 'none':
+                matchIndex = MatchIndex(productions, hostGraph, stats, selection)
+                matchIndex.build(parallelMatcher)
+            if parallelMatcher is not None:
+                # That was its only search.
+                parallelMatcher.close()
+                parallelMatcher = None
+
+            # A checkpoint records the changes made from here on; resuming
+            # makes them again, to get back to where the last record was
+            # written.
+            step = 0
+            if checkpoint is not None:
+                checkpointer = Checkpoint(checkpoint,
+                    int(config.get('checkpoint_interval', 1000)))
+                if resuming:
+                    step = checkpointer.restore(hostGraph, matchIndex,
+                        productions, config, self.rng)
+                else:
+                    checkpointer.start(hostGraph, productions, config, self.rng)
+                if matchIndex is not None:
+                    matchIndex.log = checkpointer.changes
+
+            tracing = _log.isEnabledFor(logging.DEBUG)
+            indices = { prod : i for i, prod in enumerate(productions) }
+            firstStep = step
+            while True:
+                self.stopReason = conditions.check(step, hostGraph)
+                if self.stopReason is not None:
+                    break
+                if checkpointer is not None and checkpointer.due(step):
+                    checkpointer.write(step, productions, self.rng)
+
+                # Choose one (or, when rewriting in parallel, a set) of the
+                # matching productions at random.
+                if rewriting == 'parallel':
+                    choices = self._chooseDisjointMatches(hostGraph,
+                        matchIndex, productions, stats)
+                else:
+                    choice = self._chooseMatch(hostGraph, matchIndex,
+                        productions, sampling, stats, selection)
+                    choices = [] if choice is None else [choice]
+                if len(choices) == 0:
+                    if step == 0:
+                        raise RuntimeError('No productions match the given graph.')
+                    # The grammar has stalled: stop with the graph reached.
+                    self.stopReason = StopReason.NO_MATCH
+                    break
+
+                # Apply the chosen productions, and update the match index.
+                # The matches don't overlap, so applying one leaves the
+                # others intact. Stop early if a stop condition is met.
+                for (i, (prod, mapping)) in enumerate(choices):
+                    if i > 0 and conditions.check(step, hostGraph) is not None:
+                        break
+                    if derivationLog is not None:
+                        derivationLog.record(indices[prod], [ mapping[vid]
+                            for vid in prod.rewriteScript().vids ])
+                    delta = self._applyProduction(hostGraph, prod, mapping,
+                        None if stats is None else stats.productions[indices[prod]])
+                    if matchIndex is not None:
+                        matchIndex.update(delta)
+                    if checkpointer is not None:
+                        checkpointer.record(delta)
+                    if tracing:
+                        self._trace(step, indices[prod], mapping, delta)
+                    step += 1
+                    yield StepEvent(step - 1, indices[prod], mapping, delta)
+        finally:
+            if parallelMatcher is not None:
+                parallelMatcher.close()
+            if checkpointer is not None:
+                checkpointer.close()
+            if derivationLog is not None:
+                derivationLog.close()
+            hostGraph.toGraph(startGraph)
+
+        if stats is not None:
+            stats.steps = step - firstStep
+            stats.stopReason = self.stopReason
+            stats.time = time.perf_counter() - started
+
+    #--------------------------------------------------------------------------
+    def _generate(self, startGraph:Graph, productions:list, config:dict,
+            collectStats:bool, checkpoint:str, resuming:bool,
+            conditions:StopConditions, derivation:str=None):
+        """
+        Does the work of generate() and resume().
+        """
+        stats = GenerationStats(productions) if collectStats else None
+        for event in self._events(startGraph, productions, config, stats,
+                checkpoint, resuming, conditions, derivation):
+            pass
+        return stats
+
+    #--------------------------------------------------------------------------
+    def _iterateMatches(self, hostIndex, productions:list, stats=None):
+        """
+        Generates (Production, mapping) for every match of every production,
+        recording the search for each production in stats, if given.
+        Productions that can't match (see MatchPlan.applicable()) are
+        skipped. Each production is searched with the matcher that
+        BitsetMatcher.choose() picks, as in MatchIndex.build().
+        Inputs:
+            * hostIndex - HostGraph (or HostIndex) of the host graph
+            * productions - list of Production objects
+            * stats - optional GenerationStats
+        Outputs: generator of (Production, mapping) tuples
+        """
+        matchers = {}
+        for i, prod in enumerate(productions):
+            plan = prod.matchPlan()
+            if not plan.applicable(hostIndex):
+                continue
+            search = BitsetMatcher.choose(plan, hostIndex, matchers)
+            if stats is None:
+                for mapping in search.iterate(plan):
+                    yield (prod, mapping)
+                continue
+            start = time.perf_counter()
+            found = list(search.iterate(plan))
+            stats.productions[i].recordSearch(time.perf_counter() - start, len(found))
+            for mapping in found:
+                yield (prod, mapping)
+
     #--------------------------------------------------------------------------
     def _mapRHSToGraph(self, graph, production, lhsMapping):
         """
@@ -254,9 +759,9 @@ class Generator(object):
         """
         rhsMapping = {}
 
-        for rhsVertex in production.rhs.vertices():
-            if rhsVertex.name in production.lhs.names:
-                lhsVertex = production.lhs.findVertex(rhsVertex.name)
+        for rhsVertex in production.rhs().vertices():
+            lhsVertex = production.lhs().hasVertex(rhsVertex.name)
+            if lhsVertex is not None:
                 rhsMapping[rhsVertex.id] = lhsMapping[lhsVertex.id] 
         return rhsMapping
 
@@ -271,11 +776,132 @@ class Generator(object):
         p.parse()
         return p
 
-# debug, info, warning, error and critical
-logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+    #--------------------------------------------------------------------------
+    def _shuffle(self, items:list, weights:list) -> list:
+        """
+        Returns the items in a random order. If they don't all have a
+        weight of 1, it is a weighted order: each item is given the key
+        u**(1/weight), for a random u, and the items are sorted by
+        decreasing key (Efraimidis and Spirakis), so an item with twice the
+        weight of another is twice as likely to come first. Items of weight
+        0 are left out.
+        Inputs:
+            * items - list of items, which may be shuffled in place
+            * weights - weight of each item
+        Outputs: list of items
+        """
+        if all(weight == 1 for weight in weights):
+            self.rng.shuffle(items)
+            return items
+        keys = [ (self.rng.random() ** (1.0 / weight), n)
+            for n, weight in enumerate(weights) if weight > 0 ]
+        keys.sort(reverse=True)
+        return [ items[n] for (key, n) in keys ]
+
+    #--------------------------------------------------------------------------
+    def _trace(self, step:int, production:int, mapping:dict, delta):
+        """
+        Logs the application of a production as a DEBUG event. The message
+        is short; the same data is attached to the log record as the
+        attributes step, production, match and delta, for handlers that want
+        it structured.
+        Inputs:
+            * step - number of productions applied before this one
+            * production - index of the production in the list given to
+              generate()
+            * mapping - {vid->vid} (lhs->host) match that was rewritten
+            * delta - Delta of the changes made
+        Outputs: None
+        """
+        _log.debug('step %d: production %d at %s: %s', step, production,
+            sorted(mapping.values()), delta, extra={ 'step' : step,
+            'production' : production, 'match' : mapping, 'delta' : delta })
+
+#------------------------------------------------------------------------------
+def main(argv:list) -> int:
+    """
+    Command-line entry point: generates one or more graphs from a grammar
+    file, and writes them to standard output (or to files, one per
+    worker).
+    Inputs: argv - command-line arguments, without the program name
+    Outputs: exit status
+    """
+    parser = argparse.ArgumentParser(prog='Generator.py',
+        description='Generates graphs from a graph grammar.')
+    parser.add_argument('grammar', metavar='GRAMMAR_FILE',
+        help='graph grammar file')
+    parser.add_argument('--count', type=int, default=1,
+        help='number of graphs to generate (default 1)')
+    parser.add_argument('--jobs', type=int, default=1,
+        help='number of worker processes (default 1)')
+    parser.add_argument('--seed', type=int,
+        help='seed of the random choices; graph N of a batch depends only on '
+            'the seed and N (default: chosen at random, and reported)')
+    parser.add_argument('--format', default='dot',
+        choices=['binary', 'dot', 'edgelist', 'graphml'],
+        help='output format (default dot)')
+    parser.add_argument('--output', metavar='DIR',
+        help='write the graphs to DIR/graphs-N.EXT, one file per worker, '
+            'instead of to standard output')
+    parser.add_argument('--cache', nargs='?', const=True, metavar='DIR',
+        help='use a compiled copy of the grammar, kept next to the grammar '
+            'file or in DIR')
+    parser.add_argument('--checkpoint', metavar='FILE',
+        help='write checkpoints of the run to FILE (one graph only)')
+    parser.add_argument('--resume', action='store_true',
+        help='continue the run checkpointed in the --checkpoint FILE')
+    parser.add_argument('--derivation', metavar='FILE',
+        help='record the derivation of the graph in FILE (one graph only)')
+    parser.add_argument('--replay', metavar='FILE',
+        help='instead of generating, rebuild the graph whose derivation is '
+            'in FILE')
+    args = parser.parse_args(argv)
+    if args.count < 0 or args.jobs < 1:
+        parser.error('--count must be at least 0 and --jobs at least 1')
+    if args.checkpoint is not None and (args.count != 1 or args.output is not None):
+        parser.error('--checkpoint generates one graph, to standard output')
+    if args.resume and args.checkpoint is None:
+        parser.error('--resume needs --checkpoint')
+    if args.derivation is not None and (args.count != 1 or
+            args.output is not None or args.resume):
+        parser.error('--derivation generates one graph, to standard output, '
+            'and can\'t --resume')
+    writerClass = GraphWriter.find(args.format)
+
+    if args.replay is not None:
+        if args.cache is None:
+            grammar = GrammarCache.compile(args.grammar)
+        else:
+            grammar = GrammarCache(None if args.cache is True
+                else args.cache).load(args.grammar)
+        (config, graph, productions) = grammar
+        DerivationLog.replay(args.replay, graph, productions)
+        with writerClass(sys.stdout.buffer if writerClass.binary
+                else sys.stdout) as writer:
+            writer.write(graph)
+        return 0
+
+    # BatchGenerator uses Generator, so it can't be imported at the top.
+    from BatchGenerator import BatchGenerator
+    with BatchGenerator.fromFile(args.grammar, args.jobs, args.cache,
+            args.seed) as batch:
+        if args.seed is None and not args.resume:
+            print('seed %d' % batch.seed, file=sys.stderr)
+        if args.output is not None:
+            batch.generateToFiles(args.count, args.output, args.format)
+            return 0
+        if args.checkpoint is not None or args.derivation is not None:
+            graphs = [ batch.generateOne(0, args.checkpoint, args.resume,
+                args.derivation) ]
+        else:
+            graphs = batch.generate(args.count)
+        with writerClass(sys.stdout.buffer if writerClass.binary
+                else sys.stdout) as writer:
+            for graph in graphs:
+                writer.write(graph)
+    return 0
+
 if __name__ == '__main__':
-    if len(sys.argv) != 2:
-        print >> sys.stderr, "Usage: %s GRAMMAR_FILE" % sys.argv[0]
-        sys.exit(1)
-    e = Generator()
-    e.generateFromFile(sys.argv[1])
+    # debug, info, warning, error and critical
+    logging.basicConfig(stream=sys.stderr, level=logging.WARNING)
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,160 @@
+import hashlib
+import logging
+import mmap
+import os
+import pickle
+import tempfile
+
+from Lexer import Lexer
+from Parser import Parser
+
+_log = logging.getLogger('graphgen')
+
+#------------------------------------------------------------------------------
+class GrammarCache(object):
+    """
+    On-disk cache of compiled grammars. A compiled grammar is the
+    (config, startGraph, productions) tuple that parsing a grammar file
+    gives, with each production's MatchPlan and RewriteScript already
+    worked out.
+
+    A cache file holds a header (magic, format version and the SHA-256 of
+    the grammar file's contents) followed by the pickled grammar, and is
+    read back with a single read. It is only used if the header matches the
+    grammar file as it is now, so editing the grammar (or changing the
+    format) makes the cache file stale rather than wrong. Cache files are
+    pickles: only load ones you wrote.
+
+    Cache files are written either next to the grammar file (as
+    GRAMMAR_FILE.ggc) or, if a cache directory is given, there, named by
+    the hash. Failing to write one is not an error.
+    """
+
+    # Bump when anything that is pickled into a cache file changes.
+    FORMAT_VERSION = 6
+
+    MAGIC = b'GGC'
+    _HEADER = len(MAGIC) + 4 + 32   # magic, version, SHA-256
+
+    #--------------------------------------------------------------------------
+    def __init__(self, directory:str=None):
+        """
+        Constructor.
+        Inputs: directory - optional cache directory; if None, cache files
+            are written next to the grammar files
+        Outputs: N/A
+        """
+        self.directory = directory
+
+    #--------------------------------------------------------------------------
+    def load(self, filename:str) -> tuple:
+        """
+        Returns the compiled grammar of a grammar file: from its cache file
+        if there is a valid one, otherwise by parsing the grammar file (and
+        then writing a cache file).
+        Inputs: filename - name of a graph grammar file
+        Outputs: (config, startGraph, productions) tuple
+        """
+        digest = self._digest(filename)
+        path = self.path(filename, digest)
+        grammar = self._read(path, digest)
+        if grammar is None:
+            grammar = self.compile(filename)
+            self._write(path, digest, grammar)
+        return grammar
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def compile(filename:str) -> tuple:
+        """
+        Parses a grammar file and compiles its productions, without caching.
+        Inputs: filename - name of a graph grammar file
+        Outputs: (config, startGraph, productions) tuple
+        """
+        lexer = Lexer.fromFile(filename)
+        try:
+            parser = Parser(lexer)
+            parser.parse()
+        finally:
+            lexer.close()
+        for prod in parser.productions:
+            prod.matchPlan()
+            prod.rewriteScript()
+        return (parser.config, parser.startGraph, parser.productions)
+
+    #--------------------------------------------------------------------------
+    def path(self, filename:str, digest:bytes) -> str:
+        """
+        Returns the name of the cache file for a grammar file.
+        Inputs:
+            * filename - name of the grammar file
+            * digest - SHA-256 of its contents
+        Outputs: name of the cache file
+        """
+        if self.directory is None:
+            return filename + '.ggc'
+        return os.path.join(self.directory, '%s.v%d.ggc' % (digest.hex(),
+            self.FORMAT_VERSION))
+
+    #--------------------------------------------------------------------------
+    # PRIVATE METHODS - These aren't the methods you're looking for.
+    #--------------------------------------------------------------------------
+    def _digest(self, filename:str) -> bytes:
+        """
+        Returns the SHA-256 of the contents of a file.
+        """
+        with open(filename, 'rb') as f:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    return hashlib.sha256(buffer).digest()
+            except ValueError:
+                # An empty file can't be mapped.
+                return hashlib.sha256(b'').digest()
+
+    #--------------------------------------------------------------------------
+    def _header(self, digest:bytes) -> bytes:
+        """
+        Returns the header of a cache file for a grammar with the given
+        digest.
+        """
+        return self.MAGIC + self.FORMAT_VERSION.to_bytes(4, 'little') + digest
+
+    #--------------------------------------------------------------------------
+    def _read(self, path:str, digest:bytes) -> tuple:
+        """
+        Returns the grammar in cache file path, or None if there is no such
+        file or it isn't for this version of the grammar (or format).
+        """
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        if data[:self._HEADER] != self._header(digest):
+            return None
+        try:
+            return pickle.loads(memoryview(data)[self._HEADER:])
+        except Exception as e:
+            _log.warning('ignoring unreadable grammar cache %s: %s', path, e)
+            return None
+
+    #--------------------------------------------------------------------------
+    def _write(self, path:str, digest:bytes, grammar:tuple):
+        """
+        Writes grammar to cache file path. The file is written under a
+        temporary name and then renamed, so a reader never sees part of one.
+        """
+        directory = os.path.dirname(path) or '.'
+        try:
+            os.makedirs(directory, exist_ok=True)
+            (fd, temp) = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(self._header(digest))
+                    pickle.dump(grammar, f, pickle.HIGHEST_PROTOCOL)
+                os.replace(temp, path)
+            except BaseException:
+                os.remove(temp)
+                raise
+        except OSError as e:
+            _log.debug('could not write grammar cache %s: %s', path, e)
@@ -0,0 +1,307 @@
+import struct
+from array import array
+from xml.sax.saxutils import escape
+from xml.sax.saxutils import quoteattr
+
+from YapyGraph.src.Graph import Graph
+from YapyGraph.src.Vertex import Vertex
+
+#------------------------------------------------------------------------------
+class GraphWriter(object):
+    """
+    Writes a stream of graphs to an open file, one after another, in some
+    format (see the subclasses, and create()). Each graph is written piece
+    by piece into a buffer that is written to the file whenever it holds
+    about CHUNK characters (or bytes), so no graph is ever turned into one
+    big string. Call close() (or use as a context manager) to write the
+    end of the stream and what is left in the buffer; the file itself is
+    left open.
+    """
+
+    # Whether the file must be opened in binary mode.
+    binary = False
+
+    # File name extension of the format.
+    extension = 'txt'
+
+    # Buffer size, in characters (or bytes), at which the buffer is written.
+    CHUNK = 1 << 16
+
+    #--------------------------------------------------------------------------
+    def __init__(self, f):
+        """
+        Constructor. Writes the start of the stream, if the format has one.
+        Inputs: f - file opened for writing (in binary mode if binary)
+        Outputs: N/A
+        """
+        self.f = f
+        self.count = 0          # number of graphs written
+        self._buffer = []       # pieces not yet written to f
+        self._size = 0          # their total length
+        self._begin()
+
+    #--------------------------------------------------------------------------
+    def __enter__(self):
+        return self
+
+    #--------------------------------------------------------------------------
+    def __exit__(self, *args):
+        self.close()
+
+    #--------------------------------------------------------------------------
+    def close(self):
+        """Writes the end of the stream, and flushes the buffer."""
+        if self._buffer is not None:
+            self._end()
+            self._flush()
+            self._buffer = None
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def create(format:str, f):
+        """
+        Returns a writer of the given format.
+        Inputs:
+            * format - "edgelist", "dot", "graphml" or "binary"
+            * f - file opened for writing (in binary mode for "binary")
+        Outputs: GraphWriter
+        """
+        return GraphWriter.find(format)(f)
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def find(format:str):
+        """
+        Returns the writer class of the given format (see create()).
+        """
+        if format not in FORMATS:
+            raise ValueError('Unknown graph format "%s".' % format)
+        return FORMATS[format]
+
+    #--------------------------------------------------------------------------
+    def write(self, graph:Graph):
+        """
+        Writes a graph.
+        Inputs: graph - Graph to write
+        Outputs: None
+        """
+        self._graph(graph)
+        self.count += 1
+
+    #--------------------------------------------------------------------------
+    # PRIVATE METHODS - These aren't the methods you're looking for.
+    #--------------------------------------------------------------------------
+    def _begin(self):
+        """Writes the start of the stream (nothing, by default)."""
+        pass
+
+    #--------------------------------------------------------------------------
+    def _end(self):
+        """Writes the end of the stream (nothing, by default)."""
+        pass
+
+    #--------------------------------------------------------------------------
+    def _flush(self):
+        """Writes the buffer to the file."""
+        if self._buffer:
+            self.f.write((b'' if self.binary else '').join(self._buffer))
+            self._buffer = []
+            self._size = 0
+
+    #--------------------------------------------------------------------------
+    def _graph(self, graph:Graph):
+        """Writes one graph, with _put()."""
+        raise NotImplementedError()
+
+    #--------------------------------------------------------------------------
+    def _put(self, piece):
+        """Adds a piece of output to the buffer."""
+        self._buffer.append(piece)
+        self._size += len(piece)
+        if self._size >= self.CHUNK:
+            self._flush()
+
+#------------------------------------------------------------------------------
+class EdgeListWriter(GraphWriter):
+    """
+    Writes each graph as one "START END" line per edge, followed by an
+    empty line. Vertices are written as LABEL_ID, as str(Graph) does, so
+    that their labels are kept. (Vertices without edges are not written.)
+    """
+
+    #--------------------------------------------------------------------------
+    def _graph(self, graph:Graph):
+        for (start, end) in graph.edges():
+            self._put('%s_%s %s_%s\n' % (start.label, start.id, end.label, end.id))
+        self._put('\n')
+
+#------------------------------------------------------------------------------
+class DotWriter(GraphWriter):
+    """
+    Writes each graph as a Graphviz digraph, with the vertex labels as node
+    labels.
+    """
+
+    extension = 'dot'
+
+    #--------------------------------------------------------------------------
+    def _graph(self, graph:Graph):
+        self._put('digraph g%d {\n' % self.count)
+        for v in graph.vertices():
+            self._put('  "%s" [label="%s"];\n' % (v.id, v.label))
+        for (start, end) in graph.edges():
+            self._put('  "%s" -> "%s";\n' % (start.id, end.id))
+        self._put('}\n')
+
+#------------------------------------------------------------------------------
+class GraphMLWriter(GraphWriter):
+    """
+    Writes the graphs into one GraphML document, one <graph> element each
+    (with ids g0, g1, ...), with the vertex labels (and numbers, where they
+    have one) as node data.
+    """
+
+    extension = 'graphml'
+
+    #--------------------------------------------------------------------------
+    def _begin(self):
+        self._put('<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+            '  <key id="label" for="node" attr.name="label" attr.type="string"/>\n'
+            '  <key id="number" for="node" attr.name="number" attr.type="string"/>\n')
+
+    #--------------------------------------------------------------------------
+    def _end(self):
+        self._put('</graphml>\n')
+
+    #--------------------------------------------------------------------------
+    def _graph(self, graph:Graph):
+        # Node ids must be unique within the document, so they are prefixed
+        # with the graph id.
+        prefix = 'g%d' % self.count
+        self._put('  <graph id="%s" edgedefault="directed">\n' % prefix)
+        for v in graph.vertices():
+            self._put('    <node id=%s><data key="label">%s</data>' %
+                (quoteattr('%s.%s' % (prefix, v.id)), escape(str(v.label))))
+            if v.number is not None:
+                self._put('<data key="number">%s</data>' % escape(str(v.number)))
+            self._put('</node>\n')
+        for (start, end) in graph.edges():
+            self._put('    <edge source=%s target=%s/>\n' %
+                (quoteattr('%s.%s' % (prefix, start.id)),
+                quoteattr('%s.%s' % (prefix, end.id))))
+        self._put('  </graph>\n')
+
+#------------------------------------------------------------------------------
+class BinaryWriter(GraphWriter):
+    """
+    Writes the graphs in a compact binary format. The stream starts with
+    MAGIC; each graph is then, in little-endian uint32s: the number of
+    labels, the number of vertices and the number of edges, followed by the
+    labels (each a uint16 length and that many bytes of UTF-8, so a label
+    can't be longer than 65535 bytes), the label index of each vertex, and
+    a (start, end) pair of vertex indices per edge. Vertices are numbered
+    0..n-1 in the order graph.vertices() gives them; ids and numbers are
+    not kept. The indices are written in CHUNK-sized slices as they are
+    found. read() reads the graphs back.
+    """
+
+    binary = True
+    extension = 'bin'
+
+    MAGIC = b'GGB\x01'
+
+    #--------------------------------------------------------------------------
+    @classmethod
+    def read(cls, f):
+        """
+        Reads graphs written by a BinaryWriter.
+        Inputs: f - file opened for reading in binary mode
+        Outputs: generator of Graphs, with vertex ids "vN"
+        """
+        if f.read(len(cls.MAGIC)) != cls.MAGIC:
+            raise ValueError('Not a binary graph stream.')
+        while True:
+            header = f.read(12)
+            if len(header) == 0:
+                return
+            (numLabels, numVertices, numEdges) = struct.unpack('<3I', header)
+            labels = []
+            for i in range(numLabels):
+                (length,) = struct.unpack('<H', f.read(2))
+                labels.append(f.read(length).decode('utf-8'))
+            ints = cls._ints(f, numVertices + 2 * numEdges)
+            graph = Graph()
+            for i in range(numVertices):
+                graph.addVertex(Vertex('v%d' % i, labels[ints[i]]))
+            for i in range(numVertices, len(ints), 2):
+                graph.addEdge('v%d' % ints[i], 'v%d' % ints[i + 1])
+            yield graph
+
+    #--------------------------------------------------------------------------
+    # PRIVATE METHODS - These aren't the methods you're looking for.
+    #--------------------------------------------------------------------------
+    def _begin(self):
+        self._put(self.MAGIC)
+
+    #--------------------------------------------------------------------------
+    def _graph(self, graph:Graph):
+        labels = {}             # {label -> index}
+        positions = {}          # {vid -> vertex index}
+        for v in graph.vertices():
+            positions[v.id] = len(positions)
+            labels.setdefault(v.label, len(labels))
+        texts = [ str(label).encode('utf-8') for label in labels ]
+        for text in texts:
+            if len(text) > 0xFFFF:
+                raise ValueError('A label of %d bytes is too long for the '
+                    'binary format (at most 65535).' % len(text))
+        edges = graph.edges()
+
+        # The counts come first, so that the label index of each vertex and
+        # the edges can be written as they are found.
+        self._put(struct.pack('<3I', len(labels), len(positions), len(edges)))
+        for text in texts:
+            self._put(struct.pack('<H', len(text)) + text)
+        self._putInts(labels[v.label] for v in graph.vertices())
+        self._putInts(position for (start, end) in edges
+            for position in (positions[start.id], positions[end.id]))
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _bytes(ints:array) -> bytes:
+        """Returns the bytes of an array of uint32s, in little-endian order."""
+        if struct.pack('=I', 1) != struct.pack('<I', 1):
+            ints = array(ints.typecode, ints)
+            ints.byteswap()
+        return ints.tobytes()
+
+    #--------------------------------------------------------------------------
+    def _putInts(self, ints):
+        """
+        Writes uint32s, with _put(), in slices of at most CHUNK bytes.
+        Inputs: ints - iterable of ints
+        Outputs: None
+        """
+        piece = array('I')
+        for i in ints:
+            piece.append(i)
+            if len(piece) == self.CHUNK // 4:
+                self._put(self._bytes(piece))
+                piece = array('I')
+        if len(piece) > 0:
+            self._put(self._bytes(piece))
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _ints(f, count:int) -> array:
+        """Reads count little-endian uint32s."""
+        ints = array('I')
+        ints.frombytes(f.read(4 * count))
+        if struct.pack('=I', 1) != struct.pack('<I', 1):
+            ints.byteswap()
+        return ints
+
+# Writer class of each format name.
+FORMATS = { 'binary' : BinaryWriter, 'dot' : DotWriter,
+    'edgelist' : EdgeListWriter, 'graphml' : GraphMLWriter }
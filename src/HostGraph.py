@@ -0,0 +1,325 @@
+from array import array
+
+from LabelHistogram import LabelHistogram
+from SymbolTable import SymbolTable
+from YapyGraph.src.Graph import Graph
+from YapyGraph.src.Vertex import Vertex
+
+#------------------------------------------------------------------------------
+class HostGraph(object):
+    """
+    Compact host graph used during generation. Vertices have dense integer
+    ids, handed out in order and reused (from a free list) once deleted.
+    Labels and vertex numbers are interned, so each vertex is stored as two
+    small ints in flat arrays. The label table (symbols) can be layered over
+    the SymbolTable of the grammar, so that label numbers are the grammar's
+    own (and a Matcher compares label ids; see labelID()).
+
+    Adjacency is kept in both directions as CSR tables (an offsets array and
+    a values array). Edits go to an overflow area: the first time a
+    vertex's adjacency changes it is copied into a set, and once enough
+    vertices have overflowed the tables are rebuilt.
+
+    A LabelHistogram (by label number) keeps the largest out- and in-degree
+    of the vertices with each label, as edits are made.
+
+    Besides the Graph methods used to apply a production, it has the same
+    search interface as HostIndex, so it can be searched by a Matcher
+    directly. Convert to and from Graph with the constructor and toGraph().
+    """
+
+    # The CSR tables are rebuilt once more than this fraction of the vertex
+    # ids have overflowed.
+    OVERFLOW = 0.25
+
+    #--------------------------------------------------------------------------
+    def __init__(self, graph:Graph=None, symbols:SymbolTable=None):
+        """
+        Constructor.
+        Inputs:
+            * graph - optional Graph to copy; its vertices are given ids
+              0..n-1 in the order of graph.vertices()
+            * symbols - optional SymbolTable (of the grammar) to number
+              labels as; labels are interned in a table layered over it
+              (see SymbolTable), so it isn't changed
+        Outputs: N/A
+        """
+        self.symbols = SymbolTable(symbols)   # label table
+        self._numbers = SymbolTable()   # vertex number table
+        self._vertexLabels = array('i') # vid -> label id, -1 if free
+        self._vertexNumbers = array('i')# vid -> number id
+        self._byLabel = []              # label id -> set(vid)
+        self._free = []                 # deleted vids, for reuse
+        self._numVertices = 0
+        self._numEdges = 0
+        self._histogram = LabelHistogram()  # by label id
+
+        # CSR adjacency tables, and the overflow {vid -> set(vid)} of
+        # vertices whose adjacency has changed since they were built.
+        self._outOffsets = array('i', [0])
+        self._outValues = memoryview(array('i'))
+        self._inOffsets = array('i', [0])
+        self._inValues = memoryview(array('i'))
+        self._out = {}
+        self._in = {}
+
+        if graph is not None:
+            ids = {}
+            for v in graph.vertices():
+                ids[v.id] = self._newVertex(v.label, v.number)
+            for (start, end) in graph.edges():
+                self._addEdge(ids[start.id], ids[end.id])
+            self._compact()
+
+    #--------------------------------------------------------------------------
+    def __str__(self) -> str:
+        return 'HostGraph(%d vertices, %d edges)' % (self._numVertices,
+            self._numEdges)
+
+    #--------------------------------------------------------------------------
+    def addEdge(self, startID:int, endID:int):
+        """
+        Adds an edge from startID to endID, unless there already is one.
+        Inputs: startID, endID - vertex ids
+        Outputs: None
+        """
+        self._addEdge(startID, endID)
+        self._checkOverflow()
+
+    #--------------------------------------------------------------------------
+    def addVertex(self, vertex:Vertex) -> Vertex:
+        """
+        Adds a vertex with the label and number of the given vertex. Its id
+        is ignored: the new vertex gets the next free id.
+        Inputs: vertex - Vertex to copy
+        Outputs: the new Vertex
+        """
+        vid = self._newVertex(vertex.label, vertex.number)
+        self._checkOverflow()
+        return Vertex(vid, vertex.label, vertex.number)
+
+    #--------------------------------------------------------------------------
+    def count(self, label:str) -> int:
+        """Returns the number of vertices with the given label."""
+        return len(self.vertices(label))
+
+    #--------------------------------------------------------------------------
+    def deleteEdge(self, startID:int, endID:int):
+        """
+        Deletes the edge from startID to endID, if there is one.
+        Inputs: startID, endID - vertex ids
+        Outputs: None
+        """
+        if self.hasEdgeBetweenVertices(startID, endID):
+            successors = self._overflow(self._out, self.successors, startID)
+            successors.discard(endID)
+            predecessors = self._overflow(self._in, self.predecessors, endID)
+            predecessors.discard(startID)
+            self._numEdges -= 1
+            self._histogram.moveDegree(self._vertexLabels[startID], True,
+                len(successors) + 1, len(successors))
+            self._histogram.moveDegree(self._vertexLabels[endID], False,
+                len(predecessors) + 1, len(predecessors))
+            self._checkOverflow()
+
+    #--------------------------------------------------------------------------
+    def deleteVertex(self, vid:int):
+        """
+        Deletes a vertex and every edge to or from it. Its id may be reused.
+        Inputs: vid - vertex id
+        Outputs: None
+        """
+        for n in list(self.successors(vid)):
+            self.deleteEdge(vid, n)
+        for n in list(self.predecessors(vid)):
+            self.deleteEdge(n, vid)
+        self._histogram.deleteVertex(self._vertexLabels[vid])
+        self._byLabel[self._vertexLabels[vid]].discard(vid)
+        self._vertexLabels[vid] = -1
+        self._out[vid] = set()
+        self._in[vid] = set()
+        self._free.append(vid)
+        self._numVertices -= 1
+
+    #--------------------------------------------------------------------------
+    def hasEdgeBetweenVertices(self, startID:int, endID:int) -> bool:
+        """Returns True if there is an edge from startID to endID."""
+        return endID in self.successors(startID)
+
+    #--------------------------------------------------------------------------
+    def label(self, vid:int) -> str:
+        """Returns the label of vertex vid."""
+        return self.symbols.symbols[self._vertexLabels[vid]]
+
+    #--------------------------------------------------------------------------
+    def labelID(self, vid:int) -> int:
+        """Returns the id of the label of vertex vid, in symbols."""
+        return self._vertexLabels[vid]
+
+    #--------------------------------------------------------------------------
+    def labels(self) -> list:
+        """Returns the labels of the vertices."""
+        return [ self.symbols.symbol(id) for id, vids in enumerate(self._byLabel)
+            if len(vids) > 0 ]
+
+    #--------------------------------------------------------------------------
+    def maxInDegree(self, label:str) -> int:
+        """
+        Returns the largest in-degree of a vertex with the given label (0 if
+        there is none).
+        """
+        id = self.symbols.find(label)
+        return 0 if id is None else self._histogram.maxInDegree(id)
+
+    #--------------------------------------------------------------------------
+    def maxOutDegree(self, label:str) -> int:
+        """
+        Returns the largest out-degree of a vertex with the given label (0
+        if there is none).
+        """
+        id = self.symbols.find(label)
+        return 0 if id is None else self._histogram.maxOutDegree(id)
+
+    #--------------------------------------------------------------------------
+    def numEdges(self) -> int:
+        """Returns the number of edges."""
+        return self._numEdges
+
+    #--------------------------------------------------------------------------
+    def numVertices(self) -> int:
+        """Returns the number of vertices."""
+        return self._numVertices
+
+    #--------------------------------------------------------------------------
+    def predecessors(self, vid:int):
+        """Returns the ids of the vertices with an edge to vertex vid."""
+        if vid in self._in:
+            return self._in[vid]
+        return self._inValues[self._inOffsets[vid]:self._inOffsets[vid + 1]]
+
+    #--------------------------------------------------------------------------
+    def successors(self, vid:int):
+        """Returns the ids of the vertices with an edge from vertex vid."""
+        if vid in self._out:
+            return self._out[vid]
+        return self._outValues[self._outOffsets[vid]:self._outOffsets[vid + 1]]
+
+    #--------------------------------------------------------------------------
+    def toGraph(self, graph:Graph=None) -> Graph:
+        """
+        Copies this graph into a Graph. Vertex vid becomes a Vertex with id
+        "v<vid>".
+        Inputs: graph - optional Graph to copy into; its current contents
+            are replaced
+        Outputs: the Graph
+        """
+        if graph is None:
+            graph = Graph()
+        for v in list(graph.vertices()):
+            graph.deleteVertex(v.id)
+        live = [vid for vid in range(len(self._vertexLabels))
+            if self._vertexLabels[vid] != -1]
+        for vid in live:
+            graph.addVertex(Vertex('v%d' % vid, self.label(vid),
+                self._numbers.symbol(self._vertexNumbers[vid])))
+        for vid in live:
+            for n in self.successors(vid):
+                graph.addEdge('v%d' % vid, 'v%d' % n)
+        return graph
+
+    #--------------------------------------------------------------------------
+    def vertices(self, label:str) -> set:
+        """Returns the set of ids of the vertices with the given label."""
+        id = self.symbols.find(label)
+        if id is None or id >= len(self._byLabel):
+            return set()
+        return self._byLabel[id]
+
+    #--------------------------------------------------------------------------
+    # PRIVATE METHODS - These aren't the methods you're looking for.
+    #--------------------------------------------------------------------------
+    def _addEdge(self, startID:int, endID:int):
+        """
+        Adds an edge from startID to endID, unless there already is one.
+        """
+        if not self.hasEdgeBetweenVertices(startID, endID):
+            successors = self._overflow(self._out, self.successors, startID)
+            successors.add(endID)
+            predecessors = self._overflow(self._in, self.predecessors, endID)
+            predecessors.add(startID)
+            self._numEdges += 1
+            self._histogram.moveDegree(self._vertexLabels[startID], True,
+                len(successors) - 1, len(successors))
+            self._histogram.moveDegree(self._vertexLabels[endID], False,
+                len(predecessors) - 1, len(predecessors))
+
+    #--------------------------------------------------------------------------
+    def _checkOverflow(self):
+        """
+        Rebuilds the CSR tables if too many vertices have overflowed. (The
+        small allowance keeps tiny graphs from being rebuilt on every edit.)
+        """
+        if max(len(self._out), len(self._in)) > \
+                self.OVERFLOW * len(self._vertexLabels) + 16:
+            self._compact()
+
+    #--------------------------------------------------------------------------
+    def _compact(self):
+        """
+        Rebuilds the CSR tables from the current adjacency, and empties the
+        overflow area.
+        """
+        (self._outOffsets, self._outValues) = self._table(self.successors)
+        (self._inOffsets, self._inValues) = self._table(self.predecessors)
+        self._out = {}
+        self._in = {}
+
+    #--------------------------------------------------------------------------
+    def _newVertex(self, label:str, number) -> int:
+        """
+        Adds a vertex, with no edges, and returns its id.
+        """
+        labelID = self.symbols.intern(label)
+        while labelID >= len(self._byLabel):
+            # The grammar's labels are in the table before any vertex has
+            # them.
+            self._byLabel.append(set())
+        numberID = self._numbers.intern(number)
+        if len(self._free) > 0:
+            vid = self._free.pop()
+            self._vertexLabels[vid] = labelID
+            self._vertexNumbers[vid] = numberID
+        else:
+            vid = len(self._vertexLabels)
+            self._vertexLabels.append(labelID)
+            self._vertexNumbers.append(numberID)
+        self._byLabel[labelID].add(vid)
+        self._histogram.addVertex(labelID)
+        self._out[vid] = set()
+        self._in[vid] = set()
+        self._numVertices += 1
+        return vid
+
+    #--------------------------------------------------------------------------
+    def _overflow(self, overflow:dict, neighbors, vid:int) -> set:
+        """
+        Returns the overflow set of vid's adjacency in one direction, copying
+        it out of the CSR table first if necessary.
+        """
+        if vid not in overflow:
+            overflow[vid] = set(neighbors(vid))
+        return overflow[vid]
+
+    #--------------------------------------------------------------------------
+    def _table(self, neighbors) -> tuple:
+        """
+        Returns (offsets, values) for a CSR table of the current adjacency
+        in one direction. Free ids get empty rows.
+        """
+        offsets = array('i', [0])
+        values = array('i')
+        for vid in range(len(self._vertexLabels)):
+            if self._vertexLabels[vid] != -1:
+                values.extend(neighbors(vid))
+            offsets.append(len(values))
+        return (offsets, memoryview(values))
@@ -0,0 +1,185 @@
+from Delta import Delta
+from LabelHistogram import LabelHistogram
+from YapyGraph.src.Graph import Graph
+
+#------------------------------------------------------------------------------
+class HostIndex(object):
+    """
+    Index over a host graph that is kept up to date as productions are
+    applied: a label -> vertex-set index, so that a search can start from
+    the vertices with the rarest label, and the adjacency of every vertex in
+    both directions, so that a search can extend a partial match along
+    edges instead of testing every vertex. A LabelHistogram keeps the
+    largest out- and in-degree of the vertices with each label.
+    """
+
+    # Labels aren't numbered in a SymbolTable (unlike HostGraph.symbols),
+    # so a Matcher compares the labels themselves.
+    symbols = None
+
+    #--------------------------------------------------------------------------
+    def __init__(self, graph:Graph=None):
+        """
+        Constructor.
+        Inputs: graph - optional host Graph to index
+        Outputs: N/A
+        """
+        self._byLabel = {}          # {label -> set(vid)}
+        self._vertices = {}         # {vid -> Vertex}
+        self._successors = {}       # {vid -> set(vid)}
+        self._predecessors = {}     # {vid -> set(vid)}
+        self._numEdges = 0
+        self._histogram = LabelHistogram()
+        if graph is not None:
+            self.build(graph)
+
+    #--------------------------------------------------------------------------
+    def build(self, graph:Graph):
+        """
+        (Re)builds the index from graph.
+        Inputs: graph - host Graph
+        Outputs: None
+        """
+        self._byLabel = {}
+        self._vertices = {}
+        self._successors = {}
+        self._predecessors = {}
+        self._numEdges = 0
+        self._histogram = LabelHistogram()
+        for v in graph.vertices():
+            self._addVertex(v)
+        for (start, end) in graph.edges():
+            self._addEdge(start.id, end.id)
+
+    #--------------------------------------------------------------------------
+    def count(self, label:str) -> int:
+        """Returns the number of host vertices with the given label."""
+        return len(self._byLabel.get(label, ()))
+
+    #--------------------------------------------------------------------------
+    def label(self, vid) -> str:
+        """Returns the label of host vertex vid."""
+        return self._vertices[vid].label
+
+    #--------------------------------------------------------------------------
+    def labels(self) -> list:
+        """Returns the labels of the host vertices."""
+        return [label for label, vids in self._byLabel.items() if len(vids) > 0]
+
+    #--------------------------------------------------------------------------
+    def maxInDegree(self, label:str) -> int:
+        """
+        Returns the largest in-degree of a host vertex with the given label
+        (0 if there is none).
+        """
+        return self._histogram.maxInDegree(label)
+
+    #--------------------------------------------------------------------------
+    def maxOutDegree(self, label:str) -> int:
+        """
+        Returns the largest out-degree of a host vertex with the given label
+        (0 if there is none).
+        """
+        return self._histogram.maxOutDegree(label)
+
+    #--------------------------------------------------------------------------
+    def numEdges(self) -> int:
+        """Returns the number of edges in the host graph."""
+        return self._numEdges
+
+    #--------------------------------------------------------------------------
+    def numVertices(self) -> int:
+        """Returns the number of vertices in the host graph."""
+        return len(self._vertices)
+
+    #--------------------------------------------------------------------------
+    def predecessors(self, vid) -> set:
+        """Returns the set of vids with an edge to host vertex vid."""
+        return self._predecessors[vid]
+
+    #--------------------------------------------------------------------------
+    def successors(self, vid) -> set:
+        """Returns the set of vids with an edge from host vertex vid."""
+        return self._successors[vid]
+
+    #--------------------------------------------------------------------------
+    def update(self, delta:Delta):
+        """
+        Applies the changes described by delta to the index.
+        Inputs: delta - Delta returned by Generator._applyProduction()
+        Outputs: None
+        """
+        for vid in delta.deletedVertices:
+            for n in list(self._successors[vid]):
+                self._deleteEdge(vid, n)
+            for n in list(self._predecessors[vid]):
+                self._deleteEdge(n, vid)
+            v = self._vertices.pop(vid)
+            self._byLabel[v.label].discard(vid)
+            self._histogram.deleteVertex(v.label)
+            del self._successors[vid]
+            del self._predecessors[vid]
+        for (startID, endID) in delta.deletedEdges:
+            self._deleteEdge(startID, endID)
+        for v in delta.addedVertices:
+            self._addVertex(v)
+        for (startID, endID) in delta.addedEdges:
+            self._addEdge(startID, endID)
+
+    #--------------------------------------------------------------------------
+    def vertex(self, vid):
+        """Returns the host Vertex with id vid."""
+        return self._vertices[vid]
+
+    #--------------------------------------------------------------------------
+    def vertices(self, label:str) -> set:
+        """Returns the set of host vids with the given label."""
+        return self._byLabel.get(label, set())
+
+    #--------------------------------------------------------------------------
+    # PRIVATE METHODS - These aren't the methods you're looking for.
+    #--------------------------------------------------------------------------
+    def _addEdge(self, startID, endID):
+        """
+        Adds the edge from startID to endID to the index.
+        """
+        if endID not in self._successors[startID]:
+            self._successors[startID].add(endID)
+            self._predecessors[endID].add(startID)
+            self._numEdges += 1
+            self._moveDegrees(startID, endID, 1)
+
+    #--------------------------------------------------------------------------
+    def _addVertex(self, v):
+        """
+        Adds Vertex v, with no edges, to the index.
+        """
+        self._vertices[v.id] = v
+        self._byLabel.setdefault(v.label, set()).add(v.id)
+        self._successors[v.id] = set()
+        self._predecessors[v.id] = set()
+        self._histogram.addVertex(v.label)
+
+    #--------------------------------------------------------------------------
+    def _deleteEdge(self, startID, endID):
+        """
+        Deletes the edge from startID to endID from the index.
+        """
+        if endID in self._successors[startID]:
+            self._successors[startID].discard(endID)
+            self._predecessors[endID].discard(startID)
+            self._numEdges -= 1
+            self._moveDegrees(startID, endID, -1)
+
+    #--------------------------------------------------------------------------
+    def _moveDegrees(self, startID, endID, change:int):
+        """
+        Updates the histogram after the edge from startID to endID was
+        added (change 1) or deleted (change -1).
+        """
+        outDegree = len(self._successors[startID])
+        self._histogram.moveDegree(self._vertices[startID].label, True,
+            outDegree - change, outDegree)
+        inDegree = len(self._predecessors[endID])
+        self._histogram.moveDegree(self._vertices[endID].label, False,
+            inDegree - change, inDegree)
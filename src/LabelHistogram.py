@@ -0,0 +1,122 @@
+from YapyGraph.src.Graph import Graph
+
+#------------------------------------------------------------------------------
+class LabelHistogram(object):
+    """
+    Number of host vertices with each label, and the largest out- and
+    in-degree of the vertices with each label, kept up to date as vertices
+    and edges come and go.
+
+    For each label and direction, the histogram keeps a list of the number
+    of vertices with each degree, with no trailing zeros, so the largest
+    degree is the length of the list less one. An edge moves two vertices
+    one step along their lists, so each change takes O(1) amortized time
+    (the list only shrinks by what it has grown by).
+
+    Labels can be anything hashable (HostGraph uses its label numbers).
+    """
+
+    #--------------------------------------------------------------------------
+    def __init__(self):
+        """
+        Constructor. The histogram starts empty.
+        Inputs: none
+        Outputs: N/A
+        """
+        self._counts = {}       # {label -> number of vertices}
+        self._degrees = {}      # {label -> ([count by out-degree], [count by in-degree])}
+
+    #--------------------------------------------------------------------------
+    def addVertex(self, label):
+        """Counts a new vertex, with no edges, with the given label."""
+        self._counts[label] = self._counts.get(label, 0) + 1
+        degrees = self._degrees.get(label)
+        if degrees is None:
+            degrees = self._degrees[label] = ([0], [0])
+        degrees[0][0] += 1
+        degrees[1][0] += 1
+
+    #--------------------------------------------------------------------------
+    def count(self, label) -> int:
+        """Returns the number of vertices with the given label."""
+        return self._counts.get(label, 0)
+
+    #--------------------------------------------------------------------------
+    def deleteVertex(self, label):
+        """
+        Stops counting a vertex with the given label. Its edges must have
+        been deleted first.
+        """
+        self._counts[label] -= 1
+        degrees = self._degrees[label]
+        self._move(degrees[0], 0, -1)
+        self._move(degrees[1], 0, -1)
+
+    #--------------------------------------------------------------------------
+    @classmethod
+    def fromGraph(cls, graph:Graph):
+        """
+        Returns the histogram of a Graph.
+        Inputs: graph - Graph to count
+        Outputs: LabelHistogram
+        """
+        outDegrees = {}
+        inDegrees = {}
+        for (start, end) in graph.edges():
+            outDegrees[start.id] = outDegrees.get(start.id, 0) + 1
+            inDegrees[end.id] = inDegrees.get(end.id, 0) + 1
+        histogram = cls()
+        for v in graph.vertices():
+            histogram.addVertex(v.label)
+            histogram.moveDegree(v.label, True, 0, outDegrees.get(v.id, 0))
+            histogram.moveDegree(v.label, False, 0, inDegrees.get(v.id, 0))
+        return histogram
+
+    #--------------------------------------------------------------------------
+    def maxInDegree(self, label) -> int:
+        """
+        Returns the largest in-degree of a vertex with the given label (0
+        if there is none).
+        """
+        degrees = self._degrees.get(label)
+        return 0 if degrees is None else len(degrees[1]) - 1
+
+    #--------------------------------------------------------------------------
+    def maxOutDegree(self, label) -> int:
+        """
+        Returns the largest out-degree of a vertex with the given label (0
+        if there is none).
+        """
+        degrees = self._degrees.get(label)
+        return 0 if degrees is None else len(degrees[0]) - 1
+
+    #--------------------------------------------------------------------------
+    def moveDegree(self, label, outgoing:bool, old:int, new:int):
+        """
+        Records that the degree of a vertex with the given label changed.
+        Inputs:
+            * label - label of the vertex
+            * outgoing - True for its out-degree, False for its in-degree
+            * old - degree it had
+            * new - degree it has now
+        Outputs: None
+        """
+        if old != new:
+            counts = self._degrees[label][0 if outgoing else 1]
+            self._move(counts, old, -1)
+            self._move(counts, new, 1)
+
+    #--------------------------------------------------------------------------
+    # PRIVATE METHODS - These aren't the methods you're looking for.
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _move(counts:list, degree:int, change:int):
+        """
+        Adds change to the number of vertices with the given degree, keeping
+        counts free of trailing zeros (but for the count of degree 0).
+        """
+        while len(counts) <= degree:
+            counts.append(0)
+        counts[degree] += change
+        while len(counts) > 1 and counts[-1] == 0:
+            counts.pop()
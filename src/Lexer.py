@@ -1,129 +1,212 @@
+import bisect
+import mmap
+import re
+
 from Token import TokenTypes
 from Token import Token
 
 #------------------------------------------------------------------------------
-#   _                       
-#  | |    _____  _____ _ __ 
+#   _
+#  | |    _____  _____ _ __
 #  | |   / _ \ \/ / _ \ '__|
-#  | |__|  __/>  <  __/ |   
-#  |_____\___/_/\_\___|_|   
-#  
+#  | |__|  __/>  <  __/ |
+#  |_____\___/_/\_\___|_|
+#
 class Lexer(object):
     """
     Lexer for the graph productions parser.
+
+    Tokens are scanned with a single compiled regular expression, one match
+    per token, directly over the input: a str, or a bytes-like buffer such
+    as a memory-mapped file (see fromFile()). Line and character numbers
+    are not tracked while scanning; they are worked out from the input
+    position only when asked for (see lineNum, charNum and position()).
     """
-    
+
+    # Optional whitespace and comments, then one alternative per token
+    # type; the group name is the TokenTypes name. "==" not followed by ">"
+    # and "-" not followed by ">" match nothing, so they are errors. (A
+    # comment must run to the end of the line, so that backtracking can't
+    # end it early and scan the rest of it as tokens. Whitespace is taken
+    # one character at a time: a repeat inside the repeat would backtrack
+    # through every way of splitting a run of it when no token follows.)
+    _SKIP = r'(?:[ \t\n\r]|\#[^\n]*(?![^\n]))*'
+    _PATTERN = _SKIP + r'''(?:
+        (?P<SEMICOLON>;)
+        | (?P<COMMA>,)
+        | (?P<COLON>:)
+        | (?P<LBRACE>\{)
+        | (?P<RBRACE>\})
+        | (?P<ARROW>->)
+        | (?P<DOUBLEARROW>==>)
+        | (?P<EQUALS>=(?!=))
+        | (?P<NUMBER>\d+)
+        | (?P<ID>[^\W\d_]\w*)
+        | (?P<EOF>\Z)
+    )'''
+    _STR_PATTERNS = (re.compile(_PATTERN, re.VERBOSE), re.compile(_SKIP, re.VERBOSE))
+    _BYTES_PATTERNS = (re.compile(_PATTERN.encode('ascii'), re.VERBOSE),
+        re.compile(_SKIP.encode('ascii'), re.VERBOSE))
+
+    # Token type of each group, by group number, and the reserved words.
+    _TYPES = [None] + [ getattr(TokenTypes, name) for name in
+        sorted(_STR_PATTERNS[0].groupindex, key=_STR_PATTERNS[0].groupindex.get) ]
+    _RESERVED = { 'configuration' : TokenTypes.CONFIGURATION,
+        'productions' : TokenTypes.PRODUCTIONS }
+
     #--------------------------------------------------------------------------
-    def __init__(self, input: str):
+    def __init__(self, input):
         """Constructor.
-           str is the input to the lexer
+           input is the input to the lexer: a str, or a bytes-like object
+           (bytes, mmap, ...) holding ASCII text
         """
-        self.input = input    # input string
+        self.input = input  # input string or buffer
         self.p = 0          # index of current character within self.input
-        self.lineNum = 1    # current line number
-        self.charNum = 1    # current character number within the line
- 
-        # Initialize the current character (self.c)
-        if len(input) != 0:
-            self.c = self.input[self.p]
-        else:
-            self.c = TokenTypes.EOF
-               
+        self._bytes = not isinstance(input, str)
+        (self._pattern, self._skip) = \
+            self._BYTES_PATTERNS if self._bytes else self._STR_PATTERNS
+        self._lineStarts = None # offsets of line starts, built when needed
+        self._mmap = None       # mmap opened by fromFile(), if any
+        self._tokens = None     # generator used by nextToken()
+        self._scanned = 0       # p as the generator last left it
+
+    #--------------------------------------------------------------------------
+    def __iter__(self):
+        """
+        Generates the remaining Tokens, ending with (and including) EOF.
+        """
+        return self._scan(True)
+
+    #--------------------------------------------------------------------------
+    @property
+    def c(self):
+        """The current character, or TokenTypes.EOF at the end of input."""
+        if self.p >= len(self.input):
+            return TokenTypes.EOF
+        return self._text(self.p, self.p + 1)
+
+    #--------------------------------------------------------------------------
+    @property
+    def charNum(self) -> int:
+        """The current character number within the line (from 1)."""
+        return self.position(self.p)[1]
+
+    #--------------------------------------------------------------------------
+    def close(self):
+        """Closes the file mapped by fromFile(), if any."""
+        if self._mmap is not None:
+            # The scanner of a suspended nextToken() holds on to the buffer.
+            self._tokens = None
+            self.input = b''
+            self._mmap.close()
+            self._mmap = None
+
+    #--------------------------------------------------------------------------
+    @classmethod
+    def fromFile(cls, filename:str):
+        """
+        Returns a Lexer over the memory-mapped contents of a file, so that
+        the file is never read into a string. Call close() when done.
+        Inputs: filename - name of the file
+        Outputs: Lexer
+        """
+        with open(filename, 'rb') as f:
+            try:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # An empty file can't be mapped.
+                return cls(b'')
+        lexer = cls(buffer)
+        lexer._mmap = buffer
+        return lexer
+
+    #--------------------------------------------------------------------------
+    @property
+    def lineNum(self) -> int:
+        """The current line number (from 1)."""
+        return self.position(self.p)[0]
+
     #--------------------------------------------------------------------------
     def nextToken(self) -> Token:
         """Return the next Token in the input stream, ignoring whitespace."""
-        while self.c != TokenTypes.EOF:
-            if self.c in [' ', '\t', '\n', '\r']:
-                # Ignore whitespace.
-                self._consume()
-            elif self.c == ';':
-                self._consume()
-                return Token(TokenTypes.SEMICOLON, ';')
-            elif self.c == ',':
-                self._consume()
-                return Token(TokenTypes.COMMA, ',')
-            elif self.c == '{':
-                self._consume()
-                return Token(TokenTypes.LBRACE, '{')
-            elif self.c == '}':
-                self._consume()
-                return Token(TokenTypes.RBRACE, '}')
-            elif self.c == '-':
-                # '->' is an ARROW, '-' followed by anything else is invalid.
-                self._consume()
-                if self.c == '>':
-                    self._consume()
-                    return Token(TokenTypes.ARROW, '->')
-                else:
-                    self._error()
-            elif self.c == '=':
-                # '==>' is a DOUBLEARROW, '==' followed by anything else is
-                # invalid. '=' followed by anything but a '=' is simply an
-                # EQUALS.
-                self._consume()
-                if self.c == '=':
-                    self._consume()
-                    if self.c == '>':
-                        self._consume()
-                        return Token(TokenTypes.DOUBLEARROW, '==>')
-                    else:
-                        self._error()
-                else:
-                    return Token(TokenTypes.EQUALS, '=')
-            elif self.c == '#':
-                # Consume everything until the end-of-line.
-                lexeme = ""
-                while self.c != TokenTypes.EOF and self.c != '\n':
-                    self._consume()
-            elif self.c.isdigit():
-                # Consume all contiguous digits and turn them into a NUMBER.
-                lexeme = ""
-                while self.c != TokenTypes.EOF and self.c.isdigit():
-                    lexeme += self.c
-                    self._consume()
-                return Token(TokenTypes.NUMBER, lexeme)
-            elif self.c.isalpha():
-                # Consume all contiguous alpha, digits, or _ characters, then check to
-                # see if we recognize it as a reserved word.
-                lexeme = ""
-                while self.c != TokenTypes.EOF and (self.c.isalpha() or self.c.isdigit() or self.c == '_'):
-                    lexeme += self.c
-                    self._consume()
-                if lexeme == 'configuration':
-                    t = Token(TokenTypes.CONFIGURATION, lexeme)
-                elif lexeme == 'productions':
-                    t = Token(TokenTypes.PRODUCTIONS, lexeme)
-                else:
-                    t = Token(TokenTypes.ID, lexeme)
-                return t
-            else:
-                # Every other character is invalid.
-                self._error()
-        return Token(TokenTypes.EOF, "<EOF>")
+        if self._tokens is None or self.p != self._scanned:
+            # Start scanning (again, if p was moved).
+            self._tokens = self._scan(False)
+        return next(self._tokens)
+
+    #--------------------------------------------------------------------------
+    def position(self, offset:int) -> tuple:
+        """
+        Returns the (line number, character number) of an input offset, such
+        as Token.offset. Both count from 1.
+        """
+        if self._lineStarts is None:
+            newline = b'\n' if self._bytes else '\n'
+            self._lineStarts = [0]
+            start = self.input.find(newline)
+            while start != -1:
+                self._lineStarts.append(start + 1)
+                start = self.input.find(newline, start + 1)
+        line = bisect.bisect_right(self._lineStarts, offset)
+        return (line, offset - self._lineStarts[line - 1] + 1)
 
     #--------------------------------------------------------------------------
     # PRIVATE METHODS - These aren't the methods you're looking for.
     #--------------------------------------------------------------------------
     def _consume(self) -> None:
         """Advance to the next character of input, or EOF."""
-        # Update line number and character number.
-        if self.c in ['\n', '\r']:
-            self.lineNum = self.lineNum + 1
-            self.charNum = 1
-        else:
-            self.charNum = self.charNum + 1
-
-        # To to the next character.
         self.p += 1
-        if self.p >= len(self.input):
-            self.c = TokenTypes.EOF
-        else:
-            self.c = self.input[self.p]
 
     #--------------------------------------------------------------------------
     def _error(self) -> None:
-        """Raises an exception indicating that the current character is
-           invalid.
+        """Raises an exception indicating that the character after any
+           whitespace at the current position is invalid.
         """
+        self.p = self._skip.match(self.input, self.p).end()
+        # The scan ends with the exception; the next nextToken() starts
+        # another (which raises it again).
+        self._tokens = None
         raise SyntaxError("Invalid character %c at [%d,%d]." % \
             (self.c, self.lineNum, self.charNum))
+
+    #--------------------------------------------------------------------------
+    def _scan(self, stopAtEOF:bool):
+        """
+        Generates the Tokens from the current position. After the input is
+        used up, generates EOF once if stopAtEOF, otherwise forever. p is
+        kept up to date (in _scanned as well, so that nextToken() can tell
+        if it has been moved).
+        """
+        scanner = self._pattern.scanner(self.input, self.p)
+        types = self._TYPES
+        reserved = self._RESERVED
+        decode = self._bytes
+        eof = TokenTypes.EOF
+        idType = TokenTypes.ID
+        while True:
+            match = scanner.match()
+            if match is None:
+                self._error()
+            kind = match.lastindex
+            self.p = self._scanned = match.end()
+            tokenType = types[kind]
+            if tokenType == eof:
+                break
+            text = match.group(kind)
+            if decode:
+                text = text.decode('latin-1')
+            if tokenType == idType:
+                tokenType = reserved.get(text, idType)
+            yield Token(tokenType, text, match.start(kind))
+
+        while True:
+            yield Token(eof, "<EOF>", self.p)
+            if stopAtEOF:
+                return
+
+    #--------------------------------------------------------------------------
+    def _text(self, start:int, end:int) -> str:
+        """Returns input[start:end] as a str."""
+        if self._bytes:
+            return self.input[start:end].decode('latin-1')
+        return self.input[start:end]
@@ -0,0 +1,313 @@
+import time
+
+from BitsetMatcher import BitsetMatcher
+from Delta import Delta
+from HostIndex import HostIndex
+from Matcher import Matcher
+from WeightedSampler import WeightedSampler
+
+#------------------------------------------------------------------------------
+class MatchIndex(object):
+    """
+    Persistent index of every place where the LHS of each Production can be
+    found in a host graph.
+
+    The index is built once with a full search, and then kept up to date
+    after each production application by update(). Applying a production
+    can only invalidate matches that use a deleted vertex or edge, and can
+    only create matches that use an added vertex or edge, so update() drops
+    the former and searches only for matches anchored at the vertices that
+    were added or gained an edge, instead of searching the whole host graph
+    again. Neither searches for a production whose LHS the host can't
+    contain, going by its label counts and degrees (see
+    MatchPlan.applicable()). As only additions can make a production
+    applicable, update() only checks the productions that weren't; one
+    that stops being applicable is still searched, which costs time but
+    finds nothing wrong.
+
+    sample() chooses a match at random, weighted by the weights of the
+    productions. The values it chooses with are kept in a WeightedSampler
+    that is updated as matches are added and removed, so a choice takes
+    O(log P) time for P productions.
+    """
+
+    #--------------------------------------------------------------------------
+    def __init__(self, productions:list, hostIndex:HostIndex, stats=None,
+            selection:str='match'):
+        """
+        Constructor.
+        Inputs:
+            * productions - list of Production objects to index
+            * hostIndex - HostIndex of the host graph. The caller must
+              update it before calling update().
+            * stats - optional GenerationStats in which to record searches
+            * selection - how sample() weights the productions: "match",
+              "distinct" or "production" (see WeightedSampler.selection())
+        Outputs: N/A
+        """
+        if selection not in WeightedSampler.SELECTIONS:
+            raise ValueError('Unknown selection "%s".' % selection)
+        self._productions = productions
+        self._hostIndex = hostIndex
+        self._matcher = Matcher(hostIndex)
+        self._stats = stats
+        self._selection = selection
+        self._sampler = WeightedSampler(len(productions))
+
+        # Per production: list of {vid->vid} mappings (LHS->host), and a
+        # {key->position} dictionary so that a match can be removed in
+        # constant time. A key is the tuple of host vids in _lhsOrder.
+        self._matches = [ [] for p in productions ]
+        self._positions = [ {} for p in productions ]
+
+        # Per production: False if the host can't contain its LHS.
+        self._applicable = [ True for p in productions ]
+
+        # {host vid -> set of (production index, key)} of every match that
+        # uses the host vertex.
+        self._byVertex = {}
+
+        # Optional list to which every change to the matches is appended:
+        # (i, key) when a match of production i is added, (~i, key) when
+        # one is removed. See replay().
+        self.log = None
+
+        # Per production: LHS vids in a fixed order, LHS edges as
+        # (startID, endID) tuples, and {label -> [vid]} of the LHS vertices.
+        self._lhsOrder = []
+        self._lhsEdges = []
+        self._lhsByLabel = []
+        for prod in productions:
+            lhs = prod.lhs()
+            self._lhsOrder.append( [v.id for v in lhs.vertices()] )
+            self._lhsEdges.append( [(s.id, e.id) for (s, e) in lhs.edges()] )
+            byLabel = {}
+            for v in lhs.vertices():
+                byLabel.setdefault(v.label, []).append(v.id)
+            self._lhsByLabel.append(byLabel)
+
+    #--------------------------------------------------------------------------
+    def __len__(self) -> int:
+        """Returns the total number of matches over all productions."""
+        return sum(len(matches) for matches in self._matches)
+
+    #--------------------------------------------------------------------------
+    def build(self, parallelMatcher=None):
+        """
+        (Re)builds the index with a full search of the host graph.
+        Inputs: parallelMatcher - optional ParallelMatcher (for the same
+            productions) to do the search with
+        Outputs: None
+        """
+        self._byVertex = {}
+        self._sampler = WeightedSampler(len(self._productions))
+        for i, prod in enumerate(self._productions):
+            self._matches[i] = []
+            self._positions[i] = {}
+            self._applicable[i] = prod.matchPlan().applicable(self._hostIndex)
+        if parallelMatcher is not None:
+            for i, mappings in enumerate(parallelMatcher.search(self._hostIndex, self._stats)):
+                for mapping in mappings:
+                    self._add(i, mapping)
+            return
+        # Small LHSs that are costly to search for in a big enough host are
+        # searched with a BitsetMatcher (see BitsetMatcher.choose()).
+        matchers = { Matcher : self._matcher }
+        for i, prod in enumerate(self._productions):
+            if not self._applicable[i]:
+                continue
+            matcher = BitsetMatcher.choose(prod.matchPlan(), self._hostIndex,
+                matchers)
+            for mapping in self._search(i, matcher=matcher):
+                self._add(i, mapping)
+
+    #--------------------------------------------------------------------------
+    def match(self, n:int) -> tuple:
+        """
+        Returns the n'th match in the index.
+        Inputs: n - 0 <= n < len(self)
+        Outputs: (Production, mapping) tuple where mapping is a {vid->vid}
+            dictionary (LHS->graph) of where the LHS can be found.
+        """
+        for i, matches in enumerate(self._matches):
+            if n < len(matches):
+                return (self._productions[i], matches[n])
+            n -= len(matches)
+        raise IndexError('match index out of range')
+
+    #--------------------------------------------------------------------------
+    def matches(self) -> list:
+        """
+        Returns every match in the index, in the same form as
+        Generator._findMatchingProductions().
+        Outputs: list of (Production, mapping) tuples
+        """
+        return [ (self._productions[i], mapping)
+            for i, matches in enumerate(self._matches) for mapping in matches ]
+
+    #--------------------------------------------------------------------------
+    def replay(self, changes:list):
+        """
+        Makes the changes recorded in a log (see log) again, without
+        searching, so that the matches end up in the same order as in the
+        index that recorded them.
+        Inputs: changes - list of (i, key) and (~i, key) changes
+        Outputs: None
+        """
+        for (i, key) in changes:
+            if i >= 0:
+                self._add(i, dict(zip(self._lhsOrder[i], key)))
+            else:
+                self._remove(~i, key)
+
+    #--------------------------------------------------------------------------
+    def sample(self, rng) -> tuple:
+        """
+        Chooses a match at random. With "match" selection every match is
+        as likely as the weight of its production times the number of
+        symmetric matches it stands for (so with every weight 1, every
+        match is as likely as it would be if symmetric matches were found
+        too); with "distinct" selection, as likely as the weight of its
+        production; with "production" selection a production with matches
+        is chosen in proportion to its weight, and then one of its matches.
+        Inputs: rng - random.Random (or the random module)
+        Outputs: (Production, mapping) tuple, or None if no match has a
+            weight
+        """
+        choice = self._sampler.sample(rng)
+        if choice is None:
+            return None
+        (i, offset) = choice
+        prod = self._productions[i]
+        matches = self._matches[i]
+        if self._selection == 'match':
+            return (prod, matches[offset // (prod.weight * prod.matchPlan().multiplicity)])
+        if self._selection == 'distinct':
+            return (prod, matches[offset // prod.weight])
+        return (self._productions[i], matches[rng.randrange(len(matches))])
+
+    #--------------------------------------------------------------------------
+    def update(self, delta:Delta):
+        """
+        Brings the index up to date after the host graph has been changed as
+        described by delta.
+        Inputs: delta - Delta describing the change
+        Outputs: None
+        """
+        # Drop matches that use a deleted vertex or a deleted edge.
+        for vid in delta.deletedVertices:
+            for (i, key) in list(self._byVertex.pop(vid, ())):
+                self._remove(i, key)
+        for (startID, endID) in delta.deletedEdges:
+            common = self._byVertex.get(startID, set()) & \
+                self._byVertex.get(endID, set())
+            for (i, key) in common:
+                mapping = self._matches[i][self._positions[i][key]]
+                if (startID, endID) in self._edgeImages(i, mapping):
+                    self._remove(i, key)
+
+        # Every new match must use an added vertex or an added edge, so it
+        # maps some LHS vertex onto one of the touched vertices.
+        addedVertices = { v.id for v in delta.addedVertices }
+        addedEdges = set(delta.addedEdges)
+        touched = [v.id for v in delta.addedVertices]
+        for (startID, endID) in delta.addedEdges:
+            touched.extend( (startID, endID) )
+        if len(touched) == 0:
+            return
+        for i, prod in enumerate(self._productions):
+            if not self._applicable[i]:
+                self._applicable[i] = prod.matchPlan().applicable(self._hostIndex)
+        applicable = [ i for i in range(len(self._productions))
+            if self._applicable[i] ]
+
+        for hostVID in dict.fromkeys(touched):
+            label = self._hostIndex.label(hostVID)
+            for i in applicable:
+                for lhsVID in self._lhsByLabel[i].get(label, ()):
+                    for mapping in self._search(i, (lhsVID, hostVID)):
+                        if addedVertices.intersection(mapping.values()) or \
+                                self._edgeImages(i, mapping) & addedEdges:
+                            self._add(i, mapping)
+
+    #--------------------------------------------------------------------------
+    # PRIVATE METHODS - These aren't the methods you're looking for.
+    #--------------------------------------------------------------------------
+    def _add(self, i:int, mapping:dict):
+        """
+        Adds mapping as a match of production i, unless it is already there.
+        """
+        key = tuple(mapping[lhsID] for lhsID in self._lhsOrder[i])
+        if key in self._positions[i]:
+            return
+        self._positions[i][key] = len(self._matches[i])
+        self._matches[i].append(mapping)
+        self._count(i, 1)
+        for vid in key:
+            self._byVertex.setdefault(vid, set()).add( (i, key) )
+        if self.log is not None:
+            self.log.append( (i, key) )
+
+    #--------------------------------------------------------------------------
+    def _count(self, i:int, change:int):
+        """
+        Updates the sampler after the number of matches of production i
+        changed by change (which has already been made).
+        """
+        count = len(self._matches[i])
+        weight = self._productions[i].weight
+        multiplicity = self._productions[i].matchPlan().multiplicity
+        self._sampler.add(i,
+            WeightedSampler.selection(weight, count, self._selection, multiplicity) -
+            WeightedSampler.selection(weight, count - change, self._selection, multiplicity))
+
+    #--------------------------------------------------------------------------
+    def _edgeImages(self, i:int, mapping:dict) -> set:
+        """
+        Returns the set of host (startID, endID) edges that the LHS edges of
+        production i are mapped onto by mapping.
+        """
+        return { (mapping[s], mapping[e]) for (s, e) in self._lhsEdges[i] }
+
+    #--------------------------------------------------------------------------
+    def _search(self, i:int, anchor:tuple=None, matcher=None):
+        """
+        Searches for the LHS of production i (see Matcher.iterate()),
+        recording the search in the stats, if any. A full search (with no
+        anchor) can be made with another matcher, such as a BitsetMatcher.
+        """
+        plan = self._productions[i].matchPlan()
+        if matcher is None:
+            found = self._matcher.iterate(plan, anchor)
+        else:
+            found = matcher.iterate(plan)
+        if self._stats is None:
+            return found
+        start = time.perf_counter()
+        found = list(found)
+        self._stats.productions[i].recordSearch(time.perf_counter() - start, len(found))
+        return found
+
+    #--------------------------------------------------------------------------
+    def _remove(self, i:int, key:tuple):
+        """
+        Removes the match of production i identified by key. The last match
+        in the list takes its place.
+        """
+        position = self._positions[i].pop(key)
+        last = self._matches[i].pop()
+        if position < len(self._matches[i]):
+            self._matches[i][position] = last
+            lastKey = tuple(last[lhsID] for lhsID in self._lhsOrder[i])
+            self._positions[i][lastKey] = position
+        self._count(i, -1)
+        # Empty sets are dropped (as update() drops the sets of deleted
+        # vertices), so that replay() leaves the same sets behind.
+        for vid in key:
+            matches = self._byVertex.get(vid)
+            if matches is not None:
+                matches.discard( (i, key) )
+                if len(matches) == 0:
+                    del self._byVertex[vid]
+        if self.log is not None:
+            self.log.append( (~i, key) )
@@ -0,0 +1,311 @@
+from HostIndex import HostIndex
+from RewriteScript import RewriteScript
+from SymbolTable import SymbolTable
+from YapyGraph.src.Graph import Graph
+
+#------------------------------------------------------------------------------
+class MatchPlan(object):
+    """
+    A production LHS compiled for searching by Matcher. The LHS vertices are
+    numbered 0..n-1 ("slots"), and for each slot the plan records the label,
+    the minimum out- and in-degree a host vertex needs to be its image, and
+    the LHS edges as slot pairs. If the grammar's SymbolTable is given, the
+    plan also holds the id of each slot's label, which a Matcher compares
+    with the label ids of a host that numbers labels the same way.
+
+    From these, steps() chooses the order in which to map the slots using a
+    cost estimate based on the label counts and average degree of the host.
+    Orders are cached, and re-chosen when the host label counts have drifted
+    far enough from the ones the order was chosen with.
+
+    If the production's RewriteScript is given, the plan also breaks the
+    symmetries of the production. A symmetry (automorphism) is a
+    permutation of the LHS vertices that keeps their labels and edges, and
+    that the rewrite doesn't tell apart: it keeps which vertices and edges
+    are deleted, and the vertices and edges added (e.g. the two Bs of A->B,
+    A->B ==> A, or of A->B, A->B ==> A->B->C1, A->B->C2). Applying the
+    production at m and at m after a symmetry makes the same change (but
+    for which added vertex gets which vertex number), so of the matches
+    that only differ by a symmetry only one needs to be found. For each slot v in turn, the plan finds
+    the orbit of v (the slots the symmetries that fix the earlier slots
+    can move it to), and requires the image of v to come before (in host
+    vid order) the images of the rest of its orbit. Exactly one match in
+    each set of symmetric matches meets every such ordering; multiplicity
+    is the number of matches in each set.
+    """
+
+    # An order is re-chosen once the host count of one of the plan's labels
+    # has grown or shrunk by more than this factor.
+    DRIFT = 2.0
+
+    #--------------------------------------------------------------------------
+    def __init__(self, lhs:Graph, script:RewriteScript=None,
+            symbols:SymbolTable=None):
+        """
+        Constructor.
+        Inputs:
+            * lhs - LHS Graph of a production
+            * script - optional RewriteScript of the production; if given,
+              matches that only differ by a symmetry of the production are
+              found once
+            * symbols - optional SymbolTable of the grammar, in which the
+              labels are interned
+        Outputs: N/A
+        """
+        vertices = list(lhs.vertices())
+        self.vids = [v.id for v in vertices]        # slot -> LHS vid
+        self.labels = [v.label for v in vertices]   # slot -> label
+        self.symbols = symbols
+        self.labelIDs = None                        # slot -> label id
+        if symbols is not None:
+            self.labelIDs = [symbols.intern(label) for label in self.labels]
+        slots = { vid : i for i, vid in enumerate(self.vids) }
+
+        # LHS edges as (startSlot, endSlot), without duplicates.
+        self.edges = list(dict.fromkeys(
+            (slots[start.id], slots[end.id]) for (start, end) in lhs.edges() ))
+
+        # Minimum degrees: the number of distinct LHS neighbors of each slot.
+        self.minOut = [0] * len(vertices)
+        self.minIn = [0] * len(vertices)
+        for (startSlot, endSlot) in self.edges:
+            self.minOut[startSlot] += 1
+            self.minIn[endSlot] += 1
+
+        # {label -> (number of slots, largest minOut, largest minIn)} of
+        # the slots with each label, for applicable().
+        self._needs = {}
+        for slot, label in enumerate(self.labels):
+            (count, minOut, minIn) = self._needs.get(label, (0, 0, 0))
+            self._needs[label] = (count + 1, max(minOut, self.minOut[slot]),
+                max(minIn, self.minIn[slot]))
+
+        # (before, after) slot pairs: the image of before must come before
+        # the image of after. Each match found stands for multiplicity
+        # matches.
+        self.orderings = []
+        self.multiplicity = 1
+        if script is not None:
+            self._breakSymmetries(script)
+
+        # {anchor slot (or None) -> (steps, {label -> count}, cost)}
+        self._orders = {}
+
+    #--------------------------------------------------------------------------
+    def __len__(self) -> int:
+        """Returns the number of LHS vertices."""
+        return len(self.vids)
+
+    #--------------------------------------------------------------------------
+    def applicable(self, histogram) -> bool:
+        """
+        Returns False if the host plainly can't contain the LHS: it has
+        fewer vertices with some label than the LHS, or none with a large
+        enough out- or in-degree. True means a search may find a match.
+        Inputs: histogram - LabelHistogram of the host, or anything with
+            its count(), maxOutDegree() and maxInDegree() methods (such as
+            a HostIndex or HostGraph)
+        Outputs: bool
+        """
+        for label, (count, minOut, minIn) in self._needs.items():
+            if histogram.count(label) < count or \
+                    histogram.maxOutDegree(label) < minOut or \
+                    histogram.maxInDegree(label) < minIn:
+                return False
+        return True
+
+    #--------------------------------------------------------------------------
+    def cost(self, hostIndex:HostIndex, anchor:int=None) -> float:
+        """
+        Returns the estimated number of partial matches a search with the
+        current order will visit.
+        Inputs: see steps()
+        Outputs: estimated cost
+        """
+        self.steps(hostIndex, anchor)
+        return self._orders[anchor][2]
+
+    #--------------------------------------------------------------------------
+    def orders(self) -> dict:
+        """
+        Returns the cached orders, e.g. to save them; see setOrders().
+        """
+        return self._orders
+
+    #--------------------------------------------------------------------------
+    def reset(self):
+        """
+        Forgets the cached orders, so that the next searches don't depend on
+        the hosts searched before (the order decides the order in which
+        matches are found).
+        """
+        self._orders = {}
+
+    #--------------------------------------------------------------------------
+    def setOrders(self, orders:dict):
+        """
+        Replaces the cached orders with ones returned by orders(), so that
+        searches find matches in the same order as they would have with the
+        plan that returned them.
+        """
+        self._orders = orders
+
+    #--------------------------------------------------------------------------
+    def slot(self, vid) -> int:
+        """Returns the slot of LHS vertex vid."""
+        return self.vids.index(vid)
+
+    #--------------------------------------------------------------------------
+    def steps(self, hostIndex:HostIndex, anchor:int=None) -> list:
+        """
+        Returns the order in which to map the LHS vertices onto the host.
+        Inputs:
+            * hostIndex - HostIndex of the host graph
+            * anchor - optional slot that must come first
+        Outputs: list of (slot, label, minOut, minIn, edges, orderings)
+            steps, where edges is a list of (position, outgoing) pairs, one
+            per LHS edge between the step's vertex and the vertex of an
+            earlier (or the same) step at position; outgoing is True if the
+            edge goes from the earlier vertex to the step's vertex.
+            orderings is a list of (position, after) pairs, one per ordering
+            between the step's vertex and that of an earlier step; after is
+            True if the step's image must come after the earlier one.
+        """
+        order = self._orders.get(anchor)
+        if order is None or self._drifted(order[1], hostIndex):
+            counts = { label : hostIndex.count(label) for label in self.labels }
+            (steps, cost) = self._compile(hostIndex, anchor)
+            order = (steps, counts, cost)
+            self._orders[anchor] = order
+        return order[0]
+
+    #--------------------------------------------------------------------------
+    # PRIVATE METHODS - These aren't the methods you're looking for.
+    #--------------------------------------------------------------------------
+    def _breakSymmetries(self, script:RewriteScript):
+        """
+        Sets orderings and multiplicity from the symmetries of the
+        production compiled into script (see the class comment).
+        """
+        # The production as one graph: LHS vertices (by slot, which is also
+        # their position in script) colored by label and whether they are
+        # deleted, then the added vertices colored by label, and
+        # every edge colored by what the rewrite does with it.
+        n = len(self.vids)
+        deleted = set(script.deleteVertices)
+        colors = [ (label, slot in deleted) for slot, label in enumerate(self.labels) ]
+        colors.extend( (None, label) for (label, number) in script.addVertices )
+        edgeColors = { edge : 'lhs' for edge in self.edges }
+        edgeColors.update( (edge, 'delete') for edge in script.deleteEdges )
+        edgeColors.update( (edge, 'add') for edge in script.addEdges )
+
+        for v in range(n):
+            fixed = { slot : slot for slot in range(v) }
+            orbit = [ u for u in range(v, n) if colors[u] == colors[v] and
+                self._extends({ **fixed, v : u }, colors, edgeColors) ]
+            self.orderings.extend( (v, u) for u in orbit if u != v )
+            self.multiplicity *= len(orbit)
+
+    #--------------------------------------------------------------------------
+    def _compile(self, hostIndex:HostIndex, anchor:int) -> tuple:
+        """
+        Greedily orders the slots, each time taking the one with the
+        smallest estimated number of candidates per partial match.
+        Outputs: (steps, cost) - see steps() and cost()
+        """
+        numVertices = max(hostIndex.numVertices(), 1)
+        averageDegree = hostIndex.numEdges() / numVertices
+
+        def branching(slot, placed):
+            backEdges = sum(1 for (s, e) in self.edges if
+                (s == slot and e in placed) or (e == slot and s in placed))
+            if backEdges == 0:
+                return (hostIndex.count(self.labels[slot]), 0)
+            labelShare = hostIndex.count(self.labels[slot]) / numVertices
+            edgeShare = averageDegree / numVertices
+            return (averageDegree * labelShare * edgeShare ** (backEdges - 1),
+                -backEdges)
+
+        order = []
+        remaining = list(range(len(self.vids)))
+        cost = 0.0
+        partial = 1.0
+        if anchor is not None:
+            order.append(anchor)
+            remaining.remove(anchor)
+        while len(remaining) > 0:
+            slot = min(remaining, key=lambda s: branching(s, order))
+            partial *= branching(slot, order)[0]
+            cost += partial
+            order.append(slot)
+            remaining.remove(slot)
+
+        position = { slot : i for i, slot in enumerate(order) }
+        steps = []
+        for i, slot in enumerate(order):
+            stepEdges = []
+            for (startSlot, endSlot) in self.edges:
+                if startSlot == slot and position[endSlot] <= i:
+                    stepEdges.append( (position[endSlot], False) )
+                elif endSlot == slot and position[startSlot] <= i:
+                    stepEdges.append( (position[startSlot], True) )
+            stepOrderings = []
+            for (before, after) in self.orderings:
+                if after == slot and position[before] < i:
+                    stepOrderings.append( (position[before], True) )
+                elif before == slot and position[after] < i:
+                    stepOrderings.append( (position[after], False) )
+            steps.append( (slot, self.labels[slot], self.minOut[slot],
+                self.minIn[slot], stepEdges, stepOrderings) )
+        return (steps, cost)
+
+    #--------------------------------------------------------------------------
+    def _drifted(self, counts:dict, hostIndex:HostIndex) -> bool:
+        """
+        Returns True if the host count of any label has changed by more than
+        DRIFT since counts was taken.
+        """
+        for label, count in counts.items():
+            ratio = max(hostIndex.count(label), 1) / max(count, 1)
+            if ratio > self.DRIFT or ratio < 1 / self.DRIFT:
+                return True
+        return False
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _extends(fixed:dict, colors:list, edgeColors:dict) -> bool:
+        """
+        Returns True if some permutation of the vertices 0..len(colors)-1
+        that keeps their colors and the colors of the edges maps each key
+        of fixed onto its value. Vertices are mapped in order, backtracking.
+        """
+        images = [None] * len(colors)
+        for v, u in fixed.items():
+            images[v] = u
+
+        def fits(v, u):
+            # Edges between v and the vertices mapped before it (or fixed).
+            for w in range(len(colors)):
+                if images[w] is None and w != v:
+                    continue
+                x = u if w == v else images[w]
+                if edgeColors.get( (v, w) ) != edgeColors.get( (u, x) ) or \
+                        edgeColors.get( (w, v) ) != edgeColors.get( (x, u) ):
+                    return False
+            return True
+
+        def extend(v):
+            if v == len(colors):
+                return True
+            if images[v] is not None:
+                return fits(v, images[v]) and extend(v + 1)
+            used = set(images)
+            for u in range(len(colors)):
+                if u not in used and colors[u] == colors[v] and fits(v, u):
+                    images[v] = u
+                    if extend(v + 1):
+                        return True
+            images[v] = None
+            return False
+
+        return extend(0)
@@ -0,0 +1,182 @@
+from HostIndex import HostIndex
+from MatchPlan import MatchPlan
+
+#------------------------------------------------------------------------------
+class Matcher(object):
+    """
+    Subgraph search over a HostIndex. Finds every injective mapping of the
+    vertices of a production LHS onto host vertices with the same label,
+    such that every LHS edge maps onto a host edge. Like Graph.search(),
+    vertex numbers are ignored. If the plan breaks the symmetries of its
+    production, only the matches whose images are in the plan's orderings
+    (in host vid order) are found.
+
+    The LHS is given as a MatchPlan, which decides the order in which LHS
+    vertices are mapped and the label, degree and edge constraints to check
+    at each step. Candidates for a step come from the host adjacency of an
+    already mapped vertex where possible, and from the label index
+    otherwise.
+
+    If the host numbers its labels in a SymbolTable (as HostGraph does),
+    labels are compared by id: the plan's own ids if the host's table
+    extends the grammar's, which the plan was compiled with.
+    """
+
+    #--------------------------------------------------------------------------
+    def __init__(self, hostIndex:HostIndex):
+        """
+        Constructor.
+        Inputs: hostIndex - HostIndex of the graph to search
+        Outputs: N/A
+        """
+        self.hostIndex = hostIndex
+        self._label = hostIndex.label if hostIndex.symbols is None \
+            else hostIndex.labelID
+
+    #--------------------------------------------------------------------------
+    def first(self, plan:MatchPlan, rng):
+        """
+        Searches in a random order and returns the first match found. This
+        is much cheaper than enumerating every match, but matches are not
+        equally likely to be returned.
+        Inputs:
+            * plan - MatchPlan of the LHS to search for
+            * rng - random.Random (or the random module) to order the search
+        Outputs: {vid->vid} (lhs->host) dictionary, or None if there is no
+            match
+        """
+        return next(self.iterate(plan, rng=rng), None)
+
+    #--------------------------------------------------------------------------
+    def iterate(self, plan:MatchPlan, anchor:tuple=None, rng=None, part:tuple=None):
+        """
+        Generates every place where the LHS compiled into plan can be found
+        in the host graph.
+        Inputs:
+            * plan - MatchPlan of the LHS to search for
+            * anchor - optional (lhsVID, hostVID) pair; if given only
+              matches that map lhsVID onto hostVID are generated
+            * rng - optional random.Random (or the random module); if given
+              the candidates of each step are tried in a random order
+            * part - optional (index, count) pair; if given only the
+              index'th of count equal partitions of the candidates for the
+              first step are searched
+        Outputs: generator of {vid->vid} (lhs->host) dictionaries
+        """
+        if len(plan) == 0:
+            return
+        if anchor is not None:
+            steps = plan.steps(self.hostIndex, plan.slot(anchor[0]))
+            first = [anchor[1]]
+        else:
+            steps = plan.steps(self.hostIndex)
+            first = self.hostIndex.vertices(steps[0][1])
+        if part is not None:
+            first = list(first)[part[0]::part[1]]
+
+        labels = self._labels(plan, steps)
+        images = [None] * len(steps)
+        for hostVID in self._ordered(first, rng):
+            if self._fits(steps[0], labels[0], hostVID, images, 0):
+                images[0] = hostVID
+                for complete in self._extend(steps, labels, 1, images, rng):
+                    yield { plan.vids[steps[i][0]] : complete[i]
+                        for i in range(len(steps)) }
+
+    #--------------------------------------------------------------------------
+    def search(self, plan:MatchPlan, anchor:tuple=None) -> list:
+        """
+        Finds every place where the LHS compiled into plan can be found in
+        the host graph.
+        Inputs: see iterate()
+        Outputs: list of {vid->vid} (lhs->host) dictionaries
+        """
+        return list(self.iterate(plan, anchor))
+
+    #--------------------------------------------------------------------------
+    # PRIVATE METHODS - These aren't the methods you're looking for.
+    #--------------------------------------------------------------------------
+    def _candidates(self, step:tuple, images:list, k:int):
+        """
+        Returns the host vids that may be the image of step's vertex (the
+        k'th): the neighbors of an already mapped vertex if step has an edge
+        to one, otherwise every host vertex with step's label.
+        """
+        for (position, outgoing) in step[4]:
+            if position < k and outgoing:
+                return self.hostIndex.successors(images[position])
+            if position < k:
+                return self.hostIndex.predecessors(images[position])
+        return self.hostIndex.vertices(step[1])
+
+    #--------------------------------------------------------------------------
+    def _extend(self, steps:list, labels:list, k:int, images:list, rng):
+        """
+        Generates images for every complete match that extends the partial
+        match images[0:k].
+        """
+        if k == len(steps):
+            yield images
+            return
+        for hostVID in self._ordered(self._candidates(steps[k], images, k), rng):
+            if self._fits(steps[k], labels[k], hostVID, images, k):
+                images[k] = hostVID
+                yield from self._extend(steps, labels, k + 1, images, rng)
+        images[k] = None
+
+    #--------------------------------------------------------------------------
+    def _fits(self, step:tuple, label, hostVID, images:list, k:int) -> bool:
+        """
+        Returns True if hostVID can be the image of step's vertex (the k'th),
+        given the images of the first k steps. label is step's label as the
+        host gives it (see _labels()).
+        """
+        (slot, stepLabel, minOut, minIn, edges, orderings) = step
+        if self._label(hostVID) != label or hostVID in images[0:k]:
+            return False
+        for (position, after) in orderings:
+            if (images[position] < hostVID) != after:
+                return False
+        successors = self.hostIndex.successors(hostVID)
+        predecessors = self.hostIndex.predecessors(hostVID)
+        if len(successors) < minOut or len(predecessors) < minIn:
+            return False
+        for (position, outgoing) in edges:
+            if position == k:
+                # A loop on the vertex itself.
+                if hostVID not in successors:
+                    return False
+            elif outgoing:
+                if images[position] not in predecessors:
+                    return False
+            elif images[position] not in successors:
+                return False
+        return True
+
+    #--------------------------------------------------------------------------
+    def _labels(self, plan:MatchPlan, steps:list) -> list:
+        """
+        Returns the label of each step as the host gives them: the label
+        itself, or its id in the host's SymbolTable (None if the host has
+        never had the label).
+        """
+        symbols = self.hostIndex.symbols
+        if symbols is None:
+            return [ step[1] for step in steps ]
+        if plan.symbols is not None and symbols.extends(plan.symbols):
+            return [ plan.labelIDs[step[0]] for step in steps ]
+        return [ symbols.find(step[1]) for step in steps ]
+
+    #--------------------------------------------------------------------------
+    def _ordered(self, candidates, rng):
+        """
+        Returns candidates as they are if rng is None, otherwise as a list
+        rotated to start at a random position. (A rotation is enough to
+        randomize where a first-match search starts, and is much cheaper than
+        a shuffle on large label sets.)
+        """
+        if rng is None or len(candidates) < 2:
+            return candidates
+        candidates = list(candidates)
+        start = rng.randrange(len(candidates))
+        return candidates[start:] + candidates[:start]
@@ -0,0 +1,312 @@
+import multiprocessing
+import time
+from array import array
+from multiprocessing import resource_tracker
+from multiprocessing import shared_memory
+
+from HostIndex import HostIndex
+from Matcher import Matcher
+
+#------------------------------------------------------------------------------
+class SharedHost(object):
+    """
+    Read-only view of a host graph snapshot in shared memory, with the same
+    search interface as HostIndex, so that a Matcher can search it.
+
+    The snapshot is a flat array of ints: a header (number of vertices,
+    edges and labels), the label number of each vertex, and three CSR
+    (offsets + values) tables: successors, predecessors and the vertices
+    of each label. Vertices are numbered 0..n-1; label numbers index a
+    label table that is passed alongside the snapshot.
+    """
+
+    # Label numbers aren't a SymbolTable's (see HostIndex.symbols).
+    symbols = None
+
+    #--------------------------------------------------------------------------
+    def __init__(self, buffer, labels:list):
+        """
+        Constructor.
+        Inputs:
+            * buffer - buffer holding a snapshot written by write()
+            * labels - label table; labels[i] is the label numbered i
+        Outputs: N/A
+        """
+        self._ints = memoryview(buffer).cast('i')
+        (numVertices, numEdges, numLabels) = self._ints[0:3]
+        self._numVertices = numVertices
+        self._numEdges = numEdges
+        self._labels = labels
+        self._labelNumbers = { label : i for i, label in enumerate(labels) }
+
+        offset = 3
+        self._vertexLabels = self._ints[offset:offset + numVertices]
+        offset += numVertices
+        (self._successorOffsets, self._successorValues, offset) = \
+            self._table(offset, numVertices, numEdges)
+        (self._predecessorOffsets, self._predecessorValues, offset) = \
+            self._table(offset, numVertices, numEdges)
+        (self._labelOffsets, self._labelValues, offset) = \
+            self._table(offset, numLabels, numVertices)
+
+        # Adjacency sets, built from the tables on first use.
+        self._successors = {}
+        self._predecessors = {}
+
+    #--------------------------------------------------------------------------
+    def count(self, label:str) -> int:
+        """Returns the number of host vertices with the given label."""
+        return len(self.vertices(label))
+
+    #--------------------------------------------------------------------------
+    def label(self, vid:int) -> str:
+        """Returns the label of host vertex vid."""
+        return self._labels[self._vertexLabels[vid]]
+
+    #--------------------------------------------------------------------------
+    def numEdges(self) -> int:
+        """Returns the number of edges in the host graph."""
+        return self._numEdges
+
+    #--------------------------------------------------------------------------
+    def numVertices(self) -> int:
+        """Returns the number of vertices in the host graph."""
+        return self._numVertices
+
+    #--------------------------------------------------------------------------
+    def predecessors(self, vid:int) -> set:
+        """Returns the set of vids with an edge to host vertex vid."""
+        if vid not in self._predecessors:
+            self._predecessors[vid] = set(self._predecessorValues[
+                self._predecessorOffsets[vid]:self._predecessorOffsets[vid + 1]])
+        return self._predecessors[vid]
+
+    #--------------------------------------------------------------------------
+    def release(self):
+        """
+        Releases the view of the buffer, so that the shared memory can be
+        closed.
+        """
+        for view in [self._vertexLabels, self._successorOffsets,
+                self._successorValues, self._predecessorOffsets,
+                self._predecessorValues, self._labelOffsets,
+                self._labelValues, self._ints]:
+            view.release()
+
+    #--------------------------------------------------------------------------
+    def successors(self, vid:int) -> set:
+        """Returns the set of vids with an edge from host vertex vid."""
+        if vid not in self._successors:
+            self._successors[vid] = set(self._successorValues[
+                self._successorOffsets[vid]:self._successorOffsets[vid + 1]])
+        return self._successors[vid]
+
+    #--------------------------------------------------------------------------
+    def vertices(self, label:str):
+        """Returns the host vids with the given label."""
+        number = self._labelNumbers.get(label)
+        if number is None:
+            return ()
+        return self._labelValues[
+            self._labelOffsets[number]:self._labelOffsets[number + 1]]
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def write(hostIndex:HostIndex, vids:list) -> tuple:
+        """
+        Writes a snapshot of a host graph to a new block of shared memory.
+        Inputs:
+            * hostIndex - HostIndex of the host graph
+            * vids - list of every host vid; vertex i of the snapshot is
+              vids[i]
+        Outputs: (SharedMemory, labels) where labels is the label table
+        """
+        numbers = { vid : i for i, vid in enumerate(vids) }
+        labels = list(dict.fromkeys(hostIndex.label(vid) for vid in vids))
+        labelNumbers = { label : i for i, label in enumerate(labels) }
+
+        ints = array('i', [len(vids), hostIndex.numEdges(), len(labels)])
+        ints.extend(labelNumbers[hostIndex.label(vid)] for vid in vids)
+        for neighbors in [hostIndex.successors, hostIndex.predecessors]:
+            offsets = array('i', [0])
+            values = array('i')
+            for vid in vids:
+                values.extend(numbers[n] for n in neighbors(vid))
+                offsets.append(len(values))
+            ints.extend(offsets)
+            ints.extend(values)
+        offsets = array('i', [0])
+        values = array('i')
+        for label in labels:
+            values.extend(numbers[vid] for vid in hostIndex.vertices(label))
+            offsets.append(len(values))
+        ints.extend(offsets)
+        ints.extend(values)
+
+        memory = shared_memory.SharedMemory(create=True,
+            size=len(ints) * ints.itemsize)
+        memory.buf[0:len(ints) * ints.itemsize] = ints.tobytes()
+        return (memory, labels)
+
+    #--------------------------------------------------------------------------
+    # PRIVATE METHODS - These aren't the methods you're looking for.
+    #--------------------------------------------------------------------------
+    def _table(self, offset:int, numRows:int, numValues:int) -> tuple:
+        """
+        Returns (offsets, values, nextOffset) for the CSR table that starts
+        at offset in the snapshot.
+        """
+        offsets = self._ints[offset:offset + numRows + 1]
+        offset += numRows + 1
+        values = self._ints[offset:offset + numValues]
+        return (offsets, values, offset + numValues)
+
+#------------------------------------------------------------------------------
+class ParallelMatcher(object):
+    """
+    Enumerates the matches of a list of productions with a pool of worker
+    processes. The productions are sent to each worker once, when the pool
+    starts. For each search the host graph is written once to shared memory
+    (see SharedHost), and each task searches one production from one
+    partition of the candidates for its first LHS vertex, returning its
+    matches as compact tuples of snapshot vertex numbers.
+
+    Use as a context manager, or call close() when done.
+    """
+
+    #--------------------------------------------------------------------------
+    def __init__(self, productions:list, numWorkers:int):
+        """
+        Constructor. Starts the worker processes.
+        Inputs:
+            * productions - list of Production objects
+            * numWorkers - number of worker processes
+        Outputs: N/A
+        """
+        self._productions = productions
+        self._numWorkers = numWorkers
+        # Start the resource tracker first, so that the workers share it:
+        # then the snapshots they attach to are forgotten when this process
+        # unlinks them, rather than "leaked" by a tracker of their own.
+        resource_tracker.ensure_running()
+        self._pool = multiprocessing.Pool(numWorkers, _initWorker, (productions,))
+
+    #--------------------------------------------------------------------------
+    def __enter__(self):
+        return self
+
+    #--------------------------------------------------------------------------
+    def __exit__(self, *args):
+        self.close()
+
+    #--------------------------------------------------------------------------
+    def close(self):
+        """Stops the worker processes."""
+        self._pool.terminate()
+        self._pool.join()
+
+    #--------------------------------------------------------------------------
+    def search(self, hostIndex:HostIndex, stats=None) -> list:
+        """
+        Finds every match of every production.
+        Inputs:
+            * hostIndex - HostIndex of the host graph
+            * stats - optional GenerationStats in which to record the
+              searches
+        Outputs: list, per production, of lists of {vid->vid} (lhs->host)
+            dictionaries
+        """
+        (vids, results) = self._run(hostIndex, stats)
+        matches = [ [] for p in self._productions ]
+        for (i, found) in results:
+            for images in found:
+                matches[i].append(self._mapping(i, images, vids)[1])
+        return matches
+
+    #--------------------------------------------------------------------------
+    # PRIVATE METHODS - These aren't the methods you're looking for.
+    #--------------------------------------------------------------------------
+    def _mapping(self, i:int, images:tuple, vids:list) -> tuple:
+        """
+        Converts a match of production i returned by a worker (snapshot
+        vertex numbers in slot order) into a (Production, mapping) tuple.
+        """
+        prod = self._productions[i]
+        plan = prod.matchPlan()
+        return (prod, { plan.vids[slot] : vids[n] for slot, n in enumerate(images) })
+
+    #--------------------------------------------------------------------------
+    def _run(self, hostIndex:HostIndex, stats) -> tuple:
+        """
+        Writes the host graph to shared memory and runs one task per
+        production and partition (but for productions that can't match,
+        see MatchPlan.applicable()), each returning all its matches. If
+        stats is given, the tasks for each production are recorded as one
+        search, taking their total time.
+        Outputs: (vids, results) where vids maps snapshot vertex numbers to
+            host vids, and results is a list of (production index, result)
+        """
+        # In vid order, so that the workers' orderings between vertex
+        # numbers are the orderings between vids (see MatchPlan).
+        vids = sorted(vid for label in hostIndex.labels()
+            for vid in hostIndex.vertices(label))
+        (memory, labels) = SharedHost.write(hostIndex, vids)
+        try:
+            tasks = [ (memory.name, labels, i, part, self._numWorkers)
+                for i in range(len(self._productions))
+                if self._productions[i].matchPlan().applicable(hostIndex)
+                for part in range(self._numWorkers) ]
+            results = self._pool.map(_searchTask, tasks)
+        finally:
+            memory.close()
+            memory.unlink()
+
+        if stats is not None:
+            times = [0.0] * len(self._productions)
+            counts = [0] * len(self._productions)
+            for (task, (seconds, result)) in zip(tasks, results):
+                times[task[2]] += seconds
+                counts[task[2]] += len(result)
+            for i in range(len(self._productions)):
+                stats.productions[i].recordSearch(times[i], counts[i])
+        return (vids, [ (task[2], result) for task, (seconds, result) in zip(tasks, results) ])
+
+#------------------------------------------------------------------------------
+# Worker process state and entry points.
+#------------------------------------------------------------------------------
+_workerProductions = None   # list of Production objects
+_workerMemory = None        # SharedMemory of the current snapshot
+_workerHost = None          # SharedHost over _workerMemory
+
+def _initWorker(productions:list):
+    """Pool initializer: keeps the productions for every later task."""
+    global _workerProductions
+    _workerProductions = productions
+
+def _searchTask(task:tuple):
+    """
+    Searches one partition of one production on a snapshot.
+    Inputs: (memoryName, labels, production index, part, numParts)
+    Outputs: (seconds, matches) where seconds is the time the search took,
+        and matches is a list of tuples of snapshot vertex numbers in slot
+        order.
+    """
+    global _workerMemory, _workerHost
+    (memoryName, labels, i, part, numParts) = task
+
+    # Attach to the snapshot, unless this worker already has.
+    if _workerMemory is None or _workerMemory.name != memoryName:
+        if _workerMemory is not None:
+            _workerHost.release()
+            _workerMemory.close()
+        _workerMemory = shared_memory.SharedMemory(name=memoryName)
+        _workerHost = SharedHost(_workerMemory.buf, labels)
+
+    start = time.perf_counter()
+    # Which tasks a worker gets varies from run to run, so the order is
+    # chosen from this snapshot alone.
+    plan = _workerProductions[i].matchPlan()
+    plan.reset()
+    matches = Matcher(_workerHost).iterate(plan, part=(part, numParts))
+    found = [ tuple(mapping[vid] for vid in plan.vids) for mapping in matches ]
+    return (time.perf_counter() - start, found)
@@ -1,15 +1,12 @@
-import logging
 import re
-import sys
 
 from Production import Production
 from Lexer import Lexer
+from SymbolTable import SymbolTable
 from Token import TokenTypes
 from Token import Token
 from YapyGraph.src.Graph import Graph
 from YapyGraph.src.Vertex import Vertex
-   
-logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
 
 #------------------------------------------------------------------------------
 #   ____                          
@@ -21,8 +18,15 @@ logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
 class Parser(object):
     """
     Graph productions parser.
+
+    Vertex labels are interned in one SymbolTable for the whole grammar
+    (self.symbols), which its Productions share.
     """
 
+    # Vertex label, and optional vertex number, of an ID (e.g., "A1").
+    LABEL = re.compile('[A-z]+')
+    NUMBER = re.compile('[0-9]+$')
+
     #--------------------------------------------------------------------------
     def __init__(self, lexer:Lexer):
         """
@@ -35,6 +39,8 @@ class Parser(object):
         self.config = {}                        # configuration section of the input
         self.productions = []                   # array of Production objects
         self.startGraph = None                  # starting graph
+        self.symbols = SymbolTable()            # vertex labels
+        self._vertexIDs = {}                    # {ID text -> (label, number, name)}
 
         # As we are parsing a graph, we keep track of the number
         # of vertices parsed so far.                                                             TODO: Why?
@@ -183,15 +189,21 @@ class Parser(object):
     #--------------------------------------------------------------------------
     def _parseProduction(self):
         """
-        prod -> graph '==>' graph
+        prod -> graph '==>' graph | graph '==>' graph ':' NUMBER
 
         A production defines a transformation taking one graph (on the LHS)
-        and transforming it to a different graph (RHS).
+        and transforming it to a different graph (RHS). It may be given a
+        weight (default 1), which makes it more (or less) likely to be
+        chosen.
         """
         lhs = self._parseGraph()
         self._match(TokenTypes.DOUBLEARROW)
         rhs = self._parseGraph()
-        self.productions.append( Production(lhs, rhs) )
+        weight = 1
+        if self.lookahead.type == TokenTypes.COLON:
+            self._consume()
+            weight = int(self._match(TokenTypes.NUMBER).text)
+        self.productions.append( Production(lhs, rhs, weight, self.symbols) )
        
     #--------------------------------------------------------------------------
     def _parseProductionList(self):
@@ -238,13 +250,18 @@ class Parser(object):
         exist in the given graph, it is added. Otherwise, the existing 
         vertex from the graph is returned.
         """
-        # Find the vertex label and optional number.
-        label = re.match('[A-z]+', token.text).group(0)
-        match = re.search('[0-9]+$', token.text)
-        number = match.group(0) if match is not None else None
-
-        # Turn the label and number into a "name".
-        name = Vertex.makeName(label, number)
+        # Find the vertex label, optional number and "name". Each distinct
+        # ID is only taken apart once, and its label is interned.
+        parsed = self._vertexIDs.get(token.text)
+        if parsed is None:
+            label = self.LABEL.match(token.text).group(0)
+            match = self.NUMBER.search(token.text)
+            number = match.group(0) if match is not None else None
+            name = Vertex.makeName(label, number)
+            label = self.symbols.symbol(self.symbols.intern(label))
+            parsed = (label, number, name)
+            self._vertexIDs[token.text] = parsed
+        (label, number, name) = parsed
 
         # Does the graph already have a vertex with the same name?
         vertex = graph.hasVertex(name)
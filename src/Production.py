@@ -1,3 +1,6 @@
+from MatchPlan import MatchPlan
+from RewriteScript import RewriteScript
+from SymbolTable import SymbolTable
 from YapyGraph.src import Graph
 
 #------------------------------------------------------------------------------
@@ -10,20 +13,31 @@ from YapyGraph.src import Graph
 class Production(object):
     """
     Represents a production consisting of a left-hand side and a right-hand
-    side.
+    side, and a weight that makes it more (or less) likely to be chosen.
     """
 
     #------------------------------------------------------------------------------
-    def __init__(self, lhs: Graph, rhs: Graph):
+    def __init__(self, lhs: Graph, rhs: Graph, weight: int = 1,
+            symbols: SymbolTable = None):
         """
         Constructor.
         Inputs:
             * lhs - Graph object on the LHS.
             * rhs - Graph object on the RHS.
+            * weight - non-negative int weight of the production (0 means
+              it is never chosen)
+            * symbols - optional SymbolTable of the grammar, in which the
+              labels of lhs and rhs are interned (see Parser)
         Outputs: N/A 
         """
+        if weight < 0:
+            raise ValueError('A production weight must be at least 0.')
         self._lhs = lhs
         self._rhs = rhs
+        self.weight = weight
+        self.symbols = symbols
+        self._matchPlan = None  # compiled on first use
+        self._rewriteScript = None  # compiled on first use
 
     #------------------------------------------------------------------------------
     def __str__(self) -> str:
@@ -35,10 +49,36 @@ class Production(object):
 
     def set_lhs(self, value):
         self._lhs = value
+        self._matchPlan = None
+        self._rewriteScript = None
+
+    #------------------------------------------------------------------------------
+    def matchPlan(self) -> MatchPlan:
+        """
+        Returns the MatchPlan of the LHS, compiling it on first use. The
+        plan finds matches that only differ by a symmetry of the production
+        once (see MatchPlan).
+        """
+        if self._matchPlan is None:
+            self._matchPlan = MatchPlan(self._lhs, self.rewriteScript(),
+                self.symbols)
+        return self._matchPlan
+
+    #------------------------------------------------------------------------------
+    def rewriteScript(self) -> RewriteScript:
+        """
+        Returns the RewriteScript of the production, compiling it on first
+        use.
+        """
+        if self._rewriteScript is None:
+            self._rewriteScript = RewriteScript(self._lhs, self._rhs)
+        return self._rewriteScript
 
      #------------------------------------------------------------------------------
     def rhs(self):
         return self._rhs
 
     def set_rhs(self, value):
-        self._rhs = value
\ No newline at end of file
+        self._rhs = value
+        self._matchPlan = None
+        self._rewriteScript = None
\ No newline at end of file
@@ -0,0 +1,70 @@
+#------------------------------------------------------------------------------
+class ProductionStats(object):
+    """
+    Performance statistics for one Production over a generation run: how
+    often its LHS was searched for and how long that took, how many matches
+    were found, how often it was selected, and the time spent applying it,
+    split into the phases of RewriteScript.apply().
+
+    Search times are also kept as a histogram: searchHistogram[k] counts
+    the searches that took less than 2**k microseconds (and, for k > 0, at
+    least 2**(k-1)).
+    """
+
+    #--------------------------------------------------------------------------
+    def __init__(self, production):
+        """
+        Constructor.
+        Inputs: production - the Production
+        Outputs: N/A
+        """
+        self.production = production
+        self.searches = 0           # number of searches
+        self.searchTime = 0.0       # total search time, in seconds
+        self.searchHistogram = []   # see above
+        self.matches = 0            # matches found by all searches
+        self.selected = 0           # times applied
+        self.mapTime = 0.0          # applying: matching vertices to the host
+        self.deleteTime = 0.0       # applying: deleting vertices and edges
+        self.addTime = 0.0          # applying: adding vertices and edges
+
+    #--------------------------------------------------------------------------
+    def __str__(self) -> str:
+        return '%8d searches %10.6fs %8d matches %8d selected ' \
+            'apply %10.6fs (map %.6fs, delete %.6fs, add %.6fs)' % (
+            self.searches, self.searchTime, self.matches, self.selected,
+            self.applyTime(), self.mapTime, self.deleteTime, self.addTime)
+
+    #--------------------------------------------------------------------------
+    def applyTime(self) -> float:
+        """Returns the total time spent applying the production, in seconds."""
+        return self.mapTime + self.deleteTime + self.addTime
+
+    #--------------------------------------------------------------------------
+    def recordApply(self, mapTime:float, deleteTime:float, addTime:float):
+        """
+        Records one application of the production.
+        Inputs: time spent in each phase, in seconds
+        Outputs: None
+        """
+        self.selected += 1
+        self.mapTime += mapTime
+        self.deleteTime += deleteTime
+        self.addTime += addTime
+
+    #--------------------------------------------------------------------------
+    def recordSearch(self, seconds:float, numMatches:int):
+        """
+        Records one search for the production's LHS.
+        Inputs:
+            * seconds - time the search took
+            * numMatches - number of matches it found
+        Outputs: None
+        """
+        self.searches += 1
+        self.searchTime += seconds
+        self.matches += numMatches
+        bucket = int(seconds * 1e6).bit_length()
+        if bucket >= len(self.searchHistogram):
+            self.searchHistogram.extend([0] * (bucket + 1 - len(self.searchHistogram)))
+        self.searchHistogram[bucket] += 1
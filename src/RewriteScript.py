@@ -0,0 +1,158 @@
+import time
+
+from Delta import Delta
+from YapyGraph.src.Graph import Graph
+from YapyGraph.src.Vertex import Vertex
+
+#------------------------------------------------------------------------------
+class RewriteScript(object):
+    """
+    A production compiled into the list of changes that applying it makes,
+    so that applying a match needs no LHS/RHS comparisons.
+
+    The changes refer to vertices by position: positions 0..n-1 are the LHS
+    vertices (in the order of vids), and position n+k is the k'th vertex
+    created. Applying the script turns a match into a list of host ids by
+    position, then deletes vertices, deletes edges, creates vertices and
+    adds edges, in that order.
+    """
+
+    #--------------------------------------------------------------------------
+    def __init__(self, lhs:Graph, rhs:Graph):
+        """
+        Constructor.
+        Inputs:
+            * lhs - LHS Graph of a production
+            * rhs - RHS Graph of the production
+        Outputs: N/A
+        """
+        lhsVertices = list(lhs.vertices())
+        self.vids = [v.id for v in lhsVertices]     # position -> LHS vid
+        positions = { vid : i for i, vid in enumerate(self.vids) }
+
+        # LHS and RHS vertices are the same vertex if their names match.
+        rhsPositions = {}                           # {RHS vid -> position}
+        self.addVertices = []                       # [(label, number)]
+        for rhsVertex in rhs.vertices():
+            lhsVertex = lhs.hasVertex(rhsVertex.name)
+            if lhsVertex is not None:
+                rhsPositions[rhsVertex.id] = positions[lhsVertex.id]
+            else:
+                rhsPositions[rhsVertex.id] = len(self.vids) + len(self.addVertices)
+                self.addVertices.append( (rhsVertex.label, rhsVertex.number) )
+        rhsVIDs = { position : vid for vid, position in rhsPositions.items() }
+
+        # LHS vertices that aren't in the RHS are deleted, along with their
+        # edges. Other LHS edges are deleted if the RHS doesn't have them.
+        self.deleteVertices = [ i for i in range(len(self.vids)) if i not in rhsVIDs ]
+        lhsEdges = list(dict.fromkeys(
+            (positions[start.id], positions[end.id]) for (start, end) in lhs.edges() ))
+        self.deleteEdges = [ (start, end) for (start, end) in lhsEdges
+            if start in rhsVIDs and end in rhsVIDs
+            and not rhs.hasEdgeBetweenVertices(rhsVIDs[start], rhsVIDs[end]) ]
+
+        # RHS edges are added, except those kept from the LHS.
+        lhsEdges = set(lhsEdges)
+        self.addEdges = [ edge for edge in dict.fromkeys(
+            (rhsPositions[start.id], rhsPositions[end.id]) for (start, end) in rhs.edges() )
+            if edge not in lhsEdges ]
+
+    #--------------------------------------------------------------------------
+    def apply(self, graph, lhsMapping:dict, stats=None) -> Delta:
+        """
+        Applies the changes to graph.
+        Inputs:
+            * graph - Graph (or HostGraph) to which to apply the production
+            * lhsMapping - {vid->vid} mapping from the LHS to graph
+            * stats - optional ProductionStats in which to record the time
+              spent in each phase
+        Outputs: Delta describing the changes made to graph
+        """
+        if stats is None:
+            return self.applyImages(graph, self._map(lhsMapping))
+
+        delta = Delta()
+
+        start = time.perf_counter()
+        images = self._map(lhsMapping)
+        mapped = time.perf_counter()
+        self._delete(graph, images, delta)
+        deleted = time.perf_counter()
+        self._add(graph, images, delta)
+        stats.recordApply(mapped - start, deleted - mapped,
+            time.perf_counter() - deleted)
+        return delta
+
+    #--------------------------------------------------------------------------
+    def applyImages(self, graph, images:list) -> Delta:
+        """
+        Applies the changes to graph, given the match as a list of host ids
+        by position (as recorded in a DerivationLog).
+        Inputs:
+            * graph - Graph (or HostGraph) to which to apply the production
+            * images - host id of each LHS vertex, in the order of vids; the
+              ids of the vertices created are appended to it
+        Outputs: Delta describing the changes made to graph
+        """
+        delta = Delta()
+        self._delete(graph, images, delta)
+        self._add(graph, images, delta)
+        return delta
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def newVertexIDs(graph):
+        """
+        Generates ids of the form "vN" for new vertices of graph, from N =
+        graph.numVertices() up, skipping the ids its vertices already have
+        (once a vertex has been deleted, "vN" may be taken). A HostGraph
+        chooses its own ids, so it isn't scanned.
+        Inputs: graph - Graph (or HostGraph) to which vertices are added
+        Outputs: generator of str ids
+        """
+        taken = { v.id for v in graph.vertices() } if isinstance(graph, Graph) \
+            else set()
+        n = graph.numVertices()
+        while True:
+            if 'v%s' % n not in taken:
+                yield 'v%s' % n
+            n += 1
+
+    #--------------------------------------------------------------------------
+    # PRIVATE METHODS - These aren't the methods you're looking for.
+    #--------------------------------------------------------------------------
+    def _add(self, graph, images:list, delta:Delta):
+        """
+        Creates the new vertices (appending their ids to images), then adds
+        the new edges.
+        """
+        if len(self.addVertices) > 0:
+            ids = self.newVertexIDs(graph)
+        for (label, number) in self.addVertices:
+            vertex = graph.addVertex(Vertex(next(ids), label, number))
+            images.append(vertex.id)
+            delta.addedVertices.append(vertex)
+        for (start, end) in self.addEdges:
+            # The host may already have an edge between two kept vertices.
+            if not graph.hasEdgeBetweenVertices(images[start], images[end]):
+                graph.addEdge(images[start], images[end])
+                delta.addedEdges.append( (images[start], images[end]) )
+
+    #--------------------------------------------------------------------------
+    def _delete(self, graph, images:list, delta:Delta):
+        """
+        Deletes the LHS vertices and edges that aren't in the RHS.
+        """
+        for i in self.deleteVertices:
+            graph.deleteVertex(images[i])
+            delta.deletedVertices.append(images[i])
+        for (start, end) in self.deleteEdges:
+            graph.deleteEdge(images[start], images[end])
+            delta.deletedEdges.append( (images[start], images[end]) )
+
+    #--------------------------------------------------------------------------
+    def _map(self, lhsMapping:dict) -> list:
+        """
+        Returns the host ids of the LHS vertices, by position.
+        """
+        return [ lhsMapping[vid] for vid in self.vids ]
@@ -0,0 +1,33 @@
+from Delta import Delta
+
+#------------------------------------------------------------------------------
+class StepEvent(object):
+    """
+    One step of a generation run, as generated by Generator.iterGenerate():
+    which production was applied where, and the changes it made. Vertex
+    ids are those of the graph being generated (see iterGenerate()).
+    """
+
+    __slots__ = ('step', 'production', 'match', 'delta')
+
+    #--------------------------------------------------------------------------
+    def __init__(self, step:int, production:int, match:dict, delta:Delta):
+        """
+        Constructor.
+        Inputs:
+            * step - number of productions applied before this one
+            * production - index of the production in the list given to
+              the Generator
+            * match - {vid->vid} (lhs->host) match that was rewritten
+            * delta - Delta of the changes made
+        Outputs: N/A
+        """
+        self.step = step
+        self.production = production
+        self.match = match
+        self.delta = delta
+
+    #--------------------------------------------------------------------------
+    def __str__(self) -> str:
+        return 'step %d: production %d at %s: %s' % (self.step,
+            self.production, sorted(self.match.values()), self.delta)
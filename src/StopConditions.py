@@ -0,0 +1,138 @@
+import sys
+import time
+
+try:
+    import resource
+except ImportError:     # Only on Unix.
+    resource = None
+
+#------------------------------------------------------------------------------
+class StopReason(object):
+    """
+    Why a generation run stopped (see Generator.stopReason).
+    """
+    MIN_VERTICES = 'min_vertices'   # the graph is big enough
+    MAX_STEPS = 'max_steps'         # max_steps productions were applied
+    MAX_EDGES = 'max_edges'         # the graph has max_edges edges
+    DEADLINE = 'deadline'           # the time limit or deadline was reached
+    MEMORY = 'memory_limit'         # the process outgrew the memory limit
+    NO_MATCH = 'no_match'           # no production matches the graph reached
+
+#------------------------------------------------------------------------------
+class StopConditions(object):
+    """
+    The conditions on which a generation run stops: min_vertices, and the
+    optional limits max_steps, max_edges, time_limit (seconds of wall-clock
+    time) and memory_limit (megabytes of resident memory of the process),
+    from the config or given by the caller.
+
+    Memory use is read from /proc/self/statm, so it is what the process
+    holds now, not its lifetime peak (which an earlier run in the same
+    process may have set). Where there is no /proc, the peak is used, but
+    only once it has grown during this run.
+
+    The vertex, edge and step limits are checked on every step, as they
+    cost a comparison. The clock and the memory use are only read every
+    CHECK_INTERVAL steps, so that the checks cost next to nothing per step;
+    a run may overshoot its deadline by that many steps.
+    """
+
+    # Number of steps between reading the clock and the memory use.
+    CHECK_INTERVAL = 64
+
+    #--------------------------------------------------------------------------
+    def __init__(self, config:dict, maxSteps:int=None, maxEdges:int=None,
+            deadline:float=None, memoryLimit:float=None):
+        """
+        Constructor. Arguments that are given take the place of the config
+        options.
+        Inputs:
+            * config - dictionary of options
+            * maxSteps - optional maximum number of steps
+            * maxEdges - optional maximum number of edges
+            * deadline - optional time.monotonic() time by which to stop
+            * memoryLimit - optional memory limit, in megabytes
+        Outputs: N/A
+        """
+        self.minVertices = int(config['min_vertices'])
+        self.maxSteps = self._option(config, 'max_steps', maxSteps, int)
+        self.maxEdges = self._option(config, 'max_edges', maxEdges, int)
+        timeLimit = self._option(config, 'time_limit', None, float)
+        if deadline is None and timeLimit is not None:
+            deadline = time.monotonic() + timeLimit
+        self.deadline = deadline
+        self.memoryLimit = self._option(config, 'memory_limit', memoryLimit, float)
+        if self.memoryLimit is not None and resource is None:
+            raise ValueError('memory_limit is not supported on this platform.')
+        self._startPeak = None  # peak RSS when the run started, if needed
+        if self.memoryLimit is not None:
+            self._startPeak = self._peakMemory()
+        self.reason = None      # StopReason, once one is met
+        self._nextCheck = 0
+
+    #--------------------------------------------------------------------------
+    def check(self, step:int, graph) -> str:
+        """
+        Checks whether the run should stop. Once a condition is met, it is
+        returned by every later check.
+        Inputs:
+            * step - number of steps taken so far
+            * graph - HostGraph being generated
+        Outputs: a StopReason, or None to carry on
+        """
+        if self.reason is None:
+            self.reason = self._check(step, graph)
+        return self.reason
+
+    #--------------------------------------------------------------------------
+    # PRIVATE METHODS - These aren't the methods you're looking for.
+    #--------------------------------------------------------------------------
+    def _check(self, step:int, graph) -> str:
+        """Does the work of check()."""
+        if graph.numVertices() >= self.minVertices:
+            return StopReason.MIN_VERTICES
+        if self.maxSteps is not None and step >= self.maxSteps:
+            return StopReason.MAX_STEPS
+        if self.maxEdges is not None and graph.numEdges() >= self.maxEdges:
+            return StopReason.MAX_EDGES
+        if step >= self._nextCheck:
+            self._nextCheck = step + self.CHECK_INTERVAL
+            if self.deadline is not None and time.monotonic() >= self.deadline:
+                return StopReason.DEADLINE
+            if self.memoryLimit is not None and \
+                    self._memoryUsed() >= self.memoryLimit:
+                return StopReason.MEMORY
+        return None
+
+    #--------------------------------------------------------------------------
+    def _memoryUsed(self) -> float:
+        """
+        Returns the resident memory of the process, in megabytes (see the
+        class comment).
+        """
+        try:
+            with open('/proc/self/statm', 'rb') as f:
+                pages = int(f.read().split()[1])
+            return pages * resource.getpagesize() / (1 << 20)
+        except (OSError, IndexError, ValueError):
+            peak = self._peakMemory()
+            return peak if peak > self._startPeak else 0.0
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _peakMemory() -> float:
+        """Returns the peak resident memory of the process, in megabytes."""
+        maxRSS = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux gives kilobytes, macOS bytes.
+        return maxRSS / (1 << 20 if sys.platform == 'darwin' else 1 << 10)
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _option(config:dict, key:str, value, convert):
+        """
+        Returns value if it isn't None, otherwise the config option key (or
+        None), converted with convert.
+        """
+        if value is None:
+            value = config.get(key)
+        return None if value is None else convert(value)
@@ -0,0 +1,70 @@
+#------------------------------------------------------------------------------
+class SymbolTable(object):
+    """
+    Interns symbols (such as vertex labels) as small ints, handed out in
+    the order the symbols are first seen, and gives back the one stored
+    copy of each symbol.
+
+    A Parser keeps one for the whole grammar, shared by its productions, so
+    every vertex with the same label holds the same string object, and each
+    MatchPlan holds the ids of its labels.
+
+    A table can be layered over another (its parent): it starts out with a
+    copy of the parent's symbols and ids, and symbols interned in it later
+    are added to it alone. A HostGraph generated from the grammar numbers its
+    labels in a table layered over the grammar's (see Generator.generate()),
+    so matching compares label ids, and the grammar's table isn't changed
+    by the labels the host gains.
+    """
+
+    #--------------------------------------------------------------------------
+    def __init__(self, parent=None):
+        """
+        Constructor. The table starts empty, or with the symbols of parent.
+        Inputs: parent - optional SymbolTable to layer this one over
+        Outputs: N/A
+        """
+        self._parent = parent
+        self._base = 0 if parent is None else len(parent)
+        self.symbols = []           # id -> symbol (don't change it)
+        self._ids = {}              # {symbol -> id}
+        if parent is not None:
+            self.symbols.extend(parent.symbols)
+            self._ids.update(parent._ids)
+
+    #--------------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    #--------------------------------------------------------------------------
+    def extends(self, table) -> bool:
+        """
+        Returns True if every symbol in table has the same id in this table:
+        this is table, or is layered over it (and table has had no symbols
+        added since).
+        """
+        return self is table or \
+            (self._parent is table and len(table) == self._base)
+
+    #--------------------------------------------------------------------------
+    def find(self, symbol) -> int:
+        """Returns the id of symbol, or None if it hasn't been interned."""
+        return self._ids.get(symbol)
+
+    #--------------------------------------------------------------------------
+    def intern(self, symbol) -> int:
+        """
+        Returns the id of symbol, adding it to the table if necessary.
+        Inputs: symbol - hashable symbol (usually a str)
+        Outputs: int id
+        """
+        id = self._ids.get(symbol)
+        if id is None:
+            id = self._ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return id
+
+    #--------------------------------------------------------------------------
+    def symbol(self, id:int):
+        """Returns the symbol with the given id."""
+        return self.symbols[id]
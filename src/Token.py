@@ -11,10 +11,11 @@ class TokenTypes(object):
     """A singleton to represent all token types."""
 
     (EOF, SEMICOLON, EQUALS, CONFIGURATION, PRODUCTIONS, LBRACE, RBRACE, \
-    	DOUBLEARROW, ARROW, ID, NUMBER, COMMA) = range(12)
+    	DOUBLEARROW, ARROW, ID, NUMBER, COMMA, COLON) = range(13)
 
     names = [ 'EOF', 'SEMICOLON', 'EQUALS', 'CONFIGURATION', 'PRODUCTIONS', 
-    	'LBRACE', 'RBRACE', 'DOUBLEARROW', 'ARROW', 'ID', 'NUMBER', 'COMMA' ]
+    	'LBRACE', 'RBRACE', 'DOUBLEARROW', 'ARROW', 'ID', 'NUMBER', 'COMMA',
+    	'COLON' ]
         
 #------------------------------------------------------------------------------
 #    _____     _              
@@ -27,13 +28,16 @@ class Token(object):
     """An abstract token."""
     
     #--------------------------------------------------------------------------
-    def __init__(self, type:int, text:str):
+    def __init__(self, type:int, text:str, offset:int=None):
         """Constructor.
            type is a numeric token type from TokenTypes
            text is the lexeme
+           offset is the optional position of the lexeme in the input (see
+           Lexer.position() for its line and character number)
         """
         self.type = type
         self.text = text
+        self.offset = offset
         
     #--------------------------------------------------------------------------
     def __str__(self):
@@ -0,0 +1,123 @@
+#------------------------------------------------------------------------------
+class WeightedSampler(object):
+    """
+    Chooses one of n items at random, in proportion to integer values that
+    can change, in O(log n) time per change or choice. The values are kept
+    in a Fenwick (binary indexed) tree: entry k holds the sum of the values
+    of the lowbit(k) items that end at item k-1, so any prefix sum is the
+    sum of O(log n) entries.
+
+    How much a production's matches count for is given by selection():
+    "match" weights every match of a production by the production's weight,
+    "distinct" does too, but counts matches that only differ by a symmetry
+    of the production (see MatchPlan) as one, and "production" weights each
+    production that has a match by its weight, whatever its number of
+    matches.
+    """
+
+    # Ways of weighting the productions (see selection()).
+    SELECTIONS = ('match', 'distinct', 'production')
+
+    #--------------------------------------------------------------------------
+    def __init__(self, n:int):
+        """
+        Constructor. Every value starts at 0.
+        Inputs: n - number of items
+        Outputs: N/A
+        """
+        self._tree = [0] * (n + 1)
+        self._total = 0
+
+    #--------------------------------------------------------------------------
+    def __len__(self) -> int:
+        """Returns the number of items."""
+        return len(self._tree) - 1
+
+    #--------------------------------------------------------------------------
+    def add(self, i:int, delta:int):
+        """
+        Adds delta to the value of item i.
+        Inputs:
+            * i - 0 <= i < len(self)
+            * delta - amount to add (the value must stay >= 0)
+        Outputs: None
+        """
+        self._total += delta
+        k = i + 1
+        while k < len(self._tree):
+            self._tree[k] += delta
+            k += k & -k
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def choose(values:list, rng) -> int:
+        """
+        Chooses one of a list of values once, without building a tree.
+        Inputs:
+            * values - list of integer values
+            * rng - random.Random (or the random module)
+        Outputs: (i, r) as for find(), or None if every value is 0
+        """
+        total = sum(values)
+        if total == 0:
+            return None
+        r = rng.randrange(total)
+        for (i, value) in enumerate(values):
+            if r < value:
+                return (i, r)
+            r -= value
+
+    #--------------------------------------------------------------------------
+    def find(self, r:int) -> tuple:
+        """
+        Returns the item at position r of the items laid end to end, each
+        as long as its value.
+        Inputs: r - 0 <= r < total()
+        Outputs: (i, offset) tuple: item i, and 0 <= offset < value of i
+        """
+        k = 0
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step > 0:
+            if k + step < len(self._tree) and self._tree[k + step] <= r:
+                k += step
+                r -= self._tree[k]
+            step >>= 1
+        return (k, r)
+
+    #--------------------------------------------------------------------------
+    def sample(self, rng) -> tuple:
+        """
+        Chooses an item in proportion to its value.
+        Inputs: rng - random.Random (or the random module)
+        Outputs: (i, offset) as for find(), or None if every value is 0
+        """
+        if self._total == 0:
+            return None
+        return self.find(rng.randrange(self._total))
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def selection(weight:int, count:int, selection:str,
+            multiplicity:int=1) -> int:
+        """
+        Returns the value of a production with count matches.
+        Inputs:
+            * weight - weight of the production
+            * count - number of matches of the production found
+            * selection - "match", "distinct" or "production"
+            * multiplicity - number of symmetric matches each match found
+              stands for (see MatchPlan.multiplicity)
+        Outputs: weight * multiplicity * count for "match", weight * count
+            for "distinct", weight if there are any matches for
+            "production"
+        """
+        if selection == 'match':
+            return weight * multiplicity * count
+        if selection == 'distinct':
+            return weight * count
+        return weight if count > 0 else 0
+
+    #--------------------------------------------------------------------------
+    def total(self) -> int:
+        """Returns the sum of the values."""
+        return self._total
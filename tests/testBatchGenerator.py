@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.BatchGenerator import BatchGenerator
+from src.GrammarCache import GrammarCache
+
+class TestBatchGenerator(unittest.TestCase):
+
+    #--------------------------------------------------------------------------
+    def setUp(self):
+        self.grammar = GrammarCache.compile('tests/sample.txt')
+
+    #--------------------------------------------------------------------------
+    def testGenerate(self):
+        # In this process, and with workers, every graph is grown from its
+        # own copy of the start graph.
+        for numWorkers in [1, 2]:
+            with BatchGenerator(self.grammar, numWorkers) as batch:
+                graphs = list(batch.generate(9))
+            self.assertEqual(len(graphs), 9)
+            for g in graphs:
+                self.assertEqual(g.numVertices(), 10)
+            self.assertEqual(self.grammar[1].numVertices(), 2)
+
+    #--------------------------------------------------------------------------
+    def testMatchWorkers(self):
+        # Generating in this process keeps the grammar's match_workers (only
+        # pool workers, which can't start pools, are limited to 1).
+        from src import BatchGenerator as module
+        (config, startGraph, productions) = self.grammar
+        grammar = (dict(config, match_workers=2), startGraph, productions)
+        with BatchGenerator(grammar, 1) as batch:
+            self.assertEqual(batch.generateOne(0).numVertices(), 10)
+            self.assertEqual(module._workerGrammar[0]['match_workers'], 2)
+
+    #--------------------------------------------------------------------------
+    def testSeed(self):
+        # Graph i of a batch is the same however many workers there are,
+        # and can be generated on its own.
+        def edges(g):
+            return sorted((s.id, e.id) for (s, e) in g.edges())
+        batches = []
+        for numWorkers in [1, 3]:
+            with BatchGenerator(self.grammar, numWorkers, seed=11) as batch:
+                batches.append([ edges(g) for g in batch.generate(7) ])
+        self.assertEqual(batches[0], batches[1])
+        batch = BatchGenerator(self.grammar, 1, seed=11)
+        self.assertEqual(edges(batch.generateOne(4)), batches[0][4])
+
+    #--------------------------------------------------------------------------
+    def testGenerateToFiles(self):
+        directory = tempfile.mkdtemp()
+        try:
+            with BatchGenerator(self.grammar, 2) as batch:
+                filenames = batch.generateToFiles(5, directory)
+            self.assertEqual([os.path.basename(f) for f in filenames],
+                ['graphs-0.dot', 'graphs-1.dot'])
+            counts = [ open(f).read().count('digraph') for f in filenames ]
+            self.assertEqual(counts, [3, 2])
+        finally:
+            shutil.rmtree(directory)
+
+    #--------------------------------------------------------------------------
+    def testChunks(self):
+        batch = BatchGenerator(self.grammar, 1)
+        self.assertEqual(batch._chunks(0), [])
+        self.assertEqual(batch._chunks(3), [(0, 1), (1, 1), (2, 1)])
+        chunks = batch._chunks(1000)
+        self.assertEqual(sum(n for (start, n) in chunks), 1000)
+        self.assertEqual(max(n for (start, n) in chunks), 64)
+        self.assertEqual(chunks[1], (64, 64))
+        self.assertRaises(ValueError, BatchGenerator, self.grammar, 0)
+
+if __name__ == '__main__':
+    unittest.main()
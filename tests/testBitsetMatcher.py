@@ -0,0 +1,113 @@
+import random
+import unittest
+import unittest.mock
+
+import src.Generator
+from src.BitsetMatcher import BitsetMatcher
+from src.BitsetMatcher import numpy
+from src.Generator import Generator
+from src.HostIndex import HostIndex
+from src.MatchIndex import MatchIndex
+from src.Matcher import Matcher
+from src.MatchPlan import MatchPlan
+from src.Production import Production
+from YapyGraph.src.Graph import Graph
+from YapyGraph.src.Graph import Vertex
+
+@unittest.skipIf(numpy is None, 'NumPy is not installed')
+class TestBitsetMatcher(unittest.TestCase):
+
+    #--------------------------------------------------------------------------
+    def randomGraph(self, rng, numVertices, numEdges, labels, prefix):
+        g = Graph()
+        for i in range(numVertices):
+            g.addVertex(Vertex('%s%d' % (prefix, i), rng.choice(labels)))
+        for i in range(numEdges):
+            (a, b) = (rng.randrange(numVertices), rng.randrange(numVertices))
+            if not g.hasEdgeBetweenVertices('%s%d' % (prefix, a), '%s%d' % (prefix, b)):
+                g.addEdge('%s%d' % (prefix, a), '%s%d' % (prefix, b))
+        return g
+
+    #--------------------------------------------------------------------------
+    def testSearch(self):
+        # The same matches as Matcher, for random patterns (with loops and
+        # edges both ways) in a random host.
+        rng = random.Random(3)
+        graph = self.randomGraph(rng, 60, 150, 'ABC', 'h')
+        host = HostIndex(graph)
+        bitsetMatcher = BitsetMatcher(host)
+        matcher = Matcher(host)
+        for n in range(40):
+            size = rng.randint(1, 4)
+            plan = MatchPlan(self.randomGraph(rng, size, rng.randint(0, 5), 'ABC', 'l'))
+            key = lambda mapping: sorted(mapping.items())
+            self.assertEqual(sorted(map(key, bitsetMatcher.search(plan))),
+                sorted(map(key, matcher.search(plan))))
+
+    #--------------------------------------------------------------------------
+    def testSuits(self):
+        big = BitsetMatcher.MIN_HOST_VERTICES
+        g = Graph()
+        self.assertFalse(BitsetMatcher.suits(MatchPlan(g), big))
+        for i in range(BitsetMatcher.MAX_VERTICES):
+            g.addVertex(Vertex('l%d' % i, 'A'))
+        self.assertTrue(BitsetMatcher.suits(MatchPlan(g), big))
+        self.assertFalse(BitsetMatcher.suits(MatchPlan(g), big - 1))
+        g.addVertex(Vertex('x', 'A'))
+        self.assertFalse(BitsetMatcher.suits(MatchPlan(g), big))
+
+        # A label the host doesn't have matches nothing.
+        host = Graph()
+        host.addVertex(Vertex('h', 'B'))
+        self.assertEqual(BitsetMatcher(HostIndex(host)).search(MatchPlan(g)), [])
+
+    #--------------------------------------------------------------------------
+    def testMaxRows(self):
+        # A search that would hold more than MAX_ROWS partial matches is
+        # left to a Matcher, and finds the same matches.
+        rng = random.Random(7)
+        host = HostIndex(self.randomGraph(rng, 40, 80, 'AB', 'h'))
+        bitsetMatcher = BitsetMatcher(host)
+        bitsetMatcher.MAX_ROWS = 50
+        key = lambda mapping: sorted(mapping.items())
+        for edges in [0, 1]:
+            # Three unjoined vertices pair every row with every vertex.
+            plan = MatchPlan(self.randomGraph(rng, 3, edges, 'AB', 'l'))
+            self.assertIsNone(bitsetMatcher._partials(plan.steps(host)))
+            self.assertEqual(sorted(map(key, bitsetMatcher.search(plan))),
+                sorted(map(key, Matcher(host).search(plan))))
+
+    #--------------------------------------------------------------------------
+    def testFullSearches(self):
+        # MatchIndex.build(), reservoir sampling and
+        # Generator._findMatchingProductions() search a big enough host with
+        # a BitsetMatcher when it pays (here, for two unjoined vertices, not
+        # for a connected LHS), and find what a Matcher finds.
+        rng = random.Random(9)
+        graph = self.randomGraph(rng, BitsetMatcher.MIN_HOST_VERTICES, 900, 'ABCD', 'h')
+        host = HostIndex(graph)
+        productions = [ Production(self.randomGraph(rng, 2, 0, 'AB', 'l'), Graph()),
+            Production(self.randomGraph(rng, 3, 3, 'AB', 'l'), Graph()) ]
+        self.assertTrue(BitsetMatcher.pays(productions[0].matchPlan(), host))
+        self.assertFalse(BitsetMatcher.pays(productions[1].matchPlan(), host))
+        key = lambda pair: (productions.index(pair[0]), sorted(pair[1].items()))
+        expected = sorted(key( (prod, mapping) ) for prod in productions
+            for mapping in Matcher(host).search(prod.matchPlan()))
+
+        def matchIndex():
+            index = MatchIndex(productions, host)
+            index.build()
+            return index.matches()
+        for search in [ matchIndex,
+                lambda: Generator()._iterateMatches(host, productions),
+                lambda: Generator()._findMatchingProductions(graph, productions) ]:
+            # (The class that Generator and MatchIndex import.)
+            used = src.Generator.BitsetMatcher
+            with unittest.mock.patch.object(used, 'iterate',
+                    autospec=True, side_effect=used.iterate) as iterate:
+                found = list(search())
+            self.assertEqual(iterate.call_count, 1)
+            self.assertEqual(sorted(map(key, found)), expected)
+
+if __name__ == '__main__':
+    unittest.main()
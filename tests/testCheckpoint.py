@@ -0,0 +1,84 @@
+import copy
+import os
+import tempfile
+import unittest
+
+from src.Checkpoint import Checkpoint
+from src.Generator import Generator
+from src.GrammarCache import GrammarCache
+
+GRAMMAR = """
+configuration { min_vertices = 60; checkpoint_interval = 5; }
+productions {
+  A->B, B->C;
+  A->B ==> A->B, B->C, C->A;
+  B->C ==> B->D, D->C;
+  C ==> C->E, C->F;
+  C->E ==> C;
+  D->C ==> D->A->C;
+  F ==> F->B;
+}
+"""
+
+class TestCheckpoint(unittest.TestCase):
+
+    #--------------------------------------------------------------------------
+    def setUp(self):
+        (fd, self.grammarFile) = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(fd, 'w') as f:
+            f.write(GRAMMAR)
+        (fd, self.filename) = tempfile.mkstemp(suffix='.ggk')
+        os.close(fd)
+
+    #--------------------------------------------------------------------------
+    def tearDown(self):
+        os.remove(self.grammarFile)
+        os.remove(self.filename)
+
+    #--------------------------------------------------------------------------
+    def generate(self, checkpoint=None, resume=False):
+        """Returns the sorted edges of a graph generated with seed 5."""
+        (config, startGraph, productions) = GrammarCache.compile(self.grammarFile)
+        graph = copy.deepcopy(startGraph)
+        if resume:
+            Generator(5).resume(graph, productions, config, checkpoint)
+        else:
+            Generator(5).generate(graph, productions, config, checkpoint=checkpoint)
+        return sorted((s.id, s.label, e.id, e.label) for (s, e) in graph.edges())
+
+    #--------------------------------------------------------------------------
+    def testResume(self):
+        # A run resumed from any point of its checkpoint file, even one cut
+        # short in the middle of a record, ends with the same graph.
+        expected = self.generate()
+        self.assertEqual(self.generate(self.filename), expected)
+        with open(self.filename, 'rb') as f:
+            data = f.read()
+        for size in [len(data) // 3, len(data) - 3, len(data)]:
+            with open(self.filename, 'wb') as f:
+                f.write(data[:size])
+            self.assertEqual(self.generate(self.filename, True), expected)
+
+    #--------------------------------------------------------------------------
+    def testAppend(self):
+        # Resuming appends to the records kept.
+        self.generate(self.filename)
+        size = os.path.getsize(self.filename)
+        with open(self.filename, 'r+b') as f:
+            f.truncate(size // 2)
+        self.generate(self.filename, True)
+        self.assertGreater(os.path.getsize(self.filename), size // 2)
+
+    #--------------------------------------------------------------------------
+    def testMismatch(self):
+        self.generate(self.filename)
+        with open(self.grammarFile, 'w') as f:
+            f.write(GRAMMAR.replace('F ==> F->B', 'F ==> F->C'))
+        self.assertRaises(ValueError, self.generate, self.filename, True)
+        with open(self.filename, 'wb') as f:
+            f.write(b'junk')
+        self.assertRaises(ValueError, self.generate, self.filename, True)
+        self.assertRaises(ValueError, Checkpoint, self.filename, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import copy
+import os
+import tempfile
+import unittest
+
+from src.DerivationLog import DerivationLog
+from src.Generator import Generator
+from src.GrammarCache import GrammarCache
+
+GRAMMAR = """
+configuration { min_vertices = 60; }
+productions {
+  A->B, B->C;
+  A->B ==> A->B, B->C, C->A;
+  B->C ==> B->D, D->C;
+  C ==> C->E, C->F;
+  C->E ==> C;
+  D->C ==> D->A->C;
+  F ==> F->B;
+}
+"""
+
+class TestDerivationLog(unittest.TestCase):
+
+    #--------------------------------------------------------------------------
+    def setUp(self):
+        (fd, self.grammarFile) = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(fd, 'w') as f:
+            f.write(GRAMMAR)
+        (fd, self.filename) = tempfile.mkstemp(suffix='.ggd')
+        os.close(fd)
+        (self.config, self.startGraph, self.productions) = \
+            GrammarCache.compile(self.grammarFile)
+
+    #--------------------------------------------------------------------------
+    def tearDown(self):
+        os.remove(self.grammarFile)
+        os.remove(self.filename)
+
+    #--------------------------------------------------------------------------
+    def edges(self, graph):
+        return sorted((s.id, s.label, e.id, e.label) for (s, e) in graph.edges())
+
+    #--------------------------------------------------------------------------
+    def replay(self, productions=None):
+        """Returns the sorted edges of the graph replayed from the log."""
+        graph = copy.deepcopy(self.startGraph)
+        DerivationLog.replay(self.filename, graph,
+            self.productions if productions is None else productions)
+        return self.edges(graph)
+
+    #--------------------------------------------------------------------------
+    def testReplay(self):
+        # Replaying gives the generated graph, whatever the rewriting.
+        for rewriting in ['sequential', 'parallel']:
+            config = dict(self.config, rewriting=rewriting)
+            graph = copy.deepcopy(self.startGraph)
+            Generator(5).generate(graph, self.productions, config,
+                derivation=self.filename)
+            self.assertEqual(self.replay(), self.edges(graph))
+
+        # A log cut short in the middle of a record replays the whole ones.
+        with open(self.filename, 'rb') as f:
+            data = f.read()
+        records = list(DerivationLog.records(self.filename, self.productions))
+        with open(self.filename, 'wb') as f:
+            f.write(data[:-1])
+        graph = copy.deepcopy(self.startGraph)
+        steps = DerivationLog.replay(self.filename, graph, self.productions)
+        self.assertEqual(steps, len(records) - 1)
+
+    #--------------------------------------------------------------------------
+    def testSize(self):
+        # Each step takes a byte or two per LHS vertex.
+        graph = copy.deepcopy(self.startGraph)
+        stats = Generator(5).generate(graph, self.productions,
+            dict(self.config, min_vertices=2000), True, derivation=self.filename)
+        header = len(DerivationLog.MAGIC) + 4 + 32
+        self.assertLess(os.path.getsize(self.filename) - header, 7 * stats.steps)
+
+    #--------------------------------------------------------------------------
+    def testWrongGrammar(self):
+        graph = copy.deepcopy(self.startGraph)
+        Generator(5).generate(graph, self.productions, self.config,
+            derivation=self.filename)
+        with self.assertRaises(ValueError):
+            self.replay(self.productions[1:])
+
+        with open(self.filename, 'wb') as f:
+            f.write(b'not a derivation log')
+        with self.assertRaises(ValueError):
+            self.replay()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,15 @@
+import asyncio
 import copy
 import logging
 import sys
+import time
 import unittest
+import unittest.mock
 
 from src.Generator import Generator
+from src.HostGraph import HostGraph
+from src.HostIndex import HostIndex
+from src.ParallelMatcher import ParallelMatcher
 from src.Production import Production
 from YapyGraph.src.Graph import Graph
 from YapyGraph.src.Graph import Vertex
@@ -508,6 +514,349 @@ class TestGenerator(unittest.TestCase):
         g = gen.generateFromFile("tests/sample.txt")
         self.assertEqual(g.numVertices, 10)
 
+    #--------------------------------------------------------------------------
+    def testGenerateSampling(self):
+        # Every match_sampling mode grows the graph to min_vertices.
+        for sampling in ['none', 'first', 'reservoir']:
+            gen = Generator()
+            f = gen._parseGrammarFile("""
+                configuration { min_vertices = 20; }
+                productions {
+                    A->B;
+                    A->B ==> A->B, A->C;
+                    C ==> C->B;
+                }
+            """)
+            f.config['match_sampling'] = sampling
+            gen.generate(f.startGraph, f.productions, f.config)
+            self.assertEqual(f.startGraph.numVertices(), 20)
+
+        # An unknown mode is an error.
+        gen = Generator()
+        f = gen._parseGrammarFile("""
+            configuration { min_vertices = 5; match_sampling = foo; }
+            productions { A; A ==> A->B; }
+        """)
+        self.assertRaises(ValueError, gen.generate, f.startGraph, f.productions, f.config)
+
+    #--------------------------------------------------------------------------
+    def testGenerateParallel(self):
+        # Parallel rewriting grows the graph to min_vertices, with or
+        # without a match index.
+        for sampling in ['none', 'reservoir']:
+            gen = Generator()
+            f = gen._parseGrammarFile("""
+                configuration { min_vertices = 50; rewriting = parallel; }
+                productions {
+                    A->B;
+                    A->B ==> A->B, A->C;
+                    C ==> C->B;
+                }
+            """)
+            f.config['match_sampling'] = sampling
+            gen.generate(f.startGraph, f.productions, f.config)
+            self.assertEqual(f.startGraph.numVertices(), 50)
+
+        # An unknown mode is an error.
+        gen = Generator()
+        f = gen._parseGrammarFile("""
+            configuration { min_vertices = 5; rewriting = foo; }
+            productions { A; A ==> A->B; }
+        """)
+        self.assertRaises(ValueError, gen.generate, f.startGraph, f.productions, f.config)
+
+    #--------------------------------------------------------------------------
+    def testChooseDisjointMatches(self):
+        # Graph is A->B->C, D, and there is a production for every label.
+        # Chosen matches can't share a vertex or be joined by an edge, and
+        # the set must be maximal: B and D, or A, C and D.
+        gen = Generator()
+        f = gen._parseGrammarFile("""
+            configuration { min_vertices = 1; }
+            productions {
+                A->B->C, D;
+                A ==> A;
+                B ==> B;
+                C ==> C;
+                D ==> D;
+            }
+        """)
+        hostIndex = HostIndex(f.startGraph)
+        for i in range(10):
+            chosen = gen._chooseDisjointMatches(hostIndex, None, f.productions)
+            labels = sorted(hostIndex.label(vid)
+                for (prod, mapping) in chosen for vid in mapping.values())
+            self.assertIn(labels, [['B', 'D'], ['A', 'C', 'D']])
+
+    #--------------------------------------------------------------------------
+    def testGenerateStats(self):
+        # Without collectStats nothing is returned.
+        gen = Generator()
+        grammar = """
+            configuration { min_vertices = 10; }
+            productions { A; A ==> A->B; B ==> B->C; D ==> D; }
+        """
+        f = gen._parseGrammarFile(grammar)
+        self.assertIsNone(gen.generate(f.startGraph, f.productions, f.config))
+
+        for sampling in ['none', 'first', 'reservoir']:
+            f = gen._parseGrammarFile(grammar)
+            f.config['match_sampling'] = sampling
+            stats = gen.generate(f.startGraph, f.productions, f.config, True)
+            self.assertEqual(stats.steps, 9)
+            self.assertGreater(stats.time, 0)
+            self.assertEqual(len(stats.productions), 3)
+            (a, b, d) = stats.productions
+            self.assertIs(a.production, f.productions[0])
+            self.assertEqual(a.selected + b.selected, 9)
+            self.assertEqual(d.selected, 0)
+            self.assertEqual(d.matches, 0)
+            self.assertGreater(a.searches, 0)
+            self.assertGreater(a.matches, 0)
+            self.assertEqual(sum(a.searchHistogram), a.searches)
+            self.assertGreater(a.applyTime(), 0)
+            self.assertIn('9 steps', str(stats))
+
+    #--------------------------------------------------------------------------
+    def testGenerateStop(self):
+        # A grammar that never reaches min_vertices is stopped by a limit,
+        # with the graph reached so far.
+        gen = Generator(3)
+        grammar = """
+            configuration { min_vertices = 1000; max_steps = 20; }
+            productions { A; A ==> A->B; B ==> B; }
+        """
+        for rewriting in ['sequential', 'parallel']:
+            f = gen._parseGrammarFile(grammar)
+            f.config['rewriting'] = rewriting
+            stats = gen.generate(f.startGraph, f.productions, f.config, True)
+            self.assertEqual(gen.stopReason, 'max_steps')
+            self.assertEqual(stats.stopReason, 'max_steps')
+            self.assertEqual(stats.steps, 20)
+            self.assertIn('stopped on max_steps', str(stats))
+
+        f = gen._parseGrammarFile(grammar)
+        gen.generate(f.startGraph, f.productions, f.config, maxSteps=10 ** 9,
+            maxEdges=5)
+        self.assertEqual(gen.stopReason, 'max_edges')
+        self.assertEqual(f.startGraph.numVertices(), 6)
+
+        f = gen._parseGrammarFile(grammar)
+        gen.generate(f.startGraph, f.productions, f.config, maxSteps=10 ** 9,
+            deadline=time.monotonic() + 0.1)
+        self.assertEqual(gen.stopReason, 'deadline')
+
+        # Without a step limit, min_vertices is reached whatever is chosen.
+        f = gen._parseGrammarFile(grammar.replace('1000', '5').replace(
+            ' max_steps = 20;', ''))
+        gen.generate(f.startGraph, f.productions, f.config)
+        self.assertEqual(gen.stopReason, 'min_vertices')
+
+        # A grammar that stalls stops with the graph reached; one that
+        # matches nothing to start with is an error.
+        stalls = """
+            configuration { min_vertices = 10; }
+            productions { A; A ==> B->C; }
+        """
+        for (sampling, rewriting) in [('none', 'sequential'),
+                ('reservoir', 'sequential'), ('none', 'parallel')]:
+            f = gen._parseGrammarFile(stalls)
+            f.config['match_sampling'] = sampling
+            f.config['rewriting'] = rewriting
+            stats = gen.generate(f.startGraph, f.productions, f.config, True)
+            self.assertEqual(gen.stopReason, 'no_match')
+            self.assertEqual(stats.stopReason, 'no_match')
+            self.assertEqual(stats.steps, 1)
+            self.assertEqual(sorted(v.label for v in f.startGraph.vertices()),
+                ['B', 'C'])
+        f = gen._parseGrammarFile(stalls.replace('{ A;', '{ C;'))
+        self.assertRaises(RuntimeError, gen.generate, f.startGraph,
+            f.productions, f.config)
+
+    #--------------------------------------------------------------------------
+    def testGenerateWeights(self):
+        # B ==> B->C has weight 0, so no C is ever made, however the
+        # matches are chosen. A ==> A->B, with weight 9, is chosen far more
+        # often than B ==> B->D.
+        grammar = """
+            configuration { min_vertices = 200; }
+            productions { A->B; A ==> A->B : 9; B ==> B->C : 0; B ==> B->D; }
+        """
+        for (sampling, rewriting, workers, selection) in [
+                ('none', 'sequential', 1, 'match'),
+                ('none', 'sequential', 1, 'production'),
+                ('first', 'sequential', 1, 'match'),
+                ('reservoir', 'sequential', 1, 'production'),
+                ('reservoir', 'sequential', 2, 'production'),
+                ('none', 'parallel', 1, 'match')]:
+            gen = Generator(7)
+            f = gen._parseGrammarFile(grammar)
+            f.config.update(match_sampling=sampling, rewriting=rewriting,
+                match_workers=workers, selection=selection)
+            stats = gen.generate(f.startGraph, f.productions, f.config, True)
+            labels = [ v.label for v in f.startGraph.vertices() ]
+            self.assertEqual(labels.count('C'), 0)
+            self.assertEqual(stats.productions[1].selected, 0)
+            if rewriting == 'sequential' and selection == 'production':
+                self.assertGreater(stats.productions[0].selected,
+                    4 * stats.productions[2].selected)
+
+        gen = Generator(7)
+        f = gen._parseGrammarFile(grammar)
+        f.config['selection'] = 'x'
+        self.assertRaises(ValueError, gen.generate, f.startGraph,
+            f.productions, f.config)
+
+    #--------------------------------------------------------------------------
+    def testGenerateTrace(self):
+        # Each production applied is logged as one DEBUG event.
+        gen = Generator()
+        f = gen._parseGrammarFile("""
+            configuration { min_vertices = 5; }
+            productions { A; A ==> A->B; B ==> B->C; }
+        """)
+        with self.assertLogs('graphgen', logging.DEBUG) as logs:
+            gen.generate(f.startGraph, f.productions, f.config)
+        steps = [r for r in logs.records if hasattr(r, 'step')]
+        self.assertEqual([r.step for r in steps], [0, 1, 2, 3])
+        for record in steps:
+            self.assertIn(record.production, [0, 1])
+            self.assertEqual(len(record.delta.addedVertices), 1)
+        self.assertEqual(steps[0].production, 0)
+
+    #--------------------------------------------------------------------------
+    def testIterGenerate(self):
+        # Replaying the deltas of the events on the start graph gives the
+        # graph generate() makes with the same seed.
+        grammar = """
+            configuration { min_vertices = 40; }
+            productions { A->B; A->B ==> A->B, A->C; C ==> C->B; B->A ==> B; B ==> B->A; }
+        """
+        def edges(graph):
+            return sorted((start.label, start.id, end.label, end.id)
+                for (start, end) in graph.edges())
+
+        gen = Generator(4)
+        f = gen._parseGrammarFile(grammar)
+        gen.generate(f.startGraph, f.productions, f.config)
+        expected = edges(f.startGraph)
+
+        gen = Generator(4)
+        f = gen._parseGrammarFile(grammar)
+        replayed = HostGraph(f.startGraph)
+        events = list(gen.iterGenerate(f.startGraph, f.productions, f.config))
+        self.assertEqual(edges(f.startGraph), expected)
+        self.assertEqual(gen.stopReason, 'min_vertices')
+        self.assertEqual([e.step for e in events], list(range(len(events))))
+        for event in events:
+            self.assertIn(event.production, range(len(f.productions)))
+            self.assertEqual(len(event.match), len(f.productions[event.production].lhs().vertices()))
+            delta = event.delta
+            for vid in delta.deletedVertices:
+                replayed.deleteVertex(vid)
+            for (start, end) in delta.deletedEdges:
+                replayed.deleteEdge(start, end)
+            for v in delta.addedVertices:
+                self.assertEqual(replayed.addVertex(v).id, v.id)
+            for (start, end) in delta.addedEdges:
+                replayed.addEdge(start, end)
+        self.assertEqual(edges(replayed.toGraph()), expected)
+
+        # Closing the generator early leaves the graph reached so far.
+        gen = Generator(4)
+        f = gen._parseGrammarFile(grammar)
+        events = gen.iterGenerate(f.startGraph, f.productions, f.config)
+        deltas = [ next(events).delta for i in range(3) ]
+        events.close()
+        self.assertEqual(len(f.startGraph.vertices()), 2 + sum(
+            len(d.addedVertices) - len(d.deletedVertices) for d in deltas))
+        self.assertIsNone(gen.stopReason)
+
+    #--------------------------------------------------------------------------
+    def testAsyncIterGenerate(self):
+        # The same events as iterGenerate(), while other tasks get to run.
+        grammar = """
+            configuration { min_vertices = 30; }
+            productions { A; A ==> A->B; B ==> B->C; }
+        """
+        gen = Generator(2)
+        f = gen._parseGrammarFile(grammar)
+        expected = [ str(e) for e in gen.iterGenerate(f.startGraph, f.productions, f.config) ]
+
+        ticks = []
+        async def tick():
+            while True:
+                ticks.append(len(events))
+                await asyncio.sleep(0)
+        async def run():
+            ticker = asyncio.ensure_future(tick())
+            async for event in gen.asyncIterGenerate(f.startGraph,
+                    f.productions, f.config, interval=5):
+                events.append(str(event))
+            ticker.cancel()
+
+        gen = Generator(2)
+        f = gen._parseGrammarFile(grammar)
+        events = []
+        asyncio.run(run())
+        self.assertEqual(events, expected)
+        self.assertEqual(len(f.startGraph.vertices()), 30)
+        # The ticker ran between every 5 steps.
+        self.assertTrue(set(range(5, len(events), 5)) <= set(ticks))
+
+    #--------------------------------------------------------------------------
+    def testGenerateWorkers(self):
+        # Searching with a pool of workers grows the graph the same way.
+        for sampling in ['none', 'reservoir']:
+            gen = Generator()
+            f = gen._parseGrammarFile("""
+                configuration { min_vertices = 20; match_workers = 2; }
+                productions {
+                    A->B;
+                    A->B ==> A->B, A->C;
+                    C ==> C->B;
+                }
+            """)
+            f.config['match_sampling'] = sampling
+            with unittest.mock.patch('src.Generator.ParallelMatcher',
+                    wraps=ParallelMatcher) as pool:
+                gen.generate(f.startGraph, f.productions, f.config)
+            self.assertEqual(f.startGraph.numVertices(), 20)
+            # Sampled searches each step stay in this process.
+            self.assertEqual(pool.call_count, 1 if sampling == 'none' else 0)
+
+    #--------------------------------------------------------------------------
+    def testGenerateSeed(self):
+        # A seed decides the graph, in every match_sampling mode.
+        def generate(gen, sampling):
+            f = gen._parseGrammarFile("""
+                configuration { min_vertices = 30; }
+                productions {
+                    A->B;
+                    A->B ==> A->B, A->C;
+                    C ==> C->B;
+                    B ==> B->A;
+                }
+            """)
+            f.config['match_sampling'] = sampling
+            gen.generate(f.startGraph, f.productions, f.config)
+            return sorted((start.label, start.id, end.label, end.id)
+                for (start, end) in f.startGraph.edges())
+
+        for sampling in ['none', 'first', 'reservoir']:
+            self.assertEqual(generate(Generator(5), sampling),
+                generate(Generator(5), sampling))
+        gen = Generator()
+        self.assertEqual(generate(gen, 'none'), generate(Generator(gen.seed), 'none'))
+
+        # Children depend only on the seed and their index.
+        self.assertEqual(Generator(5).spawn(3).seed, Generator(5).spawn(3).seed)
+        seeds = set(Generator(5).spawn(i).seed for i in range(100))
+        seeds.update(Generator(6).spawn(i).seed for i in range(100))
+        self.assertEqual(len(seeds), 200)
+        self.assertNotEqual(generate(Generator(5).spawn(0), 'none'),
+            generate(Generator(5).spawn(1), 'none'))
+
 # debug, info, warning, error and critical
 if __name__ == '__main__':
 	logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
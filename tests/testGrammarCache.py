@@ -0,0 +1,90 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.Generator import Generator
+from src.GrammarCache import GrammarCache
+
+class TestGrammarCache(unittest.TestCase):
+
+    GRAMMAR = b"""
+        configuration { min_vertices = 10; }
+        productions {
+            A1->A2;
+            A1->A2 ==> A1->A->A2;
+        }
+    """
+
+    #--------------------------------------------------------------------------
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'grammar.txt')
+        with open(self.filename, 'wb') as f:
+            f.write(self.GRAMMAR)
+
+    #--------------------------------------------------------------------------
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    #--------------------------------------------------------------------------
+    def testLoad(self):
+        # The first load parses the grammar and writes a cache file next to
+        # it; the second reads the cache file.
+        cache = GrammarCache()
+        (config, startGraph, productions) = cache.load(self.filename)
+        self.assertEqual(config, {'min_vertices' : '10'})
+        self.assertEqual(startGraph.numVertices(), 2)
+        self.assertEqual(len(productions), 1)
+        self.assertTrue(os.path.exists(self.filename + '.ggc'))
+
+        (config, startGraph, productions) = cache.load(self.filename)
+        self.assertEqual(config, {'min_vertices' : '10'})
+        self.assertEqual(startGraph.numVertices(), 2)
+        self.assertEqual(productions[0].rewriteScript().addVertices, [('A', None)])
+        self.assertEqual(productions[0].matchPlan().labels, ['A', 'A'])
+
+    #--------------------------------------------------------------------------
+    def testStale(self):
+        # Changing the grammar makes the cache file stale.
+        cache = GrammarCache()
+        cache.load(self.filename)
+        with open(self.filename, 'wb') as f:
+            f.write(self.GRAMMAR.replace(b'10', b'20'))
+        (config, startGraph, productions) = cache.load(self.filename)
+        self.assertEqual(config, {'min_vertices' : '20'})
+
+        # So does a different format version, and an unreadable file.
+        with open(self.filename + '.ggc', 'r+b') as f:
+            f.seek(len(GrammarCache.MAGIC))
+            f.write(b'\xff')
+        self.assertEqual(cache.load(self.filename)[0], {'min_vertices' : '20'})
+        with open(self.filename + '.ggc', 'r+b') as f:
+            f.truncate(GrammarCache._HEADER + 1)
+        self.assertEqual(cache.load(self.filename)[0], {'min_vertices' : '20'})
+
+    #--------------------------------------------------------------------------
+    def testDirectory(self):
+        # With a cache directory, cache files are named by grammar hash.
+        cacheDir = os.path.join(self.directory, 'cache')
+        cache = GrammarCache(cacheDir)
+        cache.load(self.filename)
+        names = os.listdir(cacheDir)
+        self.assertEqual(len(names), 1)
+        self.assertTrue(names[0].endswith('.v%d.ggc' % GrammarCache.FORMAT_VERSION))
+        self.assertFalse(os.path.exists(self.filename + '.ggc'))
+
+    #--------------------------------------------------------------------------
+    def testGenerateFromFile(self):
+        gen = Generator()
+        g = gen.generateFromFile(self.filename)
+        self.assertEqual(g.numVertices(), 10)
+        self.assertFalse(os.path.exists(self.filename + '.ggc'))
+
+        for i in range(2):
+            g = gen.generateFromFile(self.filename, cache=True)
+            self.assertEqual(g.numVertices(), 10)
+        self.assertTrue(os.path.exists(self.filename + '.ggc'))
+
+if __name__ == '__main__':
+    unittest.main()
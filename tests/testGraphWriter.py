@@ -0,0 +1,109 @@
+import io
+import unittest
+import xml.dom.minidom
+
+from src.GraphWriter import BinaryWriter
+from src.GraphWriter import GraphWriter
+from YapyGraph.src.Graph import Graph
+from YapyGraph.src.Graph import Vertex
+
+class TestGraphWriter(unittest.TestCase):
+
+    #--------------------------------------------------------------------------
+    def setUp(self):
+        # Graph is A1->B, B->A1, and C on its own.
+        self.graph = Graph()
+        self.graph.addEdge(Vertex('v0', 'A', '1'), Vertex('v1', 'B'))
+        self.graph.addEdge('v1', 'v0')
+        self.graph.addVertex(Vertex('v2', 'C'))
+
+    #--------------------------------------------------------------------------
+    def _write(self, format:str, count:int=1):
+        f = io.BytesIO() if format == 'binary' else io.StringIO()
+        with GraphWriter.create(format, f) as writer:
+            for i in range(count):
+                writer.write(self.graph)
+        return f.getvalue()
+
+    #--------------------------------------------------------------------------
+    def testEdgeList(self):
+        self.assertEqual(self._write('edgelist', 2),
+            'A_v0 B_v1\nB_v1 A_v0\n\n' * 2)
+
+    #--------------------------------------------------------------------------
+    def testDot(self):
+        self.assertEqual(self._write('dot'), 'digraph g0 {\n'
+            '  "v0" [label="A"];\n  "v1" [label="B"];\n  "v2" [label="C"];\n'
+            '  "v0" -> "v1";\n  "v1" -> "v0";\n}\n')
+
+    #--------------------------------------------------------------------------
+    def testGraphML(self):
+        document = xml.dom.minidom.parseString(self._write('graphml', 2))
+        graphs = document.getElementsByTagName('graph')
+        self.assertEqual([g.getAttribute('id') for g in graphs], ['g0', 'g1'])
+        nodes = graphs[1].getElementsByTagName('node')
+        self.assertEqual([n.getAttribute('id') for n in nodes],
+            ['g1.v0', 'g1.v1', 'g1.v2'])
+        self.assertEqual([d.firstChild.data for d in nodes[0].childNodes],
+            ['A', '1'])
+        edges = graphs[1].getElementsByTagName('edge')
+        self.assertEqual([(e.getAttribute('source'), e.getAttribute('target'))
+            for e in edges], [('g1.v0', 'g1.v1'), ('g1.v1', 'g1.v0')])
+
+    #--------------------------------------------------------------------------
+    def testBinary(self):
+        data = self._write('binary', 3)
+        self.assertTrue(data.startswith(BinaryWriter.MAGIC))
+        graphs = list(BinaryWriter.read(io.BytesIO(data)))
+        self.assertEqual(len(graphs), 3)
+        for g in graphs:
+            self.assertEqual(sorted((v.id, v.label) for v in g.vertices()),
+                [('v0', 'A'), ('v1', 'B'), ('v2', 'C')])
+            self.assertEqual(sorted((s.id, e.id) for (s, e) in g.edges()),
+                [('v0', 'v1'), ('v1', 'v0')])
+        self.assertRaises(ValueError, list, BinaryWriter.read(io.BytesIO(b'xxxx')))
+
+    #--------------------------------------------------------------------------
+    def testBinaryChunks(self):
+        # A big graph is written in slices of at most CHUNK bytes, so no
+        # write holds much more than a chunk, and reads back the same.
+        g = Graph()
+        for i in range(100):
+            g.addVertex(Vertex('g%d' % i, 'AB'[i % 2]))
+        for i in range(99):
+            g.addEdge('g%d' % i, 'g%d' % (i + 1))
+        f = io.BytesIO()
+        writes = []
+        f.write = lambda data, write=f.write: writes.append(len(data)) or write(data)
+        writer = GraphWriter.create('binary', f)
+        writer.CHUNK = 64
+        writer.write(g)
+        writer.close()
+        self.assertGreater(len(writes), 5)
+        self.assertTrue(all(n < 2 * 64 for n in writes))
+        (h,) = BinaryWriter.read(io.BytesIO(f.getvalue()))
+        self.assertEqual([ v.label for v in h.vertices() ],
+            [ v.label for v in g.vertices() ])
+        self.assertEqual(len(h.edges()), 99)
+
+        # A label too long for its uint16 length is refused.
+        g.addVertex(Vertex('x', 'L' * 65536))
+        writer = GraphWriter.create('binary', io.BytesIO())
+        self.assertRaises(ValueError, writer.write, g)
+
+    #--------------------------------------------------------------------------
+    def testChunks(self):
+        # Output is written in chunks as it grows, and the rest on close().
+        f = io.StringIO()
+        writer = GraphWriter.create('edgelist', f)
+        writer.CHUNK = 30
+        writer.write(self.graph)
+        self.assertEqual(f.getvalue(), '')
+        writer.write(self.graph)
+        self.assertEqual(f.getvalue(), 'A_v0 B_v1\nB_v1 A_v0\n\nA_v0 B_v1\n')
+        writer.close()
+        self.assertEqual(f.getvalue(), 'A_v0 B_v1\nB_v1 A_v0\n\n' * 2)
+        self.assertRaises(ValueError, GraphWriter.create, 'png', f)
+
+if __name__ == '__main__':
+    unittest.main()
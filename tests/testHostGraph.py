@@ -0,0 +1,94 @@
+import unittest
+
+from src.HostGraph import HostGraph
+from src.SymbolTable import SymbolTable
+from YapyGraph.src.Graph import Graph
+from YapyGraph.src.Graph import Vertex
+
+class TestHostGraph(unittest.TestCase):
+
+    #--------------------------------------------------------------------------
+    def testConstructor(self):
+        # Graph is A->B, A->C, B->C.
+        g = Graph()
+        g.addEdge(Vertex('g0', 'A', '1'), Vertex('g1', 'B'))
+        g.addEdge('g0', Vertex('g2', 'C'))
+        g.addEdge('g1', 'g2')
+        h = HostGraph(g)
+        self.assertEqual(h.numVertices(), 3)
+        self.assertEqual(h.numEdges(), 3)
+        self.assertEqual(h.label(0), 'A')
+        self.assertEqual(sorted(h.labels()), ['A', 'B', 'C'])
+        self.assertEqual(h.vertices('B'), {1})
+        self.assertEqual(h.count('D'), 0)
+        self.assertEqual(sorted(h.successors(0)), [1, 2])
+        self.assertEqual(sorted(h.predecessors(2)), [0, 1])
+        self.assertTrue(h.hasEdgeBetweenVertices(1, 2))
+        self.assertFalse(h.hasEdgeBetweenVertices(2, 1))
+
+    #--------------------------------------------------------------------------
+    def testSymbols(self):
+        # Labels are numbered as in the given SymbolTable, in a table of the
+        # host's own, which gets the new ones.
+        symbols = SymbolTable()
+        symbols.intern('C')
+        symbols.intern('B')
+        g = Graph()
+        g.addEdge(Vertex('g0', 'A'), Vertex('g1', 'B'))
+        h = HostGraph(g, symbols)
+        self.assertEqual(symbols.symbols, ['C', 'B'])
+        self.assertEqual(h.symbols.symbols, ['C', 'B', 'A'])
+        self.assertTrue(h.symbols.extends(symbols))
+        self.assertEqual(sorted(h.labels()), ['A', 'B'])
+        self.assertEqual(h.labelID(h.vertices('B').pop()), 1)
+        self.assertEqual(h.vertices('C'), set())
+        h.addVertex(Vertex('x', 'C'))
+        self.assertEqual(h.vertices('C'), {2})
+        self.assertEqual(h.toGraph().numVertices(), 3)
+
+    #--------------------------------------------------------------------------
+    def testEdit(self):
+        g = Graph()
+        g.addEdge(Vertex('g0', 'A'), Vertex('g1', 'B'))
+        h = HostGraph(g)
+
+        # New vertices get the next id; deleted ids are reused.
+        v = h.addVertex(Vertex('x', 'C', '2'))
+        self.assertEqual(v.id, 2)
+        self.assertEqual(v.label, 'C')
+        h.addEdge(1, 2)
+        h.addEdge(1, 2)
+        self.assertEqual(h.numEdges(), 2)
+        h.deleteVertex(1)
+        self.assertEqual(h.numVertices(), 2)
+        self.assertEqual(h.numEdges(), 0)
+        self.assertEqual(list(h.successors(0)), [])
+        self.assertEqual(list(h.predecessors(2)), [])
+        self.assertEqual(h.vertices('B'), set())
+        self.assertEqual(h.addVertex(Vertex('y', 'D')).id, 1)
+        h.addEdge(1, 0)
+        h.deleteEdge(1, 0)
+        h.deleteEdge(1, 0)
+        self.assertEqual(h.numEdges(), 0)
+
+        # Many edits overflow the CSR tables and rebuild them.
+        for i in range(100):
+            h.addEdge(0, h.addVertex(Vertex('z', 'E')).id)
+        self.assertEqual(h.numVertices(), 103)
+        self.assertEqual(len(h.successors(0)), 100)
+        self.assertLess(len(h._out), 100)
+
+    #--------------------------------------------------------------------------
+    def testToGraph(self):
+        g = Graph()
+        g.addEdge(Vertex('g0', 'A', '1'), Vertex('g1', 'B'))
+        h = HostGraph(g)
+        h.deleteVertex(0)
+        h.addEdge(1, h.addVertex(Vertex('x', 'C', '2')).id)
+
+        # The copy replaces the contents of g. Vertex ids are "vN".
+        self.assertIs(h.toGraph(g), g)
+        self.assertEqual(g.numVertices(), 2)
+        self.assertEqual(sorted(v.id for v in g.vertices()), ['v0', 'v1'])
+        self.assertEqual(g.hasVertex('C2').id, 'v0')
+        self.assertTrue(g.hasEdgeBetweenVertices('v1', 'v0'))
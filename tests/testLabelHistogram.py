@@ -0,0 +1,71 @@
+import random
+import unittest
+
+from src.Delta import Delta
+from src.HostGraph import HostGraph
+from src.HostIndex import HostIndex
+from src.LabelHistogram import LabelHistogram
+from YapyGraph.src.Graph import Graph
+from YapyGraph.src.Graph import Vertex
+
+class TestLabelHistogram(unittest.TestCase):
+
+    #--------------------------------------------------------------------------
+    def testFromGraph(self):
+        # Graph is A->B, A->B, B->A, A->A.
+        g = Graph()
+        g.addEdge(Vertex('g0', 'A'), Vertex('g1', 'B'))
+        g.addEdge('g0', Vertex('g2', 'B'))
+        g.addEdge('g1', Vertex('g3', 'A'))
+        g.addEdge('g3', 'g3')
+        histogram = LabelHistogram.fromGraph(g)
+        self.assertEqual(histogram.count('A'), 2)
+        self.assertEqual(histogram.count('C'), 0)
+        self.assertEqual(histogram.maxOutDegree('A'), 2)
+        self.assertEqual(histogram.maxInDegree('A'), 2)
+        self.assertEqual(histogram.maxOutDegree('B'), 1)
+        self.assertEqual(histogram.maxInDegree('B'), 1)
+        self.assertEqual(histogram.maxOutDegree('C'), 0)
+
+    #--------------------------------------------------------------------------
+    def testEdits(self):
+        # After every random edit, a HostGraph and a HostIndex kept up to
+        # date agree with a histogram counted from scratch.
+        rng = random.Random(2)
+        h = HostGraph()
+        g = Graph()
+        index = HostIndex(g)
+        for step in range(400):
+            vids = [ vid for label in 'ABC' for vid in h.vertices(label) ]
+            delta = Delta()
+            if len(vids) < 2 or rng.random() < 0.2:
+                v = h.addVertex(Vertex('x', rng.choice('ABC')))
+                delta.addedVertices.append(v)
+            elif rng.random() < 0.1:
+                vid = rng.choice(vids)
+                h.deleteVertex(vid)
+                delta.deletedVertices.append(vid)
+            elif rng.random() < 0.6:
+                (start, end) = (rng.choice(vids), rng.choice(vids))
+                if not h.hasEdgeBetweenVertices(start, end):
+                    h.addEdge(start, end)
+                    delta.addedEdges.append( (start, end) )
+            else:
+                start = rng.choice(vids)
+                if len(h.successors(start)) > 0:
+                    end = rng.choice(list(h.successors(start)))
+                    h.deleteEdge(start, end)
+                    delta.deletedEdges.append( (start, end) )
+            index.update(delta)
+
+            expected = LabelHistogram.fromGraph(h.toGraph())
+            for label in 'ABCD':
+                for host in [h, index]:
+                    self.assertEqual(host.count(label), expected.count(label))
+                    self.assertEqual(host.maxOutDegree(label),
+                        expected.maxOutDegree(label))
+                    self.assertEqual(host.maxInDegree(label),
+                        expected.maxInDegree(label))
+
+if __name__ == '__main__':
+    unittest.main()
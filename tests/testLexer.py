@@ -2,6 +2,8 @@
 #
 # Tests for the Lexer class.
 
+import os
+import tempfile
 import unittest
 from Lexer import Lexer
 from Token import TokenTypes
@@ -55,12 +57,25 @@ class TestLexer(unittest.TestCase):
         lex = Lexer('$')
         self.assertRaises(SyntaxError, lex.nextToken)
 
+        # Asking again raises the same error, also at offset 0.
+        for text in ['$ a', ' $ a']:
+            lex = Lexer(text)
+            self.assertRaises(SyntaxError, lex.nextToken)
+            self.assertRaises(SyntaxError, lex.nextToken)
+
+        # Even after a long run of whitespace and comments (which used to
+        # take exponential time to give up on, so this would hang).
+        for text in [' ' * 10000 + '$', '\n# x\n \t' * 2000 + '$']:
+            for lex in [Lexer(text), Lexer(text.encode('ascii'))]:
+                self.assertRaises(SyntaxError, lex.nextToken)
+
     #------------------------------------------------------------------------------
     def testNextToken(self):
         # Test all the acceptable tokens.
-        lex = Lexer('; , { } -> ==> = 123 configuration productions abc123')
+        lex = Lexer('; , : { } -> ==> = 123 configuration productions abc123')
         self.assertEquals(lex.nextToken().type, TokenTypes.SEMICOLON)
         self.assertEquals(lex.nextToken().type, TokenTypes.COMMA)
+        self.assertEquals(lex.nextToken().type, TokenTypes.COLON)
         self.assertEquals(lex.nextToken().type, TokenTypes.LBRACE)
         self.assertEquals(lex.nextToken().type, TokenTypes.RBRACE)
         self.assertEquals(lex.nextToken().type, TokenTypes.ARROW)
@@ -83,5 +98,53 @@ class TestLexer(unittest.TestCase):
         self.assertEquals(lex.nextToken().type, TokenTypes.ID)  # "def" is an ID
         self.assertEquals(lex.nextToken().type, TokenTypes.EOF) # nothing left
 
+    #------------------------------------------------------------------------------
+    def testIterator(self):
+        lex = Lexer('A->B;')
+        self.assertEqual([(t.type, t.text) for t in lex], [(TokenTypes.ID, 'A'),
+            (TokenTypes.ARROW, '->'), (TokenTypes.ID, 'B'),
+            (TokenTypes.SEMICOLON, ';'), (TokenTypes.EOF, '<EOF>')])
+
+    #------------------------------------------------------------------------------
+    def testPosition(self):
+        # Line and character numbers are worked out from token offsets.
+        lex = Lexer('A\n  B -> C\n')
+        tokens = list(lex)
+        self.assertEqual(tokens[1].offset, 4)
+        self.assertEqual(lex.position(tokens[0].offset), (1, 1))
+        self.assertEqual(lex.position(tokens[1].offset), (2, 3))
+        self.assertEqual(lex.position(tokens[3].offset), (2, 8))
+        self.assertEqual(lex.lineNum, 3)
+        self.assertEqual(lex.charNum, 1)
+
+        # Errors report where the invalid character is.
+        lex = Lexer('A\n $')
+        lex.nextToken()
+        self.assertRaisesRegex(SyntaxError, r'\[2,2\]', lex.nextToken)
+
+    #------------------------------------------------------------------------------
+    def testBytesAndFiles(self):
+        # Buffers are tokenized the same way as strings, into str lexemes.
+        lex = Lexer(b'configuration { a = 12; } # comment')
+        self.assertEqual([t.text for t in lex],
+            ['configuration', '{', 'a', '=', '12', ';', '}', '<EOF>'])
+
+        (fd, filename) = tempfile.mkstemp()
+        try:
+            os.write(fd, b'A1 ==> B2')
+            os.close(fd)
+            lex = Lexer.fromFile(filename)
+            self.assertEqual([t.type for t in lex], [TokenTypes.ID,
+                TokenTypes.DOUBLEARROW, TokenTypes.ID, TokenTypes.EOF])
+            lex.close()
+
+            # An empty file can't be mapped, but is still empty input.
+            open(filename, 'wb').close()
+            lex = Lexer.fromFile(filename)
+            self.assertEqual(lex.nextToken().type, TokenTypes.EOF)
+            lex.close()
+        finally:
+            os.remove(filename)
+
 if __name__ == '__main__':
     unittest.main()
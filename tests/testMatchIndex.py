@@ -0,0 +1,117 @@
+import random
+import unittest
+
+from src.Generator import Generator
+from src.HostIndex import HostIndex
+from src.MatchIndex import MatchIndex
+from src.Production import Production
+from YapyGraph.src.Graph import Graph
+from YapyGraph.src.Graph import Vertex
+
+class TestMatchIndex(unittest.TestCase):
+
+    #--------------------------------------------------------------------------
+    def testBuild(self):
+        # Graph is A->B, A->B. Production A->B ==> None matches twice.
+        g = Graph()
+        g.addEdge(Vertex('g0', 'A'), Vertex('g1', 'B'))
+        g.addEdge('g0', Vertex('g2', 'B'))
+        lhs = Graph()
+        lhs.addEdge(Vertex('l0', 'A', '1'), Vertex('l1', 'B', '1'))
+        p = Production(lhs, Graph())
+
+        index = MatchIndex([p], HostIndex(g))
+        index.build()
+        self.assertEqual(len(index), 2)
+        mappings = [mapping for (prod, mapping) in index.matches()]
+        self.assertIn({'l0':'g0', 'l1':'g1'}, mappings)
+        self.assertIn({'l0':'g0', 'l1':'g2'}, mappings)
+        self.assertEqual(index.match(0)[0], p)
+        self.assertRaises(IndexError, index.match, 2)
+
+    #--------------------------------------------------------------------------
+    def testSample(self):
+        # Graph is A->B, A->B, C. Productions A->B and C.
+        g = Graph()
+        g.addEdge(Vertex('g0', 'A'), Vertex('g1', 'B'))
+        g.addEdge('g0', Vertex('g2', 'B'))
+        g.addVertex(Vertex('g3', 'C'))
+        lhs = Graph()
+        lhs.addEdge(Vertex('l0', 'A', '1'), Vertex('l1', 'B', '1'))
+        lhsC = Graph()
+        lhsC.addVertex(Vertex('l0', 'C', '1'))
+
+        # With every weight 1, a sample is the same as a match at random.
+        (p, q) = (Production(lhs, Graph()), Production(lhsC, Graph()))
+        index = MatchIndex([p, q], HostIndex(g))
+        index.build()
+        for seed in range(10):
+            self.assertEqual(index.sample(random.Random(seed)),
+                index.match(random.Random(seed).randrange(3)))
+
+        # "match": each match of A->B is three times as likely as C's.
+        # "production": A->B is three times as likely as C.
+        (p, q) = (Production(lhs, Graph(), 3), Production(lhsC, Graph()))
+        for (selection, expected) in [('match', 6.0/7), ('production', 0.75)]:
+            index = MatchIndex([p, q], HostIndex(g), selection=selection)
+            index.build()
+            rng = random.Random(1)
+            chosen = [ index.sample(rng)[0] for i in range(4000) ]
+            self.assertAlmostEqual(chosen.count(p) / 4000.0, expected, delta=0.03)
+
+        # A->B, A->B ==> None has one match, which stands for two. "match"
+        # counts it twice, "distinct" once.
+        lhs2 = Graph()
+        lhs2.addEdge(Vertex('l0', 'A', '1'), Vertex('l1', 'B', '1'))
+        lhs2.addEdge('l0', Vertex('l2', 'B', '2'))
+        p = Production(lhs2, Graph())
+        q = Production(lhsC, Graph())
+        for (selection, expected) in [('match', 2.0/3), ('distinct', 0.5)]:
+            index = MatchIndex([p, q], HostIndex(g), selection=selection)
+            index.build()
+            self.assertEqual(len(index), 2)
+            rng = random.Random(1)
+            chosen = [ index.sample(rng)[0] for i in range(4000) ]
+            self.assertAlmostEqual(chosen.count(p) / 4000.0, expected, delta=0.03)
+
+        # Weight 0 disables a production.
+        index = MatchIndex([Production(lhs, Graph(), 0), q], HostIndex(g))
+        index.build()
+        self.assertEqual(index.sample(random)[0], q)
+        self.assertRaises(ValueError, MatchIndex, [p], HostIndex(g), None, 'x')
+
+    #--------------------------------------------------------------------------
+    def testUpdate(self):
+        # Start with A->B and apply A->B ==> A->C->B a few times. After each
+        # application the index must agree with a full search.
+        gen = Generator()
+        f = gen._parseGrammarFile("""
+            configuration { min_vertices = 1; }
+            productions {
+                A->B;
+                A1->B1 ==> A1->C->B1;
+                A->C ==> A->B, C;
+                C1, C2 ==> C1->C2;
+            }
+        """)
+        g = f.startGraph
+        hostIndex = HostIndex(g)
+        index = MatchIndex(f.productions, hostIndex)
+        index.build()
+
+        def canonical(matches):
+            return sorted( (f.productions.index(prod), sorted(mapping.items()))
+                for (prod, mapping) in matches )
+
+        for step in range(5):
+            if len(index) == 0:
+                break
+            (prod, mapping) = index.match(0)
+            delta = gen._applyProduction(g, prod, mapping)
+            hostIndex.update(delta)
+            index.update(delta)
+            self.assertEqual(canonical(index.matches()),
+                canonical(gen._findMatchingProductions(g, f.productions)))
+
+if __name__ == '__main__':
+    unittest.main()
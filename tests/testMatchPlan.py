@@ -0,0 +1,130 @@
+import unittest
+
+from src.HostIndex import HostIndex
+from src.MatchPlan import MatchPlan
+from src.RewriteScript import RewriteScript
+from YapyGraph.src.Graph import Graph
+from YapyGraph.src.Graph import Vertex
+
+class TestMatchPlan(unittest.TestCase):
+
+    #--------------------------------------------------------------------------
+    def testConstructor(self):
+        # LHS is A->B, A->C.
+        lhs = Graph()
+        lhs.addEdge(Vertex('l0', 'A'), Vertex('l1', 'B'))
+        lhs.addEdge('l0', Vertex('l2', 'C'))
+        plan = MatchPlan(lhs)
+        self.assertEqual(len(plan), 3)
+        a = plan.slot('l0')
+        b = plan.slot('l1')
+        self.assertEqual(plan.labels[a], 'A')
+        self.assertEqual(plan.minOut[a], 2)
+        self.assertEqual(plan.minIn[a], 0)
+        self.assertEqual(plan.minIn[b], 1)
+        self.assertIn( (a, b), plan.edges )
+
+    #--------------------------------------------------------------------------
+    def testApplicable(self):
+        # LHS is A->C, A->C, C.
+        lhs = Graph()
+        lhs.addEdge(Vertex('l0', 'A'), Vertex('l1', 'C'))
+        lhs.addEdge('l0', Vertex('l2', 'C'))
+        lhs.addVertex(Vertex('l3', 'C'))
+        plan = MatchPlan(lhs)
+
+        # Host is A->C, A->C: only two Cs.
+        g = Graph()
+        g.addEdge(Vertex('g0', 'A'), Vertex('g1', 'C'))
+        g.addEdge('g0', Vertex('g2', 'C'))
+        self.assertFalse(plan.applicable(HostIndex(g)))
+
+        # Three Cs, but no A with two successors.
+        g.deleteEdge('g0', 'g2')
+        g.addEdge(Vertex('g3', 'A'), 'g2')
+        g.addVertex(Vertex('g4', 'C'))
+        self.assertFalse(plan.applicable(HostIndex(g)))
+
+        # Enough of everything (the search may still find nothing).
+        g.addEdge('g0', 'g4')
+        self.assertTrue(plan.applicable(HostIndex(g)))
+
+    #--------------------------------------------------------------------------
+    def testSymmetries(self):
+        # A->B, A->B ==> A: the Bs can be swapped, so one must come first.
+        lhs = Graph()
+        lhs.addEdge(Vertex('l0', 'A', '1'), Vertex('l1', 'B', '2'))
+        lhs.addEdge('l0', Vertex('l2', 'B', '3'))
+        rhs = Graph()
+        rhs.addVertex(Vertex('r0', 'A', '1'))
+        plan = MatchPlan(lhs, RewriteScript(lhs, rhs))
+        self.assertEqual(plan.multiplicity, 2)
+        self.assertEqual(plan.orderings, [ (plan.slot('l1'), plan.slot('l2')) ])
+        self.assertEqual(MatchPlan(lhs).multiplicity, 1)
+        self.assertEqual(MatchPlan(lhs).orderings, [])
+
+        # A->B, A->B ==> A->B: only one B is deleted, so they can't.
+        rhs.addEdge('r0', Vertex('r1', 'B', '2'))
+        plan = MatchPlan(lhs, RewriteScript(lhs, rhs))
+        self.assertEqual(plan.multiplicity, 1)
+        self.assertEqual(plan.orderings, [])
+
+        # A->B, A->B, A->B ==> A->B->C, A->B->C, A->B->C: any order of the
+        # Bs (taking their Cs along).
+        lhs.addEdge('l0', Vertex('l3', 'B', '4'))
+        rhs = Graph()
+        for i in range(3):
+            rhs.addEdge(Vertex('r0', 'A', '1'), Vertex('r%d' % (i + 1), 'B', str(i + 2)))
+            rhs.addEdge('r%d' % (i + 1), Vertex('c%d' % i, 'C', str(i + 5)))
+        plan = MatchPlan(lhs, RewriteScript(lhs, rhs))
+        self.assertEqual(plan.multiplicity, 6)
+        self.assertEqual(len(plan.orderings), 3)
+
+        # A three-cycle of As ==> None can be rotated, not reflected.
+        lhs = Graph()
+        lhs.addEdge(Vertex('l0', 'A', '1'), Vertex('l1', 'A', '2'))
+        lhs.addEdge('l1', Vertex('l2', 'A', '3'))
+        lhs.addEdge('l2', 'l0')
+        self.assertEqual(MatchPlan(lhs, RewriteScript(lhs, Graph())).multiplicity, 3)
+
+    #--------------------------------------------------------------------------
+    def testSteps(self):
+        # Host has one A and many Bs, so a search for A->B starts from A.
+        g = Graph()
+        g.addVertex(Vertex('g0', 'A'))
+        for i in range(1, 6):
+            g.addEdge('g0', Vertex('g%d' % i, 'B'))
+        hostIndex = HostIndex(g)
+
+        lhs = Graph()
+        lhs.addEdge(Vertex('l0', 'A'), Vertex('l1', 'B'))
+        plan = MatchPlan(lhs)
+        steps = plan.steps(hostIndex)
+        self.assertEqual(steps[0][1], 'A')
+        self.assertEqual(steps[1][1], 'B')
+        self.assertEqual(steps[1][4], [(0, True)]) # B is reached from A
+
+        # An anchored order starts with the anchor.
+        steps = plan.steps(hostIndex, plan.slot('l1'))
+        self.assertEqual(steps[0][1], 'B')
+        self.assertEqual(steps[1][4], [(0, False)]) # A is reached from B
+
+    #--------------------------------------------------------------------------
+    def testStepsDrift(self):
+        # Host starts with one A and one B. Once there are many more As than
+        # Bs, the order is re-chosen to start from B.
+        g = Graph()
+        g.addVertex(Vertex('g0', 'A'))
+        g.addVertex(Vertex('g1', 'B'))
+        lhs = Graph()
+        lhs.addVertex(Vertex('l0', 'A'))
+        lhs.addVertex(Vertex('l1', 'B'))
+        plan = MatchPlan(lhs)
+        self.assertEqual(plan.steps(HostIndex(g))[0][1], 'A')
+
+        for i in range(2, 10):
+            g.addVertex(Vertex('g%d' % i, 'A'))
+        self.assertEqual(plan.steps(HostIndex(g))[0][1], 'B')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import random
+import unittest
+
+from src.HostGraph import HostGraph
+from src.HostIndex import HostIndex
+from src.Matcher import Matcher
+from src.MatchPlan import MatchPlan
+from src.Production import Production
+from src.SymbolTable import SymbolTable
+from YapyGraph.src.Graph import Graph
+from YapyGraph.src.Graph import Vertex
+
+class TestMatcher(unittest.TestCase):
+
+    #--------------------------------------------------------------------------
+    def testSearch(self):
+        # Graph is A->B, A->C, B->C.
+        g = Graph()
+        g.addEdge(Vertex('g0', 'A'), Vertex('g1', 'B'))
+        g.addEdge('g0', Vertex('g2', 'C'))
+        g.addEdge('g1', 'g2')
+        matcher = Matcher(HostIndex(g))
+
+        # A label that isn't in the graph never matches.
+        lhs = Graph()
+        lhs.addVertex(Vertex('l0', 'D'))
+        self.assertEqual(matcher.search(MatchPlan(lhs)), [])
+
+        # Edges must match in direction: C->B can't be found.
+        lhs = Graph()
+        lhs.addEdge(Vertex('l0', 'C'), Vertex('l1', 'B'))
+        self.assertEqual(matcher.search(MatchPlan(lhs)), [])
+
+        # A->B->C, A->C is found exactly once.
+        lhs = Graph()
+        lhs.addEdge(Vertex('l0', 'A', '1'), Vertex('l1', 'B', '1'))
+        lhs.addEdge('l1', Vertex('l2', 'C', '1'))
+        lhs.addEdge('l0', 'l2')
+        self.assertEqual(matcher.search(MatchPlan(lhs)), [{'l0':'g0', 'l1':'g1', 'l2':'g2'}])
+
+        # Disconnected vertices map onto distinct host vertices.
+        lhs = Graph()
+        lhs.addVertex(Vertex('l0', 'A', '1'))
+        lhs.addVertex(Vertex('l1', 'C', '1'))
+        self.assertEqual(matcher.search(MatchPlan(lhs)), [{'l0':'g0', 'l1':'g2'}])
+
+    #--------------------------------------------------------------------------
+    def testSearchAnchor(self):
+        # Graph is A->B1, A->B2. Anchoring the LHS B at g2 only finds the
+        # match that uses g2.
+        g = Graph()
+        g.addEdge(Vertex('g0', 'A'), Vertex('g1', 'B'))
+        g.addEdge('g0', Vertex('g2', 'B'))
+        matcher = Matcher(HostIndex(g))
+        lhs = Graph()
+        lhs.addEdge(Vertex('l0', 'A', '1'), Vertex('l1', 'B', '1'))
+        self.assertEqual(len(matcher.search(MatchPlan(lhs))), 2)
+        self.assertEqual(matcher.search(MatchPlan(lhs), ('l1', 'g2')), [{'l0':'g0', 'l1':'g2'}])
+
+        # An anchor with the wrong label matches nothing.
+        self.assertEqual(matcher.search(MatchPlan(lhs), ('l1', 'g0')), [])
+
+    #--------------------------------------------------------------------------
+    def testSymmetries(self):
+        # With a production's plan, each set of matches that only differ by
+        # a symmetry of the production is found once: the matches found,
+        # each taken multiplicity times, are as many as all the matches.
+        rng = random.Random(3)
+        g = Graph()
+        for i in range(12):
+            g.addVertex(Vertex('g%d' % i, rng.choice('AB')))
+        for i in range(30):
+            g.addEdge('g%d' % rng.randrange(12), 'g%d' % rng.randrange(12))
+        matcher = Matcher(HostIndex(g))
+        for trial in range(30):
+            lhs = Graph()
+            for i in range(rng.randint(1, 4)):
+                lhs.addVertex(Vertex('l%d' % i, rng.choice('AB'), str(i)))
+            for i in range(rng.randint(0, 4)):
+                lhs.addEdge('l%d' % rng.randrange(len(lhs.vertices())),
+                    'l%d' % rng.randrange(len(lhs.vertices())))
+            prod = Production(lhs, Graph())
+            plan = prod.matchPlan()
+            every = { tuple(sorted(mapping.items()))
+                for mapping in matcher.search(MatchPlan(lhs)) }
+            found = matcher.search(plan)
+            self.assertEqual(len(found) * plan.multiplicity, len(every))
+            for mapping in found:
+                self.assertIn(tuple(sorted(mapping.items())), every)
+            # No two matches found cover the same host vertices and edges
+            # (with nothing kept, every symmetry of the LHS is one of the
+            # production).
+            footprints = { (frozenset(mapping.values()), frozenset(
+                (mapping[plan.vids[s]], mapping[plan.vids[e]])
+                for (s, e) in plan.edges)) for mapping in found }
+            self.assertEqual(len(footprints), len(found))
+
+    #--------------------------------------------------------------------------
+    def testLabelIDs(self):
+        # On a HostGraph numbered as in the grammar's SymbolTable, labels
+        # are compared by id, and the same matches are found as on a
+        # HostIndex, or on a HostGraph of another grammar.
+        symbols = SymbolTable()
+        g = Graph()
+        g.addEdge(Vertex('g0', 'A'), Vertex('g1', 'B'))
+        g.addEdge('g1', Vertex('g2', 'A'))
+        g.addEdge('g2', Vertex('g3', 'C'))
+        lhs = Graph()
+        lhs.addEdge(Vertex('l0', 'B'), Vertex('l1', 'A'))
+        for label in 'DBA':
+            symbols.intern(label)
+        plan = Production(lhs, Graph(), symbols=symbols).matchPlan()
+        self.assertEqual(plan.labelIDs, [1, 2])
+        host = HostGraph(g, symbols)
+        steps = plan.steps(host)
+        self.assertEqual(Matcher(host)._labels(plan, steps),
+            [ plan.labelIDs[step[0]] for step in steps ])
+        expected = [ {'l0':'g1', 'l1':'g2'} ]
+        self.assertEqual(Matcher(HostIndex(g)).search(plan), expected)
+        for other in [host, HostGraph(g)]:
+            names = { vid : v.id for vid, v in enumerate(g.vertices()) }
+            found = [ { lhsVID : names[vid] for lhsVID, vid in mapping.items() }
+                for mapping in Matcher(other).search(plan) ]
+            self.assertEqual(found, expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+
+from src.HostIndex import HostIndex
+from src.Matcher import Matcher
+from src.ParallelMatcher import ParallelMatcher
+from src.Production import Production
+from YapyGraph.src.Graph import Graph
+from YapyGraph.src.Graph import Vertex
+
+class TestParallelMatcher(unittest.TestCase):
+
+    #--------------------------------------------------------------------------
+    def setUp(self):
+        # Graph is A->B, A->C, B->C, C->A, plus a lone B.
+        self.g = Graph()
+        self.g.addEdge(Vertex('g0', 'A'), Vertex('g1', 'B'))
+        self.g.addEdge('g0', Vertex('g2', 'C'))
+        self.g.addEdge('g1', 'g2')
+        self.g.addEdge('g2', 'g0')
+        self.g.addVertex(Vertex('g3', 'B'))
+
+        # Productions: A->B, B, and D (which never matches).
+        lhs1 = Graph()
+        lhs1.addEdge(Vertex('l0', 'A', '1'), Vertex('l1', 'B', '1'))
+        lhs2 = Graph()
+        lhs2.addVertex(Vertex('l0', 'B', '1'))
+        lhs3 = Graph()
+        lhs3.addVertex(Vertex('l0', 'D', '1'))
+        self.productions = [Production(lhs1, Graph()),
+            Production(lhs2, Graph()), Production(lhs3, Graph())]
+
+    #--------------------------------------------------------------------------
+    def testSearch(self):
+        # Every production finds exactly what a serial Matcher finds.
+        hostIndex = HostIndex(self.g)
+        with ParallelMatcher(self.productions, 3) as matcher:
+            found = matcher.search(hostIndex)
+        self.assertEqual(len(found), 3)
+        for (prod, mappings) in zip(self.productions, found):
+            expected = Matcher(hostIndex).search(prod.matchPlan())
+            self.assertEqual(sorted(map(sorted, map(dict.items, mappings))),
+                sorted(map(sorted, map(dict.items, expected))))
+        self.assertEqual(sorted(m['l0'] for m in found[1]), ['g1', 'g3'])
+        self.assertEqual(found[2], [])
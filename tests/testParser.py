@@ -234,6 +234,14 @@ class TestParser(unittest.TestCase):
         self.assertEquals(len(p.productions), 1)
         self.assertEquals(len(p.productions[0]._lhs._vertices), 2)
         self.assertEquals(len(p.productions[0]._rhs._vertices), 2)
+        self.assertEqual(p.productions[0].weight, 1)
+
+        # With a weight.
+        p = Parser( Lexer('A->B ==> C->D : 5') )
+        p._parseProduction()
+        self.assertEqual(p.productions[0].weight, 5)
+        p = Parser( Lexer('A->B ==> C->D : x') )
+        self.assertRaises(SyntaxError, p._parseProduction)
 
     #------------------------------------------------------------------------------
     def testParseProductionList(self):
@@ -291,6 +299,19 @@ class TestParser(unittest.TestCase):
         self.assertIsNotNone(p.startGraph)
         self.assertEquals(len(p.productions), 1)
 
+    #------------------------------------------------------------------------------
+    def testSymbols(self):
+        # Labels are interned in one table, shared by the productions, and
+        # every vertex with the same label holds the same string.
+        p = Parser(Lexer('productions { A1->B; A->B2 ==> A->B->C; }'))
+        p._parseProductions()
+        self.assertEqual(p.symbols.symbols, ['A', 'B', 'C'])
+        self.assertIs(p.productions[0].symbols, p.symbols)
+        labels = [ v.label for g in [p.startGraph, p.productions[0].lhs(),
+            p.productions[0].rhs()] for v in g.vertices() ]
+        for label in labels:
+            self.assertIs(label, p.symbols.symbol(p.symbols.find(label)))
+
     #------------------------------------------------------------------------------
     def testParseVertexID(self):
         p = Parser(Lexer(''))
@@ -0,0 +1,77 @@
+import unittest
+
+from src.RewriteScript import RewriteScript
+from YapyGraph.src.Graph import Graph
+from YapyGraph.src.Graph import Vertex
+
+class TestRewriteScript(unittest.TestCase):
+
+    #--------------------------------------------------------------------------
+    def testConstructor(self):
+        # A1->B1, A1->C1, B1->C1 ==> A1->B1, B1->D1, D1->C1 deletes C1 and
+        # its edges, adds D1 and edges to and from it, and keeps A1->B1.
+        lhs = Graph()
+        lhs.addEdge(Vertex('l0', 'A', '1'), Vertex('l1', 'B', '1'))
+        lhs.addEdge('l0', Vertex('l2', 'C', '1'))
+        lhs.addEdge('l1', 'l2')
+        rhs = Graph()
+        rhs.addEdge(Vertex('r0', 'A', '1'), Vertex('r1', 'B', '1'))
+        rhs.addEdge('r1', Vertex('r2', 'D', '1'))
+        script = RewriteScript(lhs, rhs)
+        self.assertEqual(script.vids, ['l0', 'l1', 'l2'])
+        self.assertEqual(script.deleteVertices, [2])
+        self.assertEqual(script.deleteEdges, [])
+        self.assertEqual(script.addVertices, [('D', '1')])
+        self.assertEqual(script.addEdges, [(1, 3)])
+
+        # A1->B1 ==> B1->A1 deletes the edge and adds the reverse.
+        lhs = Graph()
+        lhs.addEdge(Vertex('l0', 'A', '1'), Vertex('l1', 'B', '1'))
+        rhs = Graph()
+        rhs.addEdge(Vertex('r0', 'B', '1'), Vertex('r1', 'A', '1'))
+        script = RewriteScript(lhs, rhs)
+        self.assertEqual(script.deleteVertices, [])
+        self.assertEqual(script.deleteEdges, [(0, 1)])
+        self.assertEqual(script.addVertices, [])
+        self.assertEqual(script.addEdges, [(1, 0)])
+
+    #--------------------------------------------------------------------------
+    def testApply(self):
+        # Graph is A->B, B->A. A1->B1 ==> A1->C1->B1, B1->A1 doesn't add
+        # B->A again.
+        g = Graph()
+        g.addEdge(Vertex('g0', 'A'), Vertex('g1', 'B'))
+        g.addEdge('g1', 'g0')
+        lhs = Graph()
+        lhs.addEdge(Vertex('l0', 'A', '1'), Vertex('l1', 'B', '1'))
+        rhs = Graph()
+        rhs.addEdge(Vertex('r0', 'A', '1'), Vertex('r1', 'C', '1'))
+        rhs.addEdge('r1', Vertex('r2', 'B', '1'))
+        rhs.addEdge('r2', 'r0')
+        delta = RewriteScript(lhs, rhs).apply(g, {'l0':'g0', 'l1':'g1'})
+        self.assertEqual(delta.deletedVertices, [])
+        self.assertEqual(delta.deletedEdges, [('g0', 'g1')])
+        self.assertEqual([v.id for v in delta.addedVertices], ['v2'])
+        self.assertEqual(sorted(delta.addedEdges), [('g0', 'v2'), ('v2', 'g1')])
+        self.assertFalse(g.hasEdgeBetweenVertices('g0', 'g1'))
+        self.assertTrue(g.hasEdgeBetweenVertices('g1', 'g0'))
+        self.assertTrue(g.hasEdgeBetweenVertices('g0', 'v2'))
+        self.assertEqual(g._vertices['v2'].label, 'C')
+
+    #--------------------------------------------------------------------------
+    def testApplyAfterDelete(self):
+        # Graph is v0->v2 (v1 was deleted). A1 ==> A1->B1, B1->C1 adds two
+        # vertices; "v2" is taken, so they get v3 and v4 rather than
+        # colliding with it.
+        g = Graph()
+        g.addEdge(Vertex('v0', 'A'), Vertex('v2', 'D'))
+        lhs = Graph()
+        lhs.addVertex(Vertex('l0', 'A', '1'))
+        rhs = Graph()
+        rhs.addEdge(Vertex('r0', 'A', '1'), Vertex('r1', 'B', '1'))
+        rhs.addEdge('r1', Vertex('r2', 'C', '1'))
+        delta = RewriteScript(lhs, rhs).apply(g, {'l0':'v0'})
+        self.assertEqual([v.id for v in delta.addedVertices], ['v3', 'v4'])
+        self.assertEqual(g.numVertices(), 4)
+        self.assertEqual(g._vertices['v2'].label, 'D')
+        self.assertTrue(g.hasEdgeBetweenVertices('v3', 'v4'))
@@ -0,0 +1,76 @@
+import os
+import time
+import unittest
+
+from src.HostGraph import HostGraph
+from src.StopConditions import StopConditions
+from src.StopConditions import StopReason
+from YapyGraph.src.Graph import Graph
+from YapyGraph.src.Vertex import Vertex
+
+class TestStopConditions(unittest.TestCase):
+
+    #--------------------------------------------------------------------------
+    def setUp(self):
+        # A->B, B->C
+        g = Graph()
+        g.addEdge(Vertex('a', 'A'), Vertex('b', 'B'))
+        g.addEdge('b', Vertex('c', 'C'))
+        self.graph = HostGraph(g)
+
+    #--------------------------------------------------------------------------
+    def testCheck(self):
+        conditions = StopConditions({ 'min_vertices' : '4' })
+        self.assertIsNone(conditions.check(1000000, self.graph))
+        conditions = StopConditions({ 'min_vertices' : '3' })
+        self.assertEqual(conditions.check(0, self.graph), StopReason.MIN_VERTICES)
+
+        conditions = StopConditions({ 'min_vertices' : '10', 'max_steps' : '5' })
+        self.assertIsNone(conditions.check(4, self.graph))
+        self.assertEqual(conditions.check(5, self.graph), StopReason.MAX_STEPS)
+
+        # Arguments take the place of config options.
+        conditions = StopConditions({ 'min_vertices' : '10', 'max_steps' : '5' },
+            maxSteps=100, maxEdges=2)
+        self.assertEqual(conditions.maxSteps, 100)
+        self.assertEqual(conditions.check(5, self.graph), StopReason.MAX_EDGES)
+
+    #--------------------------------------------------------------------------
+    def testDeadline(self):
+        # The clock is only read every CHECK_INTERVAL steps, and a reason,
+        # once met, sticks.
+        conditions = StopConditions({ 'min_vertices' : '10' },
+            deadline=time.monotonic() + 3600)
+        self.assertIsNone(conditions.check(0, self.graph))
+        conditions.deadline = time.monotonic() - 1
+        self.assertIsNone(conditions.check(1, self.graph))
+        self.assertEqual(conditions.check(StopConditions.CHECK_INTERVAL,
+            self.graph), StopReason.DEADLINE)
+        self.assertEqual(conditions.check(0, self.graph), StopReason.DEADLINE)
+
+        conditions = StopConditions({ 'min_vertices' : '10', 'time_limit' : '0' })
+        self.assertEqual(conditions.check(0, self.graph), StopReason.DEADLINE)
+
+    #--------------------------------------------------------------------------
+    def testMemory(self):
+        conditions = StopConditions({ 'min_vertices' : '10', 'memory_limit' : '1' })
+        self.assertEqual(conditions.check(0, self.graph), StopReason.MEMORY)
+        conditions = StopConditions({ 'min_vertices' : '10' }, memoryLimit=1 << 30)
+        self.assertIsNone(conditions.check(0, self.graph))
+
+    #--------------------------------------------------------------------------
+    @unittest.skipUnless(os.path.exists('/proc/self/statm'), 'needs /proc')
+    def testMemoryAfterPeak(self):
+        # Memory freed by an earlier run doesn't count against a later one.
+        block = bytearray(256 << 20)
+        block[::4096] = b'x' * len(block[::4096])
+        del block
+        conditions = StopConditions({ 'min_vertices' : '10' })
+        used = conditions._memoryUsed()
+        self.assertLess(used + 128, conditions._peakMemory())
+        conditions = StopConditions({ 'min_vertices' : '10' },
+            memoryLimit=used + 64)
+        self.assertIsNone(conditions.check(0, self.graph))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from src.SymbolTable import SymbolTable
+
+class TestSymbolTable(unittest.TestCase):
+
+    #--------------------------------------------------------------------------
+    def testIntern(self):
+        t = SymbolTable()
+        self.assertEqual(len(t), 0)
+        self.assertIsNone(t.find('A'))
+
+        # Ids are handed out in order, once per symbol.
+        self.assertEqual(t.intern('A'), 0)
+        self.assertEqual(t.intern('B'), 1)
+        self.assertEqual(t.intern(''.join(['A'])), 0)
+        self.assertEqual(len(t), 2)
+        self.assertEqual(t.find('B'), 1)
+        self.assertEqual(t.symbol(1), 'B')
+        self.assertEqual(t.symbols, ['A', 'B'])
+
+        # The first copy of a symbol is the one kept.
+        a = ''.join(['A', 'b'])
+        t.intern(a)
+        self.assertIs(t.symbol(t.intern(''.join(['A', 'b']))), a)
+
+    #--------------------------------------------------------------------------
+    def testLayered(self):
+        parent = SymbolTable()
+        parent.intern('A')
+        parent.intern('B')
+        child = SymbolTable(parent)
+        self.assertTrue(child.extends(parent))
+        self.assertFalse(parent.extends(child))
+
+        # The parent's symbols keep their ids; new ones are the child's.
+        self.assertEqual(child.intern('B'), 1)
+        self.assertEqual(child.intern('C'), 2)
+        self.assertEqual(child.symbols, ['A', 'B', 'C'])
+        self.assertEqual(parent.symbols, ['A', 'B'])
+        self.assertIsNone(parent.find('C'))
+
+        # A symbol added to the parent later is new to the child.
+        parent.intern('D')
+        self.assertFalse(child.extends(parent))
+        self.assertIsNone(child.find('D'))
+        self.assertEqual(child.intern('D'), 3)
+
+if __name__ == '__main__':
+    unittest.main()
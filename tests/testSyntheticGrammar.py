@@ -0,0 +1,44 @@
+import unittest
+
+from benchmarks.SyntheticGrammar import SyntheticGrammar
+from src.Generator import Generator
+from src.Lexer import Lexer
+from src.Parser import Parser
+
+class TestSyntheticGrammar(unittest.TestCase):
+
+    #--------------------------------------------------------------------------
+    def parse(self, grammar, minVertices):
+        parser = Parser(Lexer(grammar.text({ 'min_vertices' : minVertices })))
+        parser.parse()
+        return parser
+
+    #--------------------------------------------------------------------------
+    def testText(self):
+        grammar = SyntheticGrammar(numProductions=6, lhsSize=3, numLabels=30,
+            skew=1.5, growth=2, seed=4)
+        self.assertEqual(grammar.text(), SyntheticGrammar(6, 3, 30, 1.5, 2, 4).text())
+        self.assertEqual(grammar.labels()[25:28], ['Z', 'AA', 'AB'])
+        parser = self.parse(grammar, 200)
+        self.assertEqual(parser.config['min_vertices'], '200')
+        self.assertEqual(parser.startGraph.numVertices(), 18)
+        self.assertEqual(len(parser.productions), 6)
+        for prod in parser.productions:
+            self.assertEqual(prod.lhs().numVertices(), 3)
+            self.assertEqual(prod.rhs().numVertices(), 5)
+
+    #--------------------------------------------------------------------------
+    def testGenerate(self):
+        # Every production matches from the start, and the graph grows.
+        for grammar in [SyntheticGrammar(), SyntheticGrammar(1, 1, 1, 0, 1)]:
+            parser = self.parse(grammar, 100)
+            matches = Generator()._findMatchingProductions(parser.startGraph,
+                parser.productions)
+            self.assertEqual(set(prod for (prod, mapping) in matches),
+                set(parser.productions))
+            Generator(1).generate(parser.startGraph, parser.productions, parser.config)
+            self.assertGreaterEqual(parser.startGraph.numVertices(), 100)
+        self.assertRaises(ValueError, SyntheticGrammar, growth=0)
+
+if __name__ == '__main__':
+    unittest.main()
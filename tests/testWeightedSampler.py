@@ -0,0 +1,46 @@
+import random
+import unittest
+
+from src.WeightedSampler import WeightedSampler
+
+class TestWeightedSampler(unittest.TestCase):
+
+    #--------------------------------------------------------------------------
+    def testFind(self):
+        # Every position finds the item it falls in, however the values
+        # change.
+        rng = random.Random(1)
+        values = [ 0 ] * 13
+        sampler = WeightedSampler(len(values))
+        for n in range(200):
+            i = rng.randrange(len(values))
+            delta = rng.randrange(-values[i], 5)
+            values[i] += delta
+            sampler.add(i, delta)
+            self.assertEqual(sampler.total(), sum(values))
+            r = 0
+            for (i, value) in enumerate(values):
+                for offset in range(value):
+                    self.assertEqual(sampler.find(r), (i, offset))
+                    r += 1
+        self.assertEqual(len(sampler), 13)
+
+    #--------------------------------------------------------------------------
+    def testSample(self):
+        sampler = WeightedSampler(3)
+        self.assertIsNone(sampler.sample(random))
+        sampler.add(1, 3)
+        self.assertEqual(sampler.sample(random)[0], 1)
+        self.assertEqual(WeightedSampler.choose([0, 0, 2], random)[0], 2)
+        self.assertIsNone(WeightedSampler.choose([0, 0], random))
+
+    #--------------------------------------------------------------------------
+    def testSelection(self):
+        self.assertEqual(WeightedSampler.selection(3, 4, 'match'), 12)
+        self.assertEqual(WeightedSampler.selection(3, 4, 'match', 2), 24)
+        self.assertEqual(WeightedSampler.selection(3, 4, 'distinct', 2), 12)
+        self.assertEqual(WeightedSampler.selection(3, 4, 'production'), 3)
+        self.assertEqual(WeightedSampler.selection(3, 0, 'production'), 0)
+
+if __name__ == '__main__':
+    unittest.main()